@@ -1,2 +1,4 @@
 # -*- coding: utf-8 -*-
 __version__ = '2.6.9'
+
+default_app_config = 'multilingual_news.apps.MultilingualNewsConfig'
@@ -1,7 +1,8 @@
 """Admin classes for the ``multilingual_news`` app."""
 
 from django.contrib import admin
-from django.utils.translation import gettext_lazy as _
+from django.db.models import OuterRef, Prefetch, Subquery
+from django.utils.translation import gettext_lazy as _, ngettext
 
 from cms.admin.placeholderadmin import PlaceholderAdminMixin
 from document_library.admin import AttachmentInline
@@ -11,6 +12,25 @@ from multilingual_tags.admin import TaggedItemInline
 from .models import Category, NewsEntry
 
 
+def annotate_translated_fields(queryset, language, **fields):
+    """
+    Annotates translated fields of the given language, so that they can be
+    used to sort the changelist.
+
+    :param fields: Maps the annotation names to the translated field names.
+
+    """
+    translations = queryset.model._parler_meta.root_model.objects.filter(
+        master=OuterRef("pk"), language_code=language
+    )
+    return queryset.annotate(
+        **dict(
+            (name, Subquery(translations.values(field)[:1]))
+            for name, field in fields.items()
+        )
+    )
+
+
 class CategoryAdmin(TranslatableAdmin):
     list_display = [
         "get_title",
@@ -18,10 +38,17 @@ class CategoryAdmin(TranslatableAdmin):
         "all_languages_column",
     ]
 
+    def get_queryset(self, request):
+        qs = super(CategoryAdmin, self).get_queryset(request)
+        return annotate_translated_fields(
+            qs, self.get_queryset_language(request), _title="title"
+        ).prefetch_related("translations")
+
     def get_title(self, obj):
         return obj.title
 
     get_title.short_description = _("Title")
+    get_title.admin_order_field = "_title"
 
 
 class NewsEntryAdmin(PlaceholderAdminMixin, TranslatableAdmin):
@@ -35,22 +62,63 @@ class NewsEntryAdmin(PlaceholderAdminMixin, TranslatableAdmin):
         "get_categories",
         "all_languages_column",
     ]
+    actions = ["publish_entries", "unpublish_entries"]
     # prepopulated_fields = {'slug': ('title', )}
 
+    def _set_published(self, request, queryset, is_published):
+        language = self.get_queryset_language(request)
+        pks = NewsEntry.objects.set_published(
+            queryset, is_published=is_published, language=language
+        )
+        self.message_user(
+            request,
+            ngettext(
+                "%(count)d entry was updated.",
+                "%(count)d entries were updated.",
+                len(pks),
+            )
+            % {"count": len(pks)},
+        )
+
+    def publish_entries(self, request, queryset):
+        self._set_published(request, queryset, True)
+
+    publish_entries.short_description = _("Publish selected entries")
+
+    def unpublish_entries(self, request, queryset):
+        self._set_published(request, queryset, False)
+
+    unpublish_entries.short_description = _("Unpublish selected entries")
+
+    def get_queryset(self, request):
+        qs = super(NewsEntryAdmin, self).get_queryset(request)
+        categories = Category.objects.prefetch_related("translations")
+        return annotate_translated_fields(
+            qs,
+            self.get_queryset_language(request),
+            _title="title",
+            _is_published="is_published",
+        ).prefetch_related(
+            "translations", Prefetch("categories", queryset=categories)
+        )
+
     def get_is_published(self, obj):
         return obj.is_published
 
     get_is_published.short_description = _("Is published")
+    get_is_published.admin_order_field = "_is_published"
+    get_is_published.boolean = True
 
     def get_title(self, obj):
         return obj.title
 
     get_title.short_description = _("Title")
+    get_title.admin_order_field = "_title"
 
     def get_categories(self, obj):
         return ", ".join(str(c.title) for c in obj.categories.all())
 
-    get_title.short_description = _("Categories")
+    get_categories.short_description = _("Categories")
 
 
 admin.site.register(Category, CategoryAdmin)
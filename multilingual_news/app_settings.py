@@ -2,3 +2,51 @@
 from django.conf import settings
 
 PAGINATION_AMOUNT = getattr(settings, 'NEWS_PAGINATION_AMOUNT', 10)
+
+# The amount of entries per feed document
+FEED_AMOUNT = getattr(settings, 'NEWS_FEED_AMOUNT', 10)
+
+# Either ``'offset'`` for numbered pages or ``'cursor'`` for keyset pagination
+PAGINATION_MODE = getattr(settings, 'NEWS_PAGINATION_MODE', 'offset')
+
+# The amount of related entries, that are stored per entry and language
+RELATED_AMOUNT = getattr(settings, 'NEWS_RELATED_AMOUNT', 5)
+
+# The maximum amount of entries, that are returned by a search
+SEARCH_LIMIT = getattr(settings, 'NEWS_SEARCH_LIMIT', 1000)
+
+# Maps language codes to PostgreSQL text search configurations. Languages,
+# that are not listed, use the ``'simple'`` configuration.
+SEARCH_CONFIGS = getattr(settings, 'NEWS_SEARCH_CONFIGS', {
+    'da': 'danish',
+    'de': 'german',
+    'en': 'english',
+    'es': 'spanish',
+    'fi': 'finnish',
+    'fr': 'french',
+    'hu': 'hungarian',
+    'it': 'italian',
+    'nl': 'dutch',
+    'no': 'norwegian',
+    'pt': 'portuguese',
+    'ro': 'romanian',
+    'ru': 'russian',
+    'sv': 'swedish',
+    'tr': 'turkish',
+})
+
+# The amount of seconds, that responses of the views and feeds are cached.
+# ``0`` disables the response cache.
+RESPONSE_CACHE_TIMEOUT = getattr(settings, 'NEWS_RESPONSE_CACHE_TIMEOUT', 0)
+
+# The amount of seconds, that the rendered feed documents are stored.
+# ``0`` disables the feed store and renders the feeds on every request.
+FEED_STORE_TIMEOUT = getattr(settings, 'NEWS_FEED_STORE_TIMEOUT', 0)
+
+# The amount of seconds, that the results of the ``get_recent_news`` tag are
+# cached. ``0`` disables the cache.
+RECENT_NEWS_CACHE_TIMEOUT = getattr(
+    settings, 'NEWS_RECENT_NEWS_CACHE_TIMEOUT', 0)
+
+# The amount of seconds, that the teasers of the list views are cached
+TEASER_CACHE_TIMEOUT = getattr(settings, 'NEWS_TEASER_CACHE_TIMEOUT', 60 * 60)
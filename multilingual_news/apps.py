@@ -0,0 +1,9 @@
+"""App configuration for the ``multilingual_news`` app."""
+from django.apps import AppConfig
+
+
+class MultilingualNewsConfig(AppConfig):
+    name = 'multilingual_news'
+
+    def ready(self):
+        from . import signals  # NOQA
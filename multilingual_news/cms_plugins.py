@@ -19,7 +19,7 @@ class CMSRecentPlugin(CMSPluginBase):
         qs = NewsEntry.objects.recent(
             check_language=instance.current_language_only,
             limit=instance.limit,
-        )
+        ).for_listing()
         context.update({"object_list": qs})
         return context
 
@@ -0,0 +1,112 @@
+"""Conditional GET (``ETag`` / ``Last-Modified``) for the news views."""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.translation import get_language
+from django.views.decorators.http import condition
+
+from .response_cache import get_generation
+
+
+def get_entries_state(queryset):
+    """
+    Returns the amount of entries and their latest modification and
+    publication dates as a dict with one aggregate query.
+
+    """
+    return queryset.order_by().aggregate(
+        count=Count('pk'), modified=Max('modified'), pub_date=Max('pub_date'))
+
+
+def get_generation_state(language=None):
+    """
+    Returns the news generation (see ``response_cache.get_generation``) of
+    the given language as entries state.
+
+    The generation changes with every entry of the language, so it can stand
+    in for ``get_entries_state`` of views, that list all entries, without a
+    query.
+
+    """
+    return {'generation': get_generation(language)}
+
+
+def get_last_modified(state):
+    """
+    Returns the ``Last-Modified`` date of the given entries state.
+
+    Entries with a publication date in the past appear without being saved,
+    so their publication date counts as a modification, too. The state of
+    ``get_generation_state`` has no date.
+
+    """
+    dates = [date for date in (state.get('modified'), state.get('pub_date'))
+             if date]
+    return max(dates) if dates else None
+
+
+def get_etag(request, state):
+    """
+    Returns an ``ETag`` for the given entries state.
+
+    The entry count is part of the tag, so that deleted or unpublished entries
+    change it, even if the latest dates stay the same.
+
+    """
+    values = [request.get_full_path(), get_language()]
+    for key, value in sorted(state.items()):
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        values.append(u'{0}={1}'.format(key, value))
+    return hashlib.md5(u'|'.join(values).encode('utf-8')).hexdigest()
+
+
+def is_conditional(request):
+    """
+    Returns True, if the response to the request may be a 304.
+
+    Authenticated users get drafts and the toolbar, so their responses are
+    always rendered.
+
+    """
+    user = getattr(request, 'user', None)
+    return (request.method in ('GET', 'HEAD')
+            and not (user and user.is_authenticated))
+
+
+def conditional_response(request, state, view, *args, **kwargs):
+    """
+    Returns a 304 response, if the client has the current version of the
+    given entries state, and the response of ``view`` otherwise.
+
+    """
+    etag = get_etag(request, state)
+    last_modified = get_last_modified(state)
+    return condition(
+        etag_func=lambda request, *args, **kwargs: etag,
+        last_modified_func=lambda request, *args, **kwargs: last_modified,
+    )(view)(request, *args, **kwargs)
+
+
+class ConditionalGetMixin(object):
+    """
+    Mixin for a view, that answers unchanged pages with ``304 Not Modified``.
+
+    The ``ETag`` and ``Last-Modified`` headers are computed from the state
+    of ``get_conditional_state``, before anything is rendered. By default
+    this is one aggregate query over the entries of
+    ``get_conditional_queryset``.
+
+    """
+    def get_conditional_queryset(self):
+        return self.get_queryset()
+
+    def get_conditional_state(self):
+        return get_entries_state(self.get_conditional_queryset())
+
+    def dispatch(self, request, *args, **kwargs):
+        view = super(ConditionalGetMixin, self).dispatch
+        if not is_conditional(request):
+            return view(request, *args, **kwargs)
+        state = self.get_conditional_state()
+        return conditional_response(request, state, view, *args, **kwargs)
@@ -0,0 +1,110 @@
+"""
+A store for the rendered documents of the news feeds.
+
+Feed readers poll the feeds much more often than the feeds change. So every
+feed document (per language, author, tag and ``any_language`` variant) is
+rendered once and stored in the cache with the versions of its dependencies
+(see ``response_cache``). Publishing, changing or deleting an entry gives the
+dependencies of the affected feeds new versions, so that their documents are
+rendered again on the next request. Until then the stored bytes are served
+with their content hash as ``ETag``.
+
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.views.decorators.http import condition
+
+from .app_settings import FEED_STORE_TIMEOUT
+from .response_cache import get_versions, invalidate_scheduled
+
+
+FEED_KEY = 'multilingual_news:feed:{0}'
+
+
+def is_enabled():
+    return bool(FEED_STORE_TIMEOUT)
+
+
+def is_servable(request):
+    return is_enabled() and request.method in ('GET', 'HEAD')
+
+
+def get_feed_key(name, language, domain, before=None, secure=False, **kwargs):
+    """
+    Returns the cache key of a feed document.
+
+    Only validated values are part of the key, so that arbitrary query
+    parameters can't fill the cache with copies of the same document.
+
+    :param name: The name of the URL pattern of the feed, e.g.
+      ``news_rss_author``.
+    :param domain: The domain of the current site, which the links of the
+      document are built with.
+    :param before: The ``(pub_date, pk)`` cursor of an archive page.
+    :param secure: Whether the document was requested via HTTPS, which is
+      the scheme of its links.
+    :param kwargs: The primary keys of the objects, that the feed is for.
+
+    """
+    values = [name, language, domain, 'https' if secure else 'http']
+    if before is not None:
+        values.append(u'{0}|{1}'.format(before[0].isoformat(), before[1]))
+    values.extend(
+        u'{0}={1}'.format(key, value) for key, value in sorted(kwargs.items()))
+    value = u'|'.join(values)
+    return FEED_KEY.format(hashlib.md5(value.encode('utf-8')).hexdigest())
+
+
+def get_document(key):
+    """Returns the stored document, if none of its dependencies changed."""
+    invalidate_scheduled()
+    document = cache.get(key)
+    if document is None:
+        return None
+    versions = document['versions']
+    if cache.get_many(list(versions.keys())) != versions:
+        return None
+    return document
+
+
+def set_document(key, response, dependencies, last_modified=None):
+    """
+    Stores the content of a rendered feed and returns the document.
+
+    Returns None for responses, that can't be stored.
+
+    """
+    if (response.status_code != 200 or response.streaming
+            or response.cookies):
+        return None
+    document = {
+        'content': response.content,
+        'content_type': response['Content-Type'],
+        'cache_control': response.get('Cache-Control'),
+        'etag': hashlib.md5(response.content).hexdigest(),
+        'last_modified': last_modified,
+        'versions': get_versions(dependencies),
+    }
+    cache.set(key, document, FEED_STORE_TIMEOUT)
+    return document
+
+
+def document_response(request, document):
+    """
+    Returns the stored document or ``304 Not Modified``, if the client has
+    the current version of it.
+
+    """
+    def view(request):
+        response = HttpResponse(
+            document['content'], content_type=document['content_type'])
+        if document['cache_control']:
+            response['Cache-Control'] = document['cache_control']
+        return response
+
+    return condition(
+        etag_func=lambda request: document['etag'],
+        last_modified_func=lambda request: document['last_modified'],
+    )(view)(request)
@@ -1,17 +1,40 @@
-"""RSS feeds for the `multilingual_news` app."""
+"""Feeds for the `multilingual_news` app in RSS, Atom and JSON Feed format."""
+import json
+from calendar import timegm
 
 from django.conf import settings
-from django.contrib.contenttypes.models import ContentType
 from django.contrib.sites.shortcuts import get_current_site
-from django.contrib.syndication.views import Feed
+from django.contrib.syndication.views import Feed, add_domain
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponse
 from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed, SyndicationFeed
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date
 from django.utils.translation import gettext_lazy as _
 
 from cms.utils import get_language_from_request
-from multilingual_tags.models import Tag, TaggedItem
+from multilingual_tags.models import Tag
 from people.models import Person
 
-from .models import NewsEntry
+from . import feed_store, response_cache
+from .app_settings import FEED_AMOUNT
+from .conditional import (
+    conditional_response,
+    get_entries_state,
+    get_last_modified,
+    is_conditional,
+)
+from .models import Category, NewsEntry, translations_prefetch
+from .pagination import NEXT, InvalidCursor, decode_cursor, make_cursor, order, seek
+
+
+# the namespace of the ``fh:archive`` element of RFC 5005
+HISTORY_NS = "http://purl.org/syndication/history/1.0"
+
+# complete archive pages don't change anymore, so clients may keep them
+ARCHIVE_MAX_AGE = 60 * 60 * 24 * 365
 
 
 def is_multilingual():
@@ -22,83 +45,370 @@ def get_lang_name(lang):
     return _(dict(settings.LANGUAGES)[lang])
 
 
-class NewsEntriesFeed(Feed):
-    """A news feed, that shows all entries."""
+class JSONFeed(SyndicationFeed):
+    """A feed generator for `JSON Feed 1.1 <https://jsonfeed.org/version/1.1>`_."""
+
+    content_type = "application/feed+json; charset=utf-8"
+
+    def write(self, outfile, encoding):
+        feed = {
+            "version": "https://jsonfeed.org/version/1.1",
+            "title": self.feed["title"],
+            "home_page_url": self.feed["link"],
+            "feed_url": self.feed["feed_url"],
+            "description": self.feed["description"],
+            "language": self.feed["language"],
+            "next_url": dict(self.feed.get("archive_links", [])).get("prev-archive"),
+            "items": [self.get_item(item) for item in self.items],
+        }
+        outfile.write(
+            json.dumps(
+                dict((key, value) for key, value in feed.items() if value),
+                cls=DjangoJSONEncoder,
+            )
+        )
 
-    title_template = "multilingual_news/feed/entries_title.html"
-    description_template = "multilingual_news/feed/entries_description.html"
+    def get_item(self, item):
+        value = {
+            "id": item["unique_id"] or item["link"],
+            "url": item["link"],
+            "title": item["title"],
+            "content_text": item["description"] or "",
+            "date_published": item["pubdate"],
+            "date_modified": item["updateddate"],
+            "tags": list(item["categories"]),
+        }
+        if item["author_name"]:
+            value["authors"] = [{"name": item["author_name"]}]
+        return dict((key, value) for key, value in value.items() if value is not None)
 
-    def get_object(self, request, **kwargs):
+
+class ArchiveFeedMixin(object):
+    """
+    Adds the links and the ``fh:archive`` element of
+    `RFC 5005 <https://tools.ietf.org/html/rfc5005>`_ archived feeds to a
+    feed generator.
+
+    They are passed as ``archive_links``, a list of ``(rel, href)`` tuples,
+    and ``is_archive``.
+
+    """
+
+    link_element = "link"
+
+    def add_archive_elements(self, handler):
+        if self.feed.get("is_archive"):
+            handler.addQuickElement("fh:archive", None)
+        for rel, href in self.feed.get("archive_links", []):
+            handler.addQuickElement(self.link_element, None, {"rel": rel, "href": href})
+
+
+class RssFeed(ArchiveFeedMixin, Rss201rev2Feed):
+    link_element = "atom:link"
+
+    def rss_attributes(self):
+        attrs = super(RssFeed, self).rss_attributes()
+        attrs["xmlns:fh"] = HISTORY_NS
+        return attrs
+
+    def add_root_elements(self, handler):
+        super(RssFeed, self).add_root_elements(handler)
+        self.add_archive_elements(handler)
+
+
+class AtomFeed(ArchiveFeedMixin, Atom1Feed):
+    def root_attributes(self):
+        attrs = super(AtomFeed, self).root_attributes()
+        attrs["xmlns:fh"] = HISTORY_NS
+        return attrs
+
+    def add_root_elements(self, handler):
+        super(AtomFeed, self).add_root_elements(handler)
+        self.add_archive_elements(handler)
+
+
+FEED_TYPES = {
+    "rss": RssFeed,
+    "atom": AtomFeed,
+    "json": JSONFeed,
+}
+
+
+class FeedRequest(object):
+    """
+    The state of one request of a feed, which is passed to the methods of
+    the feed as ``obj``.
+
+    The feed instances in the URL patterns are shared by all requests, so
+    nothing of a request may be stored on them.
+
+    :before: The ``(pub_date, pk)`` cursor of an archive page or ``None``.
+    :page: The items of the page and whether there are older entries, once
+      they were fetched.
+
+    """
+
+    def __init__(self, request, any_language=None, before=None):
+        self.request = request
         self.language_code = get_language_from_request(request)
         self.site = get_current_site(request)
-        self.any_language = kwargs.get("any_language", None)
+        self.any_language = any_language
+        self.before = before
+        self.page = None
+
+
+class NewsEntriesFeed(Feed):
+    """
+    A news feed, that shows all entries.
+
+    ``feed_format`` is one of the keys of ``FEED_TYPES``. The URLs of the
+    feed are named ``news_<feed_format>`` plus ``_any`` for the
+    ``any_language`` variant and the ``url_suffix`` of the feed class.
+
+    The items are fetched with their translations and authors in one query
+    set and rendered without templates.
+
+    The feed shows the latest ``NEWS_FEED_AMOUNT`` entries and links to
+    archive pages with the older ones (see RFC 5005). An archive page is
+    selected by the ``before`` GET parameter, a cursor to the last entry of
+    the previous page, so that every page costs the same.
+
+    Everything, that belongs to a request, is kept in the ``FeedRequest``,
+    that ``get_object`` returns.
+
+    """
+
+    url_suffix = ""
+
+    def __init__(self, feed_format="rss"):
+        self.feed_format = feed_format
+        self.feed_type = FEED_TYPES[feed_format]
+
+    def __call__(self, request, *args, **kwargs):
+        try:
+            obj = self.get_object(request, *args, **kwargs)
+        except ObjectDoesNotExist:
+            raise Http404("Feed object does not exist.")
+        if feed_store.is_servable(request):
+            return self.serve_document(request, obj)
+
+        def view(request, *args, **kwargs):
+            return self.render_feed(request, obj)
+
+        view = response_cache.cache_response(
+            view, lambda response: self.get_cache_dependencies(obj)
+        )
+        if not is_conditional(request):
+            return view(request, *args, **kwargs)
+        state = get_entries_state(self.get_base_queryset(obj))
+        return conditional_response(request, state, view, *args, **kwargs)
+
+    def get_cache_dependencies(self, obj):
+        return [response_cache.ENTRIES]
+
+    def render_feed(self, request, obj):
+        """
+        Renders the feed like ``Feed.__call__`` does, but without looking the
+        object up again.
+
+        """
+        feedgen = self.get_feed(obj, request)
+        response = HttpResponse(content_type=feedgen.content_type)
+        response["Last-Modified"] = http_date(
+            timegm(feedgen.latest_post_date().utctimetuple())
+        )
+        feedgen.write(response, "utf-8")
+        if obj.before is not None and self.get_page(obj)[1]:
+            patch_cache_control(response, public=True, max_age=ARCHIVE_MAX_AGE)
+        return response
+
+    def serve_document(self, request, obj):
+        """
+        Serves the stored document of the feed and renders it, if it is
+        missing or outdated.
+
+        """
+        name = "news_{0}{1}{2}".format(
+            self.feed_format, "_any" if obj.any_language else "", self.url_suffix
+        )
+        key = feed_store.get_feed_key(
+            name,
+            obj.language_code,
+            obj.site.domain,
+            obj.before,
+            request.is_secure(),
+            **self.get_key_kwargs(obj)
+        )
+        document = feed_store.get_document(key)
+        if document is None:
+            response = self.render_feed(request, obj)
+            document = feed_store.set_document(
+                key,
+                response,
+                self.get_cache_dependencies(obj),
+                get_last_modified(get_entries_state(self.get_base_queryset(obj))),
+            )
+            if document is None:
+                return response
+        return feed_store.document_response(request, document)
+
+    def get_key_kwargs(self, obj):
+        """
+        Returns the primary keys of the objects, that the feed is for, as
+        part of the key of the stored document.
+
+        """
+        return {}
+
+    def get_object(self, request, **kwargs):
+        before = None
+        token = request.GET.get("before")
+        if token:
+            try:
+                direction, pub_date, pk = decode_cursor(token)
+            except InvalidCursor:
+                raise Http404
+            if direction != NEXT or pub_date is None:
+                raise Http404
+            before = (pub_date, pk)
+        return FeedRequest(request, kwargs.get("any_language", None), before)
+
+    def reverse_feed(self, obj, **kwargs):
+        """Returns the URL of the feed in the same format and variant."""
+        name = "news_{0}".format(self.feed_format)
+        if is_multilingual() or obj.any_language:
+            name += "_any"
+            kwargs["any_language"] = True
+        return reverse(name + self.url_suffix, kwargs=kwargs)
 
-    def feed_url(self, item):
-        if is_multilingual() or self.any_language:
-            return reverse("news_rss_any", kwargs={"any_language": True})
-        return reverse("news_rss")
+    def feed_url(self, obj):
+        return self.reverse_feed(obj)
+
+    def feed_extra_kwargs(self, obj):
+        items, has_older = self.get_page(obj)
+        # the URL of this variant, which ``feed_url`` isn't for all feeds
+        current = add_domain(
+            obj.site.domain, obj.request.path, obj.request.is_secure()
+        )
+        links = []
+        if obj.before is not None:
+            links.append(("current", current))
+        if has_older:
+            links.append(
+                (
+                    "prev-archive",
+                    "{0}?before={1}".format(
+                        current, make_cursor(items[-1].pub_date, items[-1].pk)
+                    ),
+                )
+            )
+        return {"archive_links": links, "is_archive": obj.before is not None}
 
-    def title(self, item):
-        if self.any_language or not is_multilingual():
-            return _("{0} blog entries".format(self.site.name))
+    def title(self, obj):
+        if obj.any_language or not is_multilingual():
+            return _("{0} blog entries".format(obj.site.name))
         return _(
             "{0} blog entries in {1}".format(
-                self.site.name, get_lang_name(self.language_code)
+                obj.site.name, get_lang_name(obj.language_code)
             )
         )
 
-    def link(self, item):
+    def link(self, obj):
         return reverse("news_list")
 
-    def item_link(self, item):
-        return item.get_absolute_url()
-
-    def description(self, item):
-        if self.any_language or not is_multilingual():
-            return _("{0} blog entries".format(self.site.name))
+    def description(self, obj):
+        if obj.any_language or not is_multilingual():
+            return _("{0} blog entries".format(obj.site.name))
         return _(
             "{0} blog entries in {1}".format(
-                self.site.name, get_lang_name(self.language_code)
+                obj.site.name, get_lang_name(obj.language_code)
             )
         )
 
-    def get_queryset(self, item):
-        if not is_multilingual() or self.any_language:
-            check_language = False
+    def check_language(self, obj):
+        return is_multilingual() and not obj.any_language
+
+    def get_base_queryset(self, obj):
+        """
+        Returns all entries of the feed, that ``get_queryset`` picks the
+        items from.
+
+        """
+        return NewsEntry.objects.published(check_language=self.check_language(obj))
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+    def get_queryset(self, obj):
+        """
+        Returns the entries of the page with everything, that is needed to
+        render them.
+
+        """
+        qs = self.get_base_queryset(obj).select_related("author")
+        if self.check_language(obj):
+            qs = qs.prefetch_related(
+                translations_prefetch(NewsEntry, obj.language_code)
+            )
         else:
-            check_language = True
-        return NewsEntry.objects.recent(limit=10, check_language=check_language)
+            qs = qs.prefetch_related("translations")
+        if obj.before is None:
+            return order(qs)
+        return seek(qs, *obj.before)
+
+    def get_page(self, obj):
+        """
+        Returns the items of the requested page and whether there are older
+        entries.
+
+        """
+        if obj.page is None:
+            items = list(self.get_queryset(obj)[: FEED_AMOUNT + 1])
+            obj.page = (items[:FEED_AMOUNT], len(items) > FEED_AMOUNT)
+        return obj.page
+
+    def items(self, obj):
+        return self.get_page(obj)[0]
+
+    def item_title(self, item):
+        return item.safe_translation_getter("title", any_language=True)
 
-    def items(self, item):
-        return self.get_queryset(item)
+    def item_description(self, item):
+        return item.safe_translation_getter("description", any_language=True)
+
+    def item_link(self, item):
+        return NewsEntry.get_url(
+            item.safe_translation_getter("slug", any_language=True), item.pub_date
+        )
+
+    def item_author_name(self, item):
+        return item.author and str(item.author)
 
     def item_pubdate(self, item):
         return item.pub_date
 
+    def item_updateddate(self, item):
+        return item.modified
+
 
 class AuthorFeed(NewsEntriesFeed):
     """A news feed, that shows only entries from a certain author."""
 
-    title_template = "multilingual_news/feed/author_title.html"
-    description_template = "multilingual_news/feed/author_description.html"
+    url_suffix = "_author"
 
     def get_object(self, request, **kwargs):
-        super(AuthorFeed, self).get_object(request, **kwargs)
+        obj = super(AuthorFeed, self).get_object(request, **kwargs)
         # Needs no try. If the author does not exist, we automatically get a
         # 404 response.
-        self.author = Person.objects.get(pk=kwargs.get("author"))
+        obj.author = Person.objects.get(pk=kwargs.get("author"))
+        return obj
 
     def title(self, obj):
         title = super(AuthorFeed, self).title(obj)
-        return _("{0} by {1}".format(title, self.author))
+        return _("{0} by {1}".format(title, obj.author))
 
     def feed_url(self, obj):
-        if is_multilingual() or self.any_language:
-            return reverse(
-                "news_rss_any_author",
-                kwargs={"author": self.author.id, "any_language": True},
-            )
-        return reverse("news_rss_author", kwargs={"author": self.author.id})
+        return self.reverse_feed(obj, author=obj.author.id)
 
     def link(self, obj):
         # TODO Author specific archive
@@ -106,56 +416,99 @@ class AuthorFeed(NewsEntriesFeed):
 
     def description(self, obj):
         description = super(AuthorFeed, self).description(obj)
-        return _("{0} by {1}".format(description, self.author))
+        return _("{0} by {1}".format(description, obj.author))
 
-    def get_queryset(self, obj):
-        if not is_multilingual() or self.any_language:
-            check_language = False
-        else:
-            check_language = True
-        return NewsEntry.objects.recent(
-            limit=10, check_language=check_language, kwargs={"author": self.author}
+    def get_base_queryset(self, obj):
+        return NewsEntry.objects.published(
+            check_language=self.check_language(obj), kwargs={"author": obj.author}
         )
 
+    def get_key_kwargs(self, obj):
+        return {"author": obj.author.pk}
+
+    def get_cache_dependencies(self, obj):
+        return [response_cache.author_dependency(obj.author.pk)]
+
 
 class TaggedFeed(NewsEntriesFeed):
     """A news feed, that shows only entries with a special tag."""
 
-    title_template = "multilingual_news/feed/author_title.html"
-    description_template = "multilingual_news/feed/author_description.html"
+    url_suffix = "_tagged"
 
     def get_object(self, request, **kwargs):
-        super(TaggedFeed, self).get_object(request, **kwargs)
+        obj = super(TaggedFeed, self).get_object(request, **kwargs)
         # Needs no try. If the tag does not exist, we automatically get a
         # 404 response.
-        self.tag = Tag.objects.get(slug=kwargs.get("tag"))
+        obj.tag = Tag.objects.get(slug=kwargs.get("tag"))
+        return obj
 
     def title(self, obj):
         title = super(TaggedFeed, self).title(obj)
-        return _("{0} by {1}".format(title, self.tag.name))
+        return _("{0} by {1}".format(title, obj.tag.name))
 
     def feed_url(self, obj):
-        if is_multilingual() or self.any_language:
-            return reverse(
-                "news_rss_any_tagged",
-                kwargs={"tag": self.tag.slug, "any_language": True},
-            )
-        return reverse("news_rss_tagged", kwargs={"tag": self.tag.slug})
+        return self.reverse_feed(obj, tag=obj.tag.slug)
 
     def link(self, obj):
-        return reverse("news_archive_tagged", kwargs={"tag": self.tag.slug})
+        return reverse("news_archive_tagged", kwargs={"tag": obj.tag.slug})
 
     def description(self, obj):
         description = super(TaggedFeed, self).description(obj)
-        return _("{0} by {1}".format(description, self.tag.name))
+        return _("{0} by {1}".format(description, obj.tag.name))
 
-    def get_queryset(self, obj):
-        content_type = ContentType.objects.get_for_model(NewsEntry)
-        tagged_items = TaggedItem.objects.filter(
-            content_type=content_type, tag=self.tag
-        )
-        entries = []
-        for tagged_item in tagged_items:
-            if tagged_item.object and tagged_item.object.is_public():
-                entries.append(tagged_item.object)
-        return entries[:10]
+    def get_base_queryset(self, obj):
+        return NewsEntry.objects.published(
+            check_language=self.check_language(obj)
+        ).tagged([obj.tag])
+
+    def get_key_kwargs(self, obj):
+        return {"tag": obj.tag.pk}
+
+    def get_cache_dependencies(self, obj):
+        return [response_cache.tag_dependency(obj.tag.pk)]
+
+
+class CategoryFeed(NewsEntriesFeed):
+    """
+    A news feed, that shows only entries of a category and its descendants.
+
+    """
+
+    url_suffix = "_category"
+
+    def get_object(self, request, **kwargs):
+        obj = super(CategoryFeed, self).get_object(request, **kwargs)
+        obj.category = Category.objects.get(slug=kwargs.get("category"))
+        return obj
+
+    def get_category_title(self, obj):
+        return obj.category.safe_translation_getter("title", obj.category.slug)
+
+    def title(self, obj):
+        title = super(CategoryFeed, self).title(obj)
+        return _("{0} in {1}".format(title, self.get_category_title(obj)))
+
+    def feed_url(self, obj):
+        return self.reverse_feed(obj, category=obj.category.slug)
+
+    def link(self, obj):
+        return obj.category.get_absolute_url()
+
+    def description(self, obj):
+        description = super(CategoryFeed, self).description(obj)
+        return _("{0} in {1}".format(description, self.get_category_title(obj)))
+
+    def get_base_queryset(self, obj):
+        return NewsEntry.objects.published(
+            check_language=self.check_language(obj)
+        ).in_categories([obj.category])
+
+    def get_key_kwargs(self, obj):
+        return {"category": obj.category.pk}
+
+    def get_cache_dependencies(self, obj):
+        # the descendants of the category can change
+        return [
+            response_cache.CATEGORIES,
+            response_cache.category_dependency(obj.category.pk),
+        ]
@@ -0,0 +1,41 @@
+"""Rebuilds the search documents of all news entries."""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ... import search
+from ...models import NewsEntry, SearchDocument
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuilds the full text search index of all news entry translations.'
+        ' Run it once after upgrading.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100, dest='batch_size',
+            help='Amount of entries, that are processed per batch.')
+
+    def handle(self, *args, **options):
+        backend = search.get_backend()
+        entries = NewsEntry.objects.order_by('pk').prefetch_related(
+            'translations')
+        last_pk, indexed = 0, 0
+        with transaction.atomic():
+            SearchDocument.objects.all().delete()
+            while True:
+                batch = list(
+                    entries.filter(pk__gt=last_pk)[:options['batch_size']])
+                if not batch:
+                    break
+                last_pk = batch[-1].pk
+                documents = []
+                for entry, plugins in search.get_text_plugins(batch).items():
+                    for translation in entry.translations.all():
+                        documents.append(
+                            search.get_document(translation, plugins))
+                documents = SearchDocument.objects.bulk_create(documents)
+                backend.update(documents)
+                indexed += len(documents)
+        if options['verbosity'] > 0:
+            self.stdout.write('Indexed {0} translations.'.format(indexed))
@@ -0,0 +1,44 @@
+"""Refreshes the aggregates, that depend on the current time."""
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now, timedelta
+
+from ...models import (
+    ArchiveEntryCount,
+    Category,
+    CategoryEntryCount,
+    NewsEntry,
+    RelatedEntry,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Refreshes the denormalized aggregates for entries, whose publication'
+        ' date has just passed. Run it from a cronjob.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--minutes', type=int, default=60,
+            help='Picks up entries published in the last X minutes.')
+        parser.add_argument(
+            '--all', action='store_true', dest='all',
+            help='Rebuilds all aggregates.')
+
+    def handle(self, *args, **options):
+        if options['all']:
+            CategoryEntryCount.objects.update_counts()
+            ArchiveEntryCount.objects.update_counts()
+            RelatedEntry.objects.update_related(
+                NewsEntry.objects.values_list('pk', flat=True),
+                neighbours=False)
+            return
+        since = now() - timedelta(minutes=options['minutes'])
+        categories = Category.objects.filter(
+            newsentries__pub_date__gt=since,
+            newsentries__pub_date__lte=now()).distinct()
+        CategoryEntryCount.objects.update_counts(categories)
+        entries = NewsEntry.objects.filter(
+            pub_date__gt=since, pub_date__lte=now())
+        ArchiveEntryCount.objects.update_entries(entries)
+        RelatedEntry.objects.update_related(
+            entries.values_list('pk', flat=True))
@@ -0,0 +1,52 @@
+"""Rebuilds the stored descriptions of all news entry translations."""
+from django.core.management.base import BaseCommand
+
+from cms.models import CMSPlugin
+
+from ...models import NewsEntry, NewsEntryTranslation
+
+
+class Command(BaseCommand):
+    help = (
+        'Stores the plain text of the excerpt or content placeholder on each'
+        ' news entry translation. Run it once after upgrading.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100, dest='batch_size',
+            help='Amount of entries, that are processed per batch.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        entries = NewsEntry.objects.order_by('pk').prefetch_related(
+            'translations')
+        last_pk, updated = 0, 0
+        while True:
+            batch = list(entries.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            placeholder_ids = set()
+            for entry in batch:
+                placeholder_ids.update([entry.excerpt_id, entry.content_id])
+            placeholder_ids.discard(None)
+            plugins = {}
+            for plugin in CMSPlugin.objects.filter(
+                    placeholder_id__in=placeholder_ids,
+                    plugin_type='TextPlugin').select_related(
+                        'djangocms_text_ckeditor_text').order_by('path'):
+                plugins.setdefault(plugin.placeholder_id, []).append(plugin)
+            translations = []
+            for entry in batch:
+                entry_plugins = (
+                    plugins.get(entry.excerpt_id, [])
+                    + plugins.get(entry.content_id, []))
+                for translation in entry.translations.all():
+                    translation.description = entry.get_description(
+                        translation.language_code, plugins=entry_plugins)
+                    translations.append(translation)
+            NewsEntryTranslation.objects.bulk_update(
+                translations, ['description'])
+            updated += len(translations)
+        if options['verbosity'] > 0:
+            self.stdout.write('Updated {0} translations.'.format(updated))
@@ -0,0 +1,25 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('multilingual_news', '0003_auto_20220505_0002'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='newsentry',
+            index=models.Index(fields=['pub_date', 'id'], name='news_entry_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsentrytranslation',
+            index=models.Index(fields=['language_code', 'is_published', 'master'], name='news_trans_lang_pub_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsentrytranslation',
+            index=models.Index(fields=['language_code', 'slug'], name='news_trans_lang_slug_idx'),
+        ),
+    ]
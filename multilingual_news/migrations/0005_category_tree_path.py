@@ -0,0 +1,38 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:42
+
+from django.db import migrations, models
+
+
+def build_tree_paths(apps, schema_editor):
+    Category = apps.get_model('multilingual_news', 'Category')
+    parents = dict(Category.objects.values_list('pk', 'parent_id'))
+    paths = {}
+
+    def get_path(pk, seen=()):
+        if pk not in paths:
+            parent_id = parents[pk]
+            if parent_id is None or parent_id in seen:
+                paths[pk] = '{0}/'.format(pk)
+            else:
+                paths[pk] = '{0}{1}/'.format(
+                    get_path(parent_id, seen + (pk, )), pk)
+        return paths[pk]
+
+    for pk in parents:
+        Category.objects.filter(pk=pk).update(tree_path=get_path(pk))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('multilingual_news', '0004_published_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='tree_path',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=255, verbose_name='Tree path'),
+        ),
+        migrations.RunPython(build_tree_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('multilingual_news', '0005_category_tree_path'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryEntryCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language_code', models.CharField(max_length=15, verbose_name='Language')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Count')),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entry_counts', to='multilingual_news.Category', verbose_name='Category')),
+            ],
+            options={
+                'verbose_name': 'Category entry count',
+                'verbose_name_plural': 'Category entry counts',
+                'unique_together': {('category', 'language_code')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('multilingual_news', '0006_categoryentrycount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsentrytranslation',
+            name='description',
+            field=models.TextField(blank=True, editable=False, help_text='Plain text of the excerpt or content placeholder', verbose_name='Description'),
+        ),
+    ]
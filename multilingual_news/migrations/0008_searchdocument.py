@@ -0,0 +1,81 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:50
+
+from django.db import OperationalError, migrations, models
+import django.db.models.deletion
+
+
+SQLITE_INDEX = [
+    "CREATE VIRTUAL TABLE multilingual_news_searchdocument_fts USING fts5("
+    " title, text, content='multilingual_news_searchdocument',"
+    " content_rowid='id')",
+    "CREATE TRIGGER multilingual_news_searchdocument_ai"
+    " AFTER INSERT ON multilingual_news_searchdocument BEGIN"
+    " INSERT INTO multilingual_news_searchdocument_fts(rowid, title, text)"
+    " VALUES (new.id, new.title, new.text); END",
+    "CREATE TRIGGER multilingual_news_searchdocument_ad"
+    " AFTER DELETE ON multilingual_news_searchdocument BEGIN"
+    " INSERT INTO multilingual_news_searchdocument_fts("
+    " multilingual_news_searchdocument_fts, rowid, title, text)"
+    " VALUES ('delete', old.id, old.title, old.text); END",
+    "CREATE TRIGGER multilingual_news_searchdocument_au"
+    " AFTER UPDATE ON multilingual_news_searchdocument BEGIN"
+    " INSERT INTO multilingual_news_searchdocument_fts("
+    " multilingual_news_searchdocument_fts, rowid, title, text)"
+    " VALUES ('delete', old.id, old.title, old.text);"
+    " INSERT INTO multilingual_news_searchdocument_fts(rowid, title, text)"
+    " VALUES (new.id, new.title, new.text); END",
+]
+
+POSTGRESQL_INDEX = [
+    "ALTER TABLE multilingual_news_searchdocument"
+    " ADD COLUMN search_vector tsvector",
+    "CREATE INDEX multilingual_news_searchdocument_vector_idx"
+    " ON multilingual_news_searchdocument USING gin(search_vector)",
+]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        try:
+            schema_editor.execute(SQLITE_INDEX[0])
+        except OperationalError:
+            # SQLite was built without FTS5, the search falls back to LIKE
+            return
+        for sql in SQLITE_INDEX[1:]:
+            schema_editor.execute(sql)
+    elif vendor == 'postgresql':
+        for sql in POSTGRESQL_INDEX:
+            schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(
+            'DROP TABLE IF EXISTS multilingual_news_searchdocument_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('multilingual_news', '0007_newsentry_description'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language_code', models.CharField(max_length=15, verbose_name='Language')),
+                ('title', models.TextField(blank=True, verbose_name='Title')),
+                ('text', models.TextField(blank=True, verbose_name='Text')),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to='multilingual_news.NewsEntry', verbose_name='Entry')),
+            ],
+            options={
+                'verbose_name': 'Search document',
+                'verbose_name_plural': 'Search documents',
+                'unique_together': {('entry', 'language_code')},
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('multilingual_news', '0008_searchdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language_code', models.CharField(max_length=15, verbose_name='Language')),
+                ('score', models.PositiveIntegerField(default=0, verbose_name='Score')),
+                ('position', models.PositiveIntegerField(default=0, verbose_name='Position')),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_index', to='multilingual_news.NewsEntry', verbose_name='Entry')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_to_index', to='multilingual_news.NewsEntry', verbose_name='Related entry')),
+            ],
+            options={
+                'verbose_name': 'Related entry',
+                'verbose_name_plural': 'Related entries',
+                'ordering': ('position',),
+                'unique_together': {('entry', 'related', 'language_code')},
+                'index_together': {('entry', 'language_code', 'position')},
+            },
+        ),
+    ]
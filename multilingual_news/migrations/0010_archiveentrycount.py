@@ -0,0 +1,29 @@
+# Generated by Django 2.2.28 on 2026-10-18 09:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('multilingual_news', '0009_relatedentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveEntryCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language_code', models.CharField(max_length=15, verbose_name='Language')),
+                ('year', models.PositiveIntegerField(verbose_name='Year')),
+                ('month', models.PositiveIntegerField(verbose_name='Month')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Count')),
+            ],
+            options={
+                'verbose_name': 'Archive entry count',
+                'verbose_name_plural': 'Archive entry counts',
+                'ordering': ('-year', '-month'),
+                'unique_together': {('language_code', 'year', 'month')},
+            },
+        ),
+    ]
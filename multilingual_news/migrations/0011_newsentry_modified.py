@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('multilingual_news', '0010_archiveentrycount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsentry',
+            name='modified',
+            field=models.DateTimeField(auto_now=True, verbose_name='Modified'),
+        ),
+    ]
@@ -1,22 +1,44 @@
 """Models for the ``multilingual_news`` app."""
 
-import re
+import heapq
+from collections import Counter
+from datetime import date
+from html import unescape
 
 from django.urls import reverse
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericRelation
-from django.db import models
-from django.utils.html import escape
-from django.utils.timezone import now
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.exceptions import (
+    FieldDoesNotExist,
+    ObjectDoesNotExist,
+    ValidationError,
+)
+from django.db import models, transaction
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.functions import (
+    Coalesce,
+    Concat,
+    ExtractMonth,
+    ExtractYear,
+    Substr,
+)
+from django.utils.html import strip_tags
+from django.utils.timezone import localtime, now
 from django.utils.translation import gettext_lazy as _, get_language
 
 from cms.models.fields import PlaceholderField
 from cms.models import CMSPlugin
 from document_library.models import Attachment
 from filer.fields.image import FilerImageField
-from parler.managers import TranslationManager
+from parler.cache import get_translation_cache_key
+from parler.managers import TranslatableQuerySet, TranslationManager
 from parler.models import TranslatableModel, TranslatedFields
-from multilingual_tags.models import TaggedItem
+from parler.utils import get_active_language_choices
+from multilingual_tags.models import Tag, TaggedItem
+
+from .app_settings import RELATED_AMOUNT, SEARCH_LIMIT
 
 
 class Category(TranslatableModel):
@@ -28,6 +50,9 @@ class Category(TranslatableModel):
       languages.
     :parent: Allows you to build hierarchies of categories.
     :hide_on_list: Boolean to show/hide on list view.
+    :tree_path: The primary keys of all ancestors and the category itself,
+      e.g. ``1/5/12/``. It is maintained on save and lets us fetch a whole
+      subtree with one range query.
 
     """
 
@@ -51,6 +76,14 @@ class Category(TranslatableModel):
         verbose_name=_("Hide on list view"),
     )
 
+    tree_path = models.CharField(
+        max_length=255,
+        verbose_name=_("Tree path"),
+        editable=False,
+        blank=True,
+        db_index=True,
+    )
+
     translations = TranslatedFields(
         title=models.CharField(
             max_length=256,
@@ -66,16 +99,71 @@ class Category(TranslatableModel):
     def __str__(self):
         return self.safe_translation_getter("title", self.slug)
 
+    @staticmethod
+    def get_tree_filter(tree_path, prefix=""):
+        """
+        Returns a ``Q`` object for the category at ``tree_path`` and all its
+        descendants.
+
+        All paths in the subtree start with ``tree_path``, which ends with a
+        slash, so this is a prefix match. On PostgreSQL it uses the
+        ``varchar_pattern_ops`` index, that Django creates for the indexed
+        ``tree_path`` next to the regular one, so that it doesn't depend on
+        the collation of the database.
+
+        """
+        return models.Q(**{prefix + "tree_path__startswith": tree_path})
+
+    def clean(self):
+        if self.pk and self.parent_id:
+            if self.parent_id == self.pk or (
+                self.tree_path and self.parent.tree_path.startswith(self.tree_path)
+            ):
+                raise ValidationError(
+                    {"parent": _("A category can't be moved below itself.")}
+                )
+
+    def get_ancestors(self, include_self=False):
+        """Returns all categories above this one."""
+        pks = [int(pk) for pk in self.tree_path.split("/") if pk]
+        if not include_self:
+            pks = pks[:-1]
+        return Category.objects.filter(pk__in=pks)
+
+    def get_descendants(self, include_self=False):
+        """Returns all categories below this one."""
+        qs = Category.objects.filter(self.get_tree_filter(self.tree_path))
+        if not include_self:
+            qs = qs.exclude(pk=self.pk)
+        return qs
+
     def get_entries(self):
-        """Returns the entries for this category."""
+        """Returns the entries for this category and all its descendants."""
+        translations = NewsEntryTranslation.objects.filter(
+            master=models.OuterRef("pk"), is_published=True
+        )
         return (
-            self.newsentries.filter(
-                translations__is_published=True, pub_date__lte=now()
-            )
+            NewsEntry.objects.in_categories([self])
+            .annotate(_is_published=models.Exists(translations))
+            .filter(_is_published=True, pub_date__lte=now())
             .order_by("-pub_date")
-            .distinct()
         )
 
+    def get_entry_count(self, language=None):
+        """
+        Returns the amount of published entries in this category and its
+        descendants for the given (or active) language.
+
+        The value is read from ``CategoryEntryCount``. Use
+        ``prefetch_related("entry_counts")`` when listing many categories.
+
+        """
+        language = language or get_language()
+        for entry_count in self.entry_counts.all():
+            if entry_count.language_code == language:
+                return entry_count.count
+        return 0
+
     def get_absolute_url(self):
         return reverse(
             "news_archive_category",
@@ -84,6 +172,32 @@ class Category(TranslatableModel):
             },
         )
 
+    def get_tree_path(self):
+        parent_path = self.parent.tree_path if self.parent_id else ""
+        return "{0}{1}/".format(parent_path, self.pk)
+
+    def save(self, *args, **kwargs):
+        if self.pk is None:
+            super(Category, self).save(*args, **kwargs)
+            self.tree_path = self.get_tree_path()
+            Category.objects.filter(pk=self.pk).update(tree_path=self.tree_path)
+            return
+        old_path, self.tree_path = self.tree_path, self.get_tree_path()
+        if old_path and old_path != self.tree_path:
+            # the receivers recount the old and the new ancestors
+            self._news_old_tree_path = old_path
+            # move the whole subtree along
+            Category.objects.filter(self.get_tree_filter(old_path)).exclude(
+                pk=self.pk
+            ).update(
+                tree_path=Concat(
+                    models.Value(self.tree_path),
+                    Substr("tree_path", len(old_path) + 1),
+                    output_field=models.CharField(),
+                )
+            )
+        super(Category, self).save(*args, **kwargs)
+
 
 class CategoryPlugin(CMSPlugin):
     """
@@ -107,9 +221,309 @@ class CategoryPlugin(CMSPlugin):
     )
 
 
-class NewsEntryManager(TranslationManager):
+class CountManagerMixin(object):
+    """Mixin for the managers of denormalized counts."""
+
+    def sync_counts(self, queryset, fields, counts):
+        """
+        Makes the rows in ``queryset`` match ``counts``.
+
+        Changed rows are updated in place, so readers never see a missing
+        count, and new rows are created with ``update_or_create``, which
+        copes with a concurrent insert of the same row. Call it inside of a
+        transaction.
+
+        :param fields: The names of the fields, that identify a row.
+        :param counts: A dict, that maps tuples of the values of ``fields``
+          to the count.
+
+        """
+        existing = dict(
+            (row[:-1], row[-1]) for row in queryset.values_list(*fields, "count")
+        )
+        stale = models.Q()
+        for key in existing:
+            if key not in counts:
+                stale |= models.Q(**dict(zip(fields, key)))
+        if stale:
+            queryset.filter(stale).delete()
+        for key, count in counts.items():
+            if existing.get(key) != count:
+                self.update_or_create(defaults={"count": count}, **dict(zip(fields, key)))
+
+
+class CategoryEntryCountManager(CountManagerMixin, models.Manager):
+    """Custom manager for the ``CategoryEntryCount`` model."""
+
+    def update_counts(self, categories=None):
+        """
+        Recounts the published entries of the given categories.
+
+        As the counts include descendant categories, the ancestors of the
+        given categories are recounted as well. Without ``categories`` all
+        counts are rebuilt.
+
+        """
+        if categories is None:
+            self._recount(Category.objects.all())
+        else:
+            self.update_paths(category.tree_path for category in categories)
+
+    def update_paths(self, tree_paths):
+        """Recounts all categories on the given tree paths."""
+        self._recount(Category.objects.filter(pk__in=get_path_pks(tree_paths)))
+
+    def _recount(self, categories):
+        with transaction.atomic():
+            for category in categories:
+                entries = NewsEntry.objects.in_categories([category]).filter(
+                    models.Q(pub_date__lte=now()) | models.Q(pub_date__isnull=True)
+                )
+                counts = (
+                    NewsEntryTranslation.objects.filter(
+                        is_published=True, master__in=entries.values("pk")
+                    )
+                    .values_list("language_code")
+                    .annotate(count=models.Count("pk"))
+                    .order_by()
+                )
+                self.sync_counts(
+                    self.filter(category=category),
+                    ("category_id", "language_code"),
+                    dict(((category.pk, language_code), count)
+                         for language_code, count in counts),
+                )
+
+
+class CategoryEntryCount(models.Model):
+    """
+    The amount of published entries of a category in one language.
+
+    The counts are maintained by the receivers in ``signals.py`` and the
+    ``refresh_news_aggregates`` command, which picks up entries, whose
+    publication date has just passed.
+
+    :category: The category. Entries of its descendants are counted as well.
+    :language_code: The language of the published translations.
+    :count: The amount of published entries.
+
+    """
+
+    category = models.ForeignKey(
+        Category,
+        verbose_name=_("Category"),
+        related_name="entry_counts",
+        on_delete=models.CASCADE,
+    )
+
+    language_code = models.CharField(
+        max_length=15,
+        verbose_name=_("Language"),
+    )
+
+    count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Count"),
+    )
+
+    objects = CategoryEntryCountManager()
+
+    class Meta:
+        unique_together = ("category", "language_code")
+        verbose_name = _("Category entry count")
+        verbose_name_plural = _("Category entry counts")
+
+    def __str__(self):
+        return "{0} ({1}): {2}".format(self.category, self.language_code, self.count)
+
+
+def get_path_pks(tree_paths):
+    """Returns the primary keys of all categories on the given tree paths."""
+    pks = set()
+    for tree_path in tree_paths:
+        pks.update(int(pk) for pk in tree_path.split("/") if pk)
+    return pks
+
+
+def get_rank(score, pub_date, pk):
+    """
+    Returns the sort key of a related entry: the most shared tags and
+    categories first, ties broken by the publication date.
+
+    """
+    return (score, pub_date.timestamp() if pub_date else float("-inf"), pk)
+
+
+def is_multivalued(model, lookup):
+    """
+    Returns True, if the given lookup spans a multi-valued relation.
+
+    Filtering across such a relation joins one row per related object, which
+    would duplicate entries in the result.
+
+    """
+    opts = model._meta
+    for name in lookup.split(LOOKUP_SEP):
+        try:
+            field = opts.get_field(name)
+        except FieldDoesNotExist:
+            # the remaining parts are lookups like ``in`` or ``isnull``
+            break
+        if field.many_to_many or field.one_to_many:
+            return True
+        if not field.is_relation:
+            break
+        opts = field.related_model._meta
+    return False
+
+
+def translations_prefetch(model, language=None, lookup="translations"):
+    """
+    Returns a ``Prefetch`` for the translations of ``model``.
+
+    Only the given (or active) language and its fallbacks are fetched, which
+    are all parler needs to resolve translated fields.
+
+    """
+    return models.Prefetch(
+        lookup,
+        queryset=model._parler_meta.root_model.objects.filter(
+            language_code__in=get_active_language_choices(language)
+        ),
+    )
+
+
+class NewsEntryQuerySet(TranslatableQuerySet):
+    """Custom queryset for the ``NewsEntry`` model."""
+
+    def in_categories(self, categories):
+        """
+        Returns the entries in any of the given categories or their
+        descendants.
+
+        """
+        condition = None
+        for category in categories:
+            tree_filter = Category.get_tree_filter(category.tree_path, "category__")
+            condition = tree_filter if condition is None else condition | tree_filter
+        if condition is None:
+            return self.none()
+        subquery = NewsEntry.categories.through.objects.filter(
+            condition, newsentry=models.OuterRef("pk")
+        )
+        return self.annotate(_in_categories=models.Exists(subquery)).filter(
+            _in_categories=True
+        )
+
+    def tagged(self, tags, match_all=True):
+        """
+        Returns the entries, that have all (or with ``match_all=False`` any)
+        of the given tags.
+
+        ``tags`` are ``Tag`` instances or primary keys. The tags of an entry
+        are checked with one correlated ``EXISTS``, that is answered from the
+        unique ``(content_type, object_id, tag)`` index of ``TaggedItem``.
+
+        """
+        tag_ids = set(getattr(tag, "pk", tag) for tag in tags)
+        if not tag_ids:
+            return self.none()
+        subquery = TaggedItem.objects.filter(
+            content_type=ContentType.objects.get_for_model(NewsEntry),
+            object_id=models.OuterRef("pk"),
+            tag__in=tag_ids,
+        )
+        if match_all and len(tag_ids) > 1:
+            subquery = (
+                subquery.values("object_id")
+                .annotate(_tag_count=models.Count("tag"))
+                .filter(_tag_count=len(tag_ids))
+            )
+        return self.annotate(_tagged=models.Exists(subquery)).filter(_tagged=True)
+
+    def tag_counts(self, language=None):
+        """
+        Returns the tags of the entries, most used first, with the amount of
+        entries, that have them, as ``entry_count``.
+
+        """
+        language = language or self._language or get_language()
+        return (
+            Tag.objects.filter(
+                tagged_items__content_type=ContentType.objects.get_for_model(
+                    NewsEntry
+                ),
+                tagged_items__object_id__in=self.order_by().values("pk"),
+            )
+            .annotate(entry_count=models.Count("tagged_items"))
+            .order_by("-entry_count", "slug")
+            .prefetch_related(translations_prefetch(Tag, language))
+        )
+
+    def for_listing(self, language=None):
+        """
+        Fetches everything, that is needed to render an entry in a list.
+
+        This covers the translations in the active language, the author,
+        images, placeholders, translated categories and tags, so that the
+        amount of queries doesn't grow with the amount of entries.
+
+        """
+        language = language or self._language or get_language()
+        categories = Category.objects.prefetch_related(
+            translations_prefetch(Category, language)
+        )
+        tagged_items = TaggedItem.objects.select_related("tag").prefetch_related(
+            translations_prefetch(Tag, language, "tag__translations")
+        )
+        return self.select_related(
+            "author", "image", "thumbnail", "excerpt", "content"
+        ).prefetch_related(
+            translations_prefetch(NewsEntry, language),
+            models.Prefetch("categories", queryset=categories),
+            models.Prefetch("tags", queryset=tagged_items),
+        )
+
+
+class NewsEntryManager(TranslationManager.from_queryset(NewsEntryQuerySet)):
     """Custom manager for the ``NewsEntry`` model."""
 
+    def _filter_exists(self, qs, name, kwargs, negate=False):
+        """
+        Filters ``qs`` by ``kwargs`` without joining multi-valued relations.
+
+        Lookups, that span such relations, are checked with a correlated
+        ``EXISTS`` subquery, so that no entry is returned twice and no
+        ``DISTINCT`` is needed. All other lookups are applied as they are.
+
+        With ``negate=True`` the entries are excluded, that match all lookups
+        together, just like ``exclude(**kwargs)`` does. Therefore all lookups
+        go into one ``NOT EXISTS`` subquery.
+
+        """
+        multivalued = dict(
+            (lookup, value)
+            for lookup, value in kwargs.items()
+            if is_multivalued(self.model, lookup)
+        )
+        if negate and multivalued:
+            multivalued = kwargs
+        simple = dict(
+            (lookup, value)
+            for lookup, value in kwargs.items()
+            if lookup not in multivalued
+        )
+        if simple:
+            qs = qs.exclude(**simple) if negate else qs.filter(**simple)
+        if multivalued:
+            subquery = self.model._base_manager.filter(
+                pk=models.OuterRef("pk"), **multivalued
+            )
+            qs = qs.annotate(**{name: models.Exists(subquery)}).filter(
+                **{name: not negate}
+            )
+        return qs
+
     def published(
         self, check_language=True, language=None, kwargs=None, exclude_kwargs=None
     ):
@@ -118,18 +532,113 @@ class NewsEntryManager(TranslationManager):
         no date and which language matches the current language.
 
         """
+        qs = self.get_queryset()
         if check_language:
-            qs = NewsEntry.objects.language(language or get_language()).translated(
-                is_published=True
+            language = language or get_language()
+            translations = self.model._parler_meta.root_model.objects.filter(
+                master=models.OuterRef("pk"),
+                language_code=language,
+                is_published=True,
             )
-        else:
-            qs = self.get_queryset()
-        qs = qs.filter(models.Q(pub_date__lte=now()) | models.Q(pub_date__isnull=True))
-        if kwargs is not None:
-            qs = qs.filter(**kwargs)
-        if exclude_kwargs is not None:
-            qs = qs.exclude(**exclude_kwargs)
-        return qs.distinct().order_by("-pub_date")
+            qs = (
+                qs.language(language)
+                .annotate(_is_published=models.Exists(translations))
+                .filter(_is_published=True)
+            )
+        # the same as ``pub_date <= now OR pub_date IS NULL``, but without an
+        # OR, which keeps range conditions on the publication date (e.g. of
+        # cursor pages) usable for index order reads
+        qs = qs.exclude(pub_date__gt=now())
+        if kwargs:
+            qs = self._filter_exists(qs, "_matches_kwargs", kwargs)
+        if exclude_kwargs:
+            qs = self._filter_exists(
+                qs, "_matches_exclude_kwargs", exclude_kwargs, negate=True
+            )
+        return qs.order_by("-pub_date")
+
+    def set_published(self, entries, is_published=True, language=None):
+        """
+        Publishes or unpublishes the given entries in one go.
+
+        Only the translations of the given language are changed. Published
+        entries without a publication date get the current time, just like
+        ``NewsEntry.save()`` does. Instead of a ``post_save`` per entry, one
+        ``publication_changed`` signal is sent for all changed entries.
+
+        :param entries: A queryset or a list of primary keys.
+        :param language: Defaults to the current language.
+        :returns: The primary keys of the entries, that were changed.
+
+        """
+        from .signals import publication_changed
+
+        language = language or get_language()
+        translation_model = self.model._parler_meta.root_model
+        if isinstance(entries, models.QuerySet):
+            entries = entries.values("pk")
+        translations = translation_model.objects.filter(
+            master__in=entries, language_code=language
+        )
+        with transaction.atomic():
+            pks = list(
+                translations.exclude(is_published=is_published).values_list(
+                    "master_id", flat=True
+                )
+            )
+            if not pks:
+                return pks
+            modified = now()
+            # entries published without a date are dated now, which moves
+            # them in the related lists of their other languages
+            dated = (
+                list(
+                    self.model._base_manager.filter(
+                        pk__in=pks, pub_date__isnull=True
+                    ).values_list("pk", flat=True)
+                )
+                if is_published
+                else []
+            )
+            translation_model.objects.filter(
+                master__in=pks, language_code=language
+            ).update(is_published=is_published)
+            self.model._base_manager.filter(pk__in=pks).update(
+                pub_date=Coalesce("pub_date", modified)
+                if is_published
+                else models.F("pub_date"),
+                modified=modified,
+            )
+        # the updates bypass the cache, that parler keeps of the translations
+        cache.delete_many(
+            [get_translation_cache_key(translation_model, pk, language) for pk in pks]
+        )
+        publication_changed.send(
+            sender=self.model,
+            pks=pks,
+            language=language,
+            is_published=is_published,
+            dated=dated,
+        )
+        return pks
+
+    def search(self, query, language=None):
+        """
+        Returns the published entries, that match the search query, as
+        ``SearchResults`` ordered by relevance.
+
+        Only the ``SEARCH_LIMIT`` best matches are returned.
+
+        """
+        from .search import SearchResults, get_backend
+
+        language = language or get_language()
+        queryset = self.published(language=language)
+        pks = get_backend().search(query, language, limit=SEARCH_LIMIT)
+        if pks:
+            published = set(queryset.filter(pk__in=pks).values_list("pk", flat=True))
+            pks = [pk for pk in pks if pk in published]
+        return SearchResults(queryset, pks)
 
     def recent(
         self,
@@ -165,6 +674,8 @@ class NewsEntry(TranslatableModel):
     :author: Optional FK to the Person, who created this NewsEntry.
     :category: The optional category this entry belongs to.
     :pub_date: DateTime when this entry should be published.
+    :modified: DateTime of the last change of the entry, one of its
+      translations, placeholders, tags or categories.
     :image: Main image of the blog entry.
     :image_float: Can be set to ``none``, ``left`` or ``right`` to adjust
       floating behaviour in the blog entry template.
@@ -177,6 +688,8 @@ class NewsEntry(TranslatableModel):
     :excerpt: CMS placeholder for ``excerpt``
     :meta_title: the title, that goes into the meta tags.
     :meta_description: the description, that goes into the meta tags.
+    :description: the plain text of the placeholders (see
+      ``get_description``).
 
     """
 
@@ -217,6 +730,24 @@ class NewsEntry(TranslatableModel):
             blank=True,
             null=True,
         ),
+        description=models.TextField(
+            verbose_name=_("Description"),
+            help_text=_("Plain text of the excerpt or content placeholder"),
+            blank=True,
+            editable=False,
+        ),
+        meta={
+            "indexes": [
+                models.Index(
+                    fields=["language_code", "is_published", "master"],
+                    name="news_trans_lang_pub_idx",
+                ),
+                models.Index(
+                    fields=["language_code", "slug"],
+                    name="news_trans_lang_slug_idx",
+                ),
+            ],
+        },
     )
 
     author = models.ForeignKey(
@@ -239,6 +770,11 @@ class NewsEntry(TranslatableModel):
         null=True,
     )
 
+    modified = models.DateTimeField(
+        verbose_name=_("Modified"),
+        auto_now=True,
+    )
+
     image = FilerImageField(
         verbose_name=_("Image"),
         null=True,
@@ -305,6 +841,9 @@ class NewsEntry(TranslatableModel):
 
     class Meta:
         ordering = ("-pub_date",)
+        indexes = [
+            models.Index(fields=["pub_date", "id"], name="news_entry_pub_date_idx"),
+        ]
         verbose_name = _("News Entry")
         verbose_name_plural = _("News Entries")
 
@@ -313,55 +852,116 @@ class NewsEntry(TranslatableModel):
 
     @property
     def category(self):
-        try:
-            return self.categories.all()[0]
-        except IndexError:
-            return None
+        """
+        Returns the first category of the entry or ``None``.
+
+        Prefetched categories (see ``NewsEntryQuerySet.for_listing``) are used
+        without a query. The result is cached on the instance until its
+        categories are changed.
+
+        """
+        if not hasattr(self, "_primary_category"):
+            categories = self.categories.all()[:1]
+            self._primary_category = categories[0] if categories else None
+        return self._primary_category
+
+    def get_related(self, language=None):
+        """
+        Returns the related entries in the given or current language.
+
+        They are read from the ``RelatedEntry`` index, best match first.
+
+        """
+        language = language or get_language()
+        return (
+            NewsEntry.objects.language(language)
+            .filter(
+                related_to_index__entry=self,
+                related_to_index__language_code=language,
+            )
+            .order_by("related_to_index__position")
+        )
 
     def get_absolute_url(self):
-        if self.pub_date and not settings.USE_TZ:
+        return self.get_url(self.slug, self.pub_date)
+
+    @staticmethod
+    def get_url(slug, pub_date=None):
+        """Returns the URL of the entry with the given slug and date."""
+        if pub_date and not settings.USE_TZ:
             # Using timezones can lead to 404
             return reverse(
                 "news_detail",
                 kwargs={
-                    "year": self.pub_date.year,
-                    "month": self.pub_date.month,
-                    "day": self.pub_date.day,
-                    "slug": self.slug,
+                    "year": pub_date.year,
+                    "month": pub_date.month,
+                    "day": pub_date.day,
+                    "slug": slug,
                 },
             )
-        return reverse("news_detail", kwargs={"slug": self.slug})
+        return reverse("news_detail", kwargs={"slug": slug})
+
+    def get_text_plugins(self, language=None):
+        """
+        Returns the text plugins of the excerpt and content placeholders
+        together with their text in one query.
+
+        """
+        placeholder_ids = [pk for pk in (self.excerpt_id, self.content_id) if pk]
+        if not placeholder_ids:
+            return []
+        qs = CMSPlugin.objects.filter(
+            placeholder_id__in=placeholder_ids, plugin_type="TextPlugin"
+        )
+        if language:
+            qs = qs.filter(language=language)
+        return qs.select_related("djangocms_text_ckeditor_text").order_by("path")
 
-    def get_description(self):
+    def get_description(self, language=None, plugins=None):
         """
         Returns the first available text from either the excerpt or
         content placeholder.
 
+        The result is stored as ``description`` on the translation, so use
+        that instead of calling this method while rendering.
+
+        :param plugins: Optional text plugins as returned by
+          ``get_text_plugins``. If given, no query is needed.
+
         """
-        content = ""
-        for plugin in self.excerpt.get_plugins():
-            if (
-                plugin.plugin_type == "TextPlugin"
-                and plugin.djangocms_text_ckeditor_text.language == get_language()
-            ):
-                content = plugin.djangocms_text_ckeditor_text.body
-            if content:
-                break
-        if not content:
-            for plugin in self.content.get_plugins():
-                if (
-                    plugin.plugin_type == "TextPlugin"
-                    and plugin.djangocms_text_ckeditor_text.language == get_language()
-                ):
-                    content = plugin.djangocms_text_ckeditor_text.body
-                if content:
-                    break
-
-        # remove html tags and escape the rest
-        pattern = re.compile("<.*?>")
-        content = pattern.sub("", content)
-        text = escape(content)
-        return text
+        language = language or get_language()
+        if plugins is None:
+            plugins = self.get_text_plugins(language)
+        bodies = {}
+        for plugin in plugins:
+            if plugin.language != language or plugin.placeholder_id in bodies:
+                continue
+            try:
+                body = plugin.djangocms_text_ckeditor_text.body
+            except ObjectDoesNotExist:
+                continue
+            if body:
+                bodies[plugin.placeholder_id] = body
+        content = bodies.get(self.excerpt_id) or bodies.get(self.content_id) or ""
+
+        # remove html tags and entities, the text is escaped on output
+        return unescape(strip_tags(content))
+
+    def update_description(self, language=None):
+        """Updates the stored description of the given translation."""
+        language = language or self.get_current_language()
+        description = self.get_description(language)
+        modified = now()
+        NewsEntryTranslation.objects.filter(
+            master=self, language_code=language
+        ).update(description=description)
+        NewsEntry.objects.filter(pk=self.pk).update(modified=modified)
+        self.modified = modified
+        # the update bypasses the cache, that parler keeps of the translation
+        cache.delete(get_translation_cache_key(
+            NewsEntryTranslation, self.pk, language))
+        if self.has_translation(language):
+            self.get_translation(language).description = description
 
     def get_preview_url(self):
         slug = self.slug
@@ -378,12 +978,437 @@ class NewsEntry(TranslatableModel):
         try:
             if self.is_published and self.pub_date is None:
                 self.pub_date = now()
+            self.description = self.get_description(self.get_current_language())
         except AttributeError:
             # If there's no translation, go on
             pass
         super(NewsEntry, self).save(*args, **kwargs)
 
 
+NewsEntryTranslation = NewsEntry._parler_meta.root_model
+
+
+class SearchDocument(models.Model):
+    """
+    The searchable text of an entry in one language.
+
+    The documents are maintained by the receivers in ``signals.py`` and the
+    ``rebuild_news_search_index`` command. Depending on the database, they
+    are indexed by an FTS5 table or a ``tsvector`` column (see ``search.py``).
+
+    :entry: The news entry.
+    :language_code: The language of the translation.
+    :title: The title and meta title.
+    :text: The meta description and the text of the placeholders.
+
+    """
+
+    entry = models.ForeignKey(
+        NewsEntry,
+        verbose_name=_("Entry"),
+        related_name="search_documents",
+        on_delete=models.CASCADE,
+    )
+
+    language_code = models.CharField(
+        max_length=15,
+        verbose_name=_("Language"),
+    )
+
+    title = models.TextField(
+        verbose_name=_("Title"),
+        blank=True,
+    )
+
+    text = models.TextField(
+        verbose_name=_("Text"),
+        blank=True,
+    )
+
+    class Meta:
+        unique_together = ("entry", "language_code")
+        verbose_name = _("Search document")
+        verbose_name_plural = _("Search documents")
+
+    def __str__(self):
+        return "{0} ({1})".format(self.title, self.language_code)
+
+
+class RelatedEntryManager(models.Manager):
+    """Manager, that maintains the ``RelatedEntry`` index."""
+
+    def get_neighbours(self, entry_pks):
+        """
+        Returns the primary keys of the entries, whose related entries might
+        change, when the given entries change.
+
+        These are the entries, that share a tag or category with the given
+        entries or currently list one of them as related.
+
+        """
+        content_type = ContentType.objects.get_for_model(NewsEntry)
+        through = NewsEntry.categories.through
+        tags = TaggedItem.objects.filter(
+            content_type=content_type, object_id__in=entry_pks
+        ).values("tag_id")
+        categories = through.objects.filter(newsentry_id__in=entry_pks).values(
+            "category_id"
+        )
+        pks = set(
+            TaggedItem.objects.filter(
+                content_type=content_type, tag_id__in=tags
+            ).values_list("object_id", flat=True)
+        )
+        pks.update(
+            through.objects.filter(category_id__in=categories).values_list(
+                "newsentry_id", flat=True
+            )
+        )
+        pks.update(
+            self.filter(related_id__in=entry_pks).values_list("entry_id", flat=True)
+        )
+        return pks
+
+    def get_scores(self, entry_pk):
+        """
+        Returns a ``Counter`` of the amount of shared tags and categories of
+        all other entries with the given entry.
+
+        """
+        content_type = ContentType.objects.get_for_model(NewsEntry)
+        through = NewsEntry.categories.through
+        tags = TaggedItem.objects.filter(
+            content_type=content_type, object_id=entry_pk
+        ).values("tag_id")
+        categories = through.objects.filter(newsentry_id=entry_pk).values(
+            "category_id"
+        )
+        scores = Counter(
+            TaggedItem.objects.filter(content_type=content_type, tag_id__in=tags)
+            .exclude(object_id=entry_pk)
+            .values_list("object_id", flat=True)
+        )
+        scores.update(
+            through.objects.filter(category_id__in=categories)
+            .exclude(newsentry_id=entry_pk)
+            .values_list("newsentry_id", flat=True)
+        )
+        return scores
+
+    def update_related(self, entry_pks, neighbours=True):
+        """
+        Rebuilds the related entries of the given entries.
+
+        :param neighbours: If ``True``, the given entries are also inserted
+          into or evicted from the related entries of the entries returned by
+          ``get_neighbours``. Only the scores of pairs with a given entry can
+          have changed, so the other related entries stay as they are. A list
+          is only rebuilt, if the given entry drops out of it or down while
+          it is full, as the next best entry is not known. The publication
+          dates of the given entries must not have changed, see
+          ``rebuild_related``.
+
+        """
+        for entry_pk in set(entry_pks):
+            scores = self.get_scores(entry_pk)
+            self._update_entry(entry_pk, scores)
+            if neighbours:
+                self._update_neighbours(entry_pk, scores)
+
+    def rebuild_related(self, entry_pks):
+        """
+        Rebuilds the related entries of the given entries and of all entries
+        returned by ``get_neighbours``.
+
+        This is needed after the publication date of an entry changed. Its
+        stored rank in the lists of the neighbours was based on the old date,
+        so they can't be updated incrementally.
+
+        """
+        entry_pks = set(entry_pks)
+        if entry_pks:
+            entry_pks.update(self.get_neighbours(entry_pks))
+        self.update_related(entry_pks, neighbours=False)
+
+    def _update_neighbours(self, entry_pk, scores):
+        neighbour_pks = self.get_neighbours([entry_pk])
+        neighbour_pks.discard(entry_pk)
+        if not neighbour_pks:
+            return
+        pub_date = (
+            NewsEntry.objects.filter(pk=entry_pk).values_list("pub_date", flat=True)
+        ).first()
+        languages = set()
+        if pub_date is None or pub_date <= now():
+            languages.update(
+                NewsEntryTranslation.objects.filter(
+                    master_id=entry_pk, is_published=True
+                ).values_list("language_code", flat=True)
+            )
+        rankings = dict(
+            (key, [])
+            for key in NewsEntryTranslation.objects.filter(
+                master_id__in=neighbour_pks
+            ).values_list("master_id", "language_code")
+        )
+        # the lists in their stored order
+        for neighbour_pk, language, related_pk, score, related_pub_date in (
+            self.filter(entry_id__in=neighbour_pks)
+            .order_by("position")
+            .values_list(
+                "entry_id", "language_code", "related_id", "score", "related__pub_date"
+            )
+        ):
+            rankings.setdefault((neighbour_pk, language), []).append(
+                get_rank(score, related_pub_date, related_pk)
+            )
+        changed, rebuild, related_entries = models.Q(), set(), []
+        for (neighbour_pk, language), old_ranking in rankings.items():
+            ranking = [rank for rank in old_ranking if rank[2] != entry_pk]
+            old_rank = next(
+                (rank for rank in old_ranking if rank[2] == entry_pk), None
+            )
+            new_rank = None
+            if scores[neighbour_pk] and language in languages:
+                new_rank = get_rank(scores[neighbour_pk], pub_date, entry_pk)
+                ranking = heapq.nlargest(RELATED_AMOUNT, ranking + [new_rank])
+            if ranking == old_ranking:
+                continue
+            if (
+                old_rank
+                and len(old_ranking) >= RELATED_AMOUNT
+                and (new_rank is None or new_rank < old_rank)
+            ):
+                rebuild.add(neighbour_pk)
+                continue
+            changed |= models.Q(entry_id=neighbour_pk, language_code=language)
+            related_entries.extend(
+                self.model(
+                    entry_id=neighbour_pk,
+                    related_id=related_pk,
+                    language_code=language,
+                    score=score,
+                    position=position,
+                )
+                for position, (score, timestamp, related_pk) in enumerate(ranking)
+            )
+        if changed:
+            with transaction.atomic():
+                self.filter(changed).delete()
+                self.bulk_create(related_entries)
+        for neighbour_pk in rebuild:
+            self._update_entry(neighbour_pk)
+
+    def _update_entry(self, entry_pk, scores=None):
+        if scores is None:
+            scores = self.get_scores(entry_pk)
+        by_language = {}
+        if scores:
+            languages = NewsEntryTranslation.objects.filter(
+                master_id=entry_pk
+            ).values("language_code")
+            candidates = (
+                NewsEntryTranslation.objects.filter(
+                    master_id__in=scores.keys(),
+                    language_code__in=languages,
+                    is_published=True,
+                )
+                .filter(
+                    models.Q(master__pub_date__lte=now())
+                    | models.Q(master__pub_date__isnull=True)
+                )
+                .values_list("language_code", "master_id", "master__pub_date")
+            )
+            for language, related_pk, pub_date in candidates:
+                by_language.setdefault(language, []).append(
+                    get_rank(scores[related_pk], pub_date, related_pk)
+                )
+        related_entries = []
+        for language, candidates in by_language.items():
+            for position, (score, timestamp, related_pk) in enumerate(
+                heapq.nlargest(RELATED_AMOUNT, candidates)
+            ):
+                related_entries.append(
+                    self.model(
+                        entry_id=entry_pk,
+                        related_id=related_pk,
+                        language_code=language,
+                        score=score,
+                        position=position,
+                    )
+                )
+        with transaction.atomic():
+            self.filter(entry_id=entry_pk).delete()
+            self.bulk_create(related_entries)
+
+
+class RelatedEntry(models.Model):
+    """
+    An entry, that is related to another entry in one language.
+
+    For each entry and language the ``NEWS_RELATED_AMOUNT`` published entries
+    with the most shared tags and categories are stored. Ties are broken by
+    the publication date. The index is maintained by the receivers in
+    ``signals.py`` and the ``refresh_news_aggregates`` command.
+
+    :entry: The entry, that the related entries are shown for.
+    :related: The related entry.
+    :language_code: The language of the published translations.
+    :score: The amount of shared tags and categories.
+    :position: The position of the related entry, starting at 0.
+
+    """
+
+    entry = models.ForeignKey(
+        NewsEntry,
+        verbose_name=_("Entry"),
+        related_name="related_index",
+        on_delete=models.CASCADE,
+    )
+
+    related = models.ForeignKey(
+        NewsEntry,
+        verbose_name=_("Related entry"),
+        related_name="related_to_index",
+        on_delete=models.CASCADE,
+    )
+
+    language_code = models.CharField(
+        max_length=15,
+        verbose_name=_("Language"),
+    )
+
+    score = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Score"),
+    )
+
+    position = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Position"),
+    )
+
+    objects = RelatedEntryManager()
+
+    class Meta:
+        ordering = ("position",)
+        unique_together = ("entry", "related", "language_code")
+        index_together = ("entry", "language_code", "position")
+        verbose_name = _("Related entry")
+        verbose_name_plural = _("Related entries")
+
+    def __str__(self):
+        return "{0} -> {1} ({2})".format(
+            self.entry_id, self.related_id, self.language_code
+        )
+
+
+def get_month(pub_date):
+    """Returns the ``(year, month)`` of a publication date in local time."""
+    if settings.USE_TZ:
+        pub_date = localtime(pub_date)
+    return pub_date.year, pub_date.month
+
+
+class ArchiveEntryCountManager(CountManagerMixin, models.Manager):
+    """Custom manager for the ``ArchiveEntryCount`` model."""
+
+    def update_counts(self, months=None):
+        """
+        Recounts the published entries of the given months.
+
+        :param months: An iterable of ``(year, month)`` tuples. Without it,
+          all counts are rebuilt.
+
+        """
+        translations = NewsEntryTranslation.objects.filter(
+            is_published=True, master__pub_date__lte=now()
+        ).annotate(
+            year=ExtractYear("master__pub_date"),
+            month=ExtractMonth("master__pub_date"),
+        )
+        counts = self.all()
+        if months is not None:
+            months = set(months)
+            if not months:
+                return
+            condition = models.Q()
+            for year, month in months:
+                condition |= models.Q(year=year, month=month)
+            counts = counts.filter(condition)
+            translations = translations.filter(condition)
+        rows = (
+            translations.values_list("language_code", "year", "month")
+            .annotate(count=models.Count("pk"))
+            .order_by()
+        )
+        with transaction.atomic():
+            self.sync_counts(
+                counts,
+                ("language_code", "year", "month"),
+                dict(((language_code, year, month), count)
+                     for language_code, year, month, count in rows),
+            )
+
+    def update_entries(self, entries):
+        """Recounts the months of the given entries."""
+        self.update_counts(
+            get_month(entry.pub_date) for entry in entries if entry.pub_date
+        )
+
+
+class ArchiveEntryCount(models.Model):
+    """
+    The amount of published entries of a month in one language.
+
+    The counts back the archive views and the ``get_news_archive`` tag. They
+    are maintained by the receivers in ``signals.py`` and the
+    ``refresh_news_aggregates`` command. Entries without a publication date
+    are not part of the archive.
+
+    :language_code: The language of the published translations.
+    :year: The year of the publication date.
+    :month: The month of the publication date.
+    :count: The amount of published entries.
+
+    """
+
+    language_code = models.CharField(
+        max_length=15,
+        verbose_name=_("Language"),
+    )
+
+    year = models.PositiveIntegerField(
+        verbose_name=_("Year"),
+    )
+
+    month = models.PositiveIntegerField(
+        verbose_name=_("Month"),
+    )
+
+    count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Count"),
+    )
+
+    objects = ArchiveEntryCountManager()
+
+    class Meta:
+        ordering = ("-year", "-month")
+        unique_together = ("language_code", "year", "month")
+        verbose_name = _("Archive entry count")
+        verbose_name_plural = _("Archive entry counts")
+
+    def __str__(self):
+        return "{0}-{1:02d} ({2}): {3}".format(
+            self.year, self.month, self.language_code, self.count
+        )
+
+    @property
+    def date(self):
+        return date(self.year, self.month, 1)
+
+
 class RecentPlugin(CMSPlugin):
     """Plugin model to display recent news."""
 
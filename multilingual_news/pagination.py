@@ -0,0 +1,187 @@
+"""Keyset (cursor) pagination for the ``multilingual_news`` app."""
+import base64
+import binascii
+
+from django.http import Http404
+from django.utils.dateparse import parse_datetime
+
+from .app_settings import PAGINATION_MODE
+
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class InvalidCursor(ValueError):
+    """Raised, when a cursor token can't be decoded."""
+    pass
+
+
+def encode_cursor(entry, direction=NEXT):
+    """
+    Returns an opaque token, that points to the given entry.
+
+    The token is keyed on ``(pub_date, pk)``, which is the order, in which
+    entries are listed.
+
+    """
+    return make_cursor(entry.pub_date, entry.pk, direction)
+
+
+def make_cursor(pub_date, pk, direction=NEXT):
+    """
+    Returns the token of ``encode_cursor`` for the given values, e.g. of a
+    ``values()`` row.
+
+    """
+    pub_date = pub_date.isoformat() if pub_date else ''
+    value = u'{0}|{1}|{2}'.format(direction, pub_date, pk)
+    token = base64.urlsafe_b64encode(value.encode('utf-8'))
+    return token.decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Returns a ``(direction, pub_date, pk)`` tuple for the given token.
+
+    Raises ``InvalidCursor`` for tokens, that were not created by
+    ``encode_cursor``.
+
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        value = base64.urlsafe_b64decode(padded.encode('ascii'))
+        direction, pub_date, pk = value.decode('utf-8').split('|')
+        pk = int(pk)
+    except (binascii.Error, UnicodeError, ValueError, TypeError):
+        raise InvalidCursor(token)
+    if direction not in (NEXT, PREVIOUS):
+        raise InvalidCursor(token)
+    if pub_date:
+        try:
+            pub_date = parse_datetime(pub_date)
+        except ValueError:
+            pub_date = None
+        if pub_date is None:
+            raise InvalidCursor(token)
+    else:
+        pub_date = None
+    return direction, pub_date, pk
+
+
+def order(queryset, reverse=False):
+    """
+    Orders the queryset by ``(pub_date, pk)``.
+
+    The order matches the ``news_entry_pub_date_idx`` index, so pages are read
+    in index order without sorting the whole result. Entries without a
+    publication date can't be sought to and are therefore not listed.
+    ``NewsEntry.save()`` sets the date, when an entry is published.
+
+    """
+    queryset = queryset.filter(pub_date__isnull=False)
+    if reverse:
+        return queryset.order_by('pub_date', 'pk')
+    return queryset.order_by('-pub_date', '-pk')
+
+
+def seek(queryset, pub_date, pk, reverse=False):
+    """
+    Returns the entries, that are listed after the given position.
+
+    With ``reverse=True`` the entries before the given position are returned
+    instead. This only adds a range condition on ``(pub_date, pk)`` and
+    therefore costs the same, no matter how deep the position is. The
+    condition is written without an OR, so that it stays an index range.
+
+    """
+    if pub_date is None:
+        return queryset.none()
+    if reverse:
+        queryset = queryset.filter(pub_date__gte=pub_date).exclude(
+            pub_date=pub_date, pk__lte=pk)
+    else:
+        queryset = queryset.filter(pub_date__lte=pub_date).exclude(
+            pub_date=pub_date, pk__gte=pk)
+    return order(queryset, reverse=reverse)
+
+
+class CursorPage(object):
+    """
+    A page of entries, that was fetched by seeking to a cursor.
+
+    Unlike Django's ``Page`` it doesn't know the total amount of entries, so
+    no ``COUNT`` query is needed.
+
+    """
+    paginator = None
+
+    def __init__(self, queryset, per_page, token=None):
+        direction, pub_date, pk = NEXT, None, None
+        if token:
+            direction, pub_date, pk = decode_cursor(token)
+        reverse = direction == PREVIOUS
+        if pk is None:
+            qs = order(queryset)
+        else:
+            qs = seek(queryset, pub_date, pk, reverse=reverse)
+        object_list = list(qs[:per_page + 1])
+        has_more = len(object_list) > per_page
+        object_list = object_list[:per_page]
+        if reverse:
+            object_list.reverse()
+            self._has_next, self._has_previous = True, has_more
+        else:
+            self._has_next, self._has_previous = has_more, pk is not None
+        self.object_list = object_list
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def next_cursor(self):
+        if self.has_next() and self.object_list:
+            return encode_cursor(self.object_list[-1], NEXT)
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous() and self.object_list:
+            return encode_cursor(self.object_list[0], PREVIOUS)
+        return None
+
+
+class CursorPaginationMixin(object):
+    """
+    Mixin for a ``ListView``, that paginates with cursors, if enabled.
+
+    Set ``pagination_mode`` to ``'cursor'`` or use the
+    ``NEWS_PAGINATION_MODE`` setting to enable it. The current position is
+    read from the ``cursor`` GET parameter.
+
+    """
+    cursor_kwarg = 'cursor'
+    pagination_mode = PAGINATION_MODE
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.pagination_mode != 'cursor':
+            return super(CursorPaginationMixin, self).paginate_queryset(
+                queryset, page_size)
+        try:
+            page = CursorPage(
+                queryset, page_size, self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            raise Http404
+        return (None, page, page.object_list, page.has_other_pages())
@@ -0,0 +1,344 @@
+"""
+A response cache for the views of the ``multilingual_news`` app.
+
+Every cached response records the versions of the dependencies, that were
+current when it was rendered, e.g. ``'entry:12'`` for a detail page or
+``'category:3'`` for a category archive. A dependency is invalidated by
+giving it a new version, which turns all responses, that depend on it, into
+cache misses.
+
+"""
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db.models import Min
+from django.http import HttpResponse
+from django.utils.timezone import now, timedelta
+from django.utils.translation import get_language
+
+from multilingual_tags.models import TaggedItem
+
+from .app_settings import (
+    FEED_STORE_TIMEOUT,
+    RECENT_NEWS_CACHE_TIMEOUT,
+    RESPONSE_CACHE_TIMEOUT,
+)
+from .models import Category, NewsEntry
+
+
+RESPONSE_KEY = 'multilingual_news:response:{0}'
+VERSION_KEY = 'multilingual_news:version:{0}'
+GENERATION_KEY = 'multilingual_news:generation:{0}'
+# ``(checked, next_pub_date)``: the time of the last check for entries, that
+# were published by reaching their publication date, and the date of the
+# next one
+SCHEDULE_KEY = 'multilingual_news:schedule'
+
+# the dependency of all responses, that list entries of the whole site
+ENTRIES = 'entries'
+# the dependency of all responses, that depend on the category tree
+CATEGORIES = 'categories'
+
+# the generation, that changes with the entries of every language
+ALL_LANGUAGES = 'all'
+
+# cache backends, that aren't shared by the processes of a site
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.dummy.DummyCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+def entry_dependency(pk):
+    return 'entry:{0}'.format(pk)
+
+
+def category_dependency(pk):
+    return 'category:{0}'.format(pk)
+
+
+def tag_dependency(pk):
+    return 'tag:{0}'.format(pk)
+
+
+def author_dependency(pk):
+    return 'author:{0}'.format(pk)
+
+
+def is_enabled():
+    return bool(RESPONSE_CACHE_TIMEOUT)
+
+
+def is_tracking():
+    """
+    Returns True, if the versions of the dependencies are needed by the
+    response cache, the feed store (see ``feed_store``) or the cache of the
+    ``get_recent_news`` tag.
+
+    """
+    return bool(RESPONSE_CACHE_TIMEOUT or FEED_STORE_TIMEOUT
+                or RECENT_NEWS_CACHE_TIMEOUT)
+
+
+def is_shared_cache():
+    """
+    Returns True, if the default cache is shared by all processes, so that
+    they all see the same news generation.
+
+    """
+    backend = settings.CACHES.get('default', {}).get('BACKEND')
+    return backend not in LOCAL_CACHE_BACKENDS
+
+
+def is_cacheable(request):
+    return is_enabled() and request.method in ('GET', 'HEAD')
+
+
+def get_response_key(request):
+    """
+    Returns the cache key of the response to the given request.
+
+    Staff members see unpublished entries, so they get responses of their
+    own.
+
+    """
+    user = getattr(request, 'user', None)
+    is_staff = bool(user and (user.is_staff or user.is_superuser))
+    value = u'{0}|{1}|{2}'.format(
+        request.build_absolute_uri(), get_language(),
+        'staff' if is_staff else 'anonymous')
+    return RESPONSE_KEY.format(
+        hashlib.md5(value.encode('utf-8')).hexdigest())
+
+
+def get_versions(dependencies):
+    """
+    Returns the current versions of the given dependencies.
+
+    Missing versions are created, so that they can be invalidated later on.
+
+    """
+    keys = [VERSION_KEY.format(dependency) for dependency in dependencies]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            cache.add(key, uuid.uuid4().hex, None)
+        versions.update(cache.get_many(missing))
+    return versions
+
+
+def invalidate(dependencies):
+    """Invalidates all responses, that depend on the given dependencies."""
+    if not is_tracking() or not dependencies:
+        return
+    cache.set_many(dict(
+        (VERSION_KEY.format(dependency), uuid.uuid4().hex)
+        for dependency in set(dependencies)), None)
+
+
+def new_generation():
+    # a counter, that was evicted, must not start with a value, that was used
+    # before
+    return int(time.time() * 1000)
+
+
+def get_generation(language=None):
+    """
+    Returns the news generation of the given language or, without a
+    language, of all languages.
+
+    The generation is a counter, that is increased, whenever an entry is
+    published, unpublished, saved or deleted, or reaches its publication
+    date. Cache keys, that contain it, therefore never return stale entries.
+
+    """
+    invalidate_scheduled()
+    key = GENERATION_KEY.format(language or ALL_LANGUAGES)
+    generation = new_generation()
+    if cache.add(key, generation, None):
+        return generation
+    return cache.get(key, generation)
+
+
+def bump_generation(languages=None):
+    """
+    Increases the news generation of the given languages or, by default, of
+    all languages.
+
+    Unlike the versions of the dependencies the generation is always
+    maintained, because the ``ETag`` of the list view is built from it, if
+    the default cache is shared (see ``is_shared_cache``).
+
+    """
+    if languages is None:
+        languages = [code for code, name in settings.LANGUAGES]
+    for language in set(languages) | set([ALL_LANGUAGES]):
+        key = GENERATION_KEY.format(language)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, new_generation(), None)
+
+
+def get_entry_dependencies(entry_pks):
+    """
+    Returns the dependencies of all responses, that show one of the given
+    entries.
+
+    This covers the archives of their categories and the ancestors of these,
+    their tags and their authors, with one query each.
+
+    """
+    if not is_tracking():
+        return set()
+    entry_pks = list(entry_pks)
+    dependencies = set([ENTRIES])
+    dependencies.update(entry_dependency(pk) for pk in entry_pks)
+    for tree_path in Category.objects.filter(
+            newsentries__pk__in=entry_pks).values_list('tree_path', flat=True):
+        dependencies.update(get_category_dependencies(tree_path))
+    dependencies.update(tag_dependency(pk) for pk in TaggedItem.objects.filter(
+        content_type=ContentType.objects.get_for_model(NewsEntry),
+        object_id__in=entry_pks).values_list('tag_id', flat=True))
+    dependencies.update(
+        author_dependency(pk) for pk in NewsEntry.objects.filter(
+            pk__in=entry_pks, author__isnull=False).values_list(
+                'author_id', flat=True))
+    return dependencies
+
+
+def get_category_dependencies(tree_path):
+    """Returns the dependencies of a category and its ancestors."""
+    return set(
+        category_dependency(pk) for pk in tree_path.split('/') if pk)
+
+
+def invalidate_entries(entry_pks):
+    """Invalidates all responses, that show one of the given entries."""
+    invalidate(get_entry_dependencies(entry_pks))
+
+
+def schedule(pub_date):
+    """
+    Makes sure, that the responses are invalidated, when an entry reaches
+    the given publication date.
+
+    """
+    if pub_date is None or pub_date <= now():
+        return
+    value = cache.get(SCHEDULE_KEY)
+    if value is not None and (value[1] is None or pub_date < value[1]):
+        cache.set(SCHEDULE_KEY, (value[0], pub_date), None)
+
+
+def invalidate_scheduled():
+    """
+    Invalidates the responses, that show entries, which reached their
+    publication date since the last check, and increases the news generation.
+
+    Usually only one cache lookup is needed to know, that no entry is due.
+    If the last check is not known, all entries are checked, that might have
+    been published during the lifetime of a cached response.
+
+    """
+    current = now()
+    value = cache.get(SCHEDULE_KEY)
+    if value is not None and (value[1] is None or value[1] > current):
+        return
+    if value is None:
+        checked = current - timedelta(
+            seconds=max(RESPONSE_CACHE_TIMEOUT, FEED_STORE_TIMEOUT,
+                        RECENT_NEWS_CACHE_TIMEOUT))
+    else:
+        checked = value[0]
+    pks = list(NewsEntry.objects.filter(
+        pub_date__gt=checked, pub_date__lte=current).values_list(
+            'pk', flat=True))
+    if pks:
+        invalidate_entries(pks)
+        bump_generation()
+    next_pub_date = NewsEntry.objects.filter(pub_date__gt=current).aggregate(
+        next_pub_date=Min('pub_date'))['next_pub_date']
+    cache.set(SCHEDULE_KEY, (current, next_pub_date), None)
+
+
+def get_response(key):
+    """Returns the cached response, if none of its dependencies changed."""
+    invalidate_scheduled()
+    value = cache.get(key)
+    if value is None:
+        return None
+    content, status, headers, versions = value
+    if cache.get_many(list(versions.keys())) != versions:
+        return None
+    response = HttpResponse(content, status=status)
+    for header, header_value in headers:
+        response[header] = header_value
+    return response
+
+
+def set_response(key, request, response, dependencies):
+    """
+    Stores the response, unless it is specific to the user.
+
+    Responses, that contain a CSRF token or set cookies, are never stored.
+
+    """
+    if (response.status_code != 200 or response.streaming
+            or response.cookies or request.META.get('CSRF_COOKIE_USED')):
+        return
+    value = (response.content, response.status_code, list(response.items()),
+             get_versions(dependencies))
+    cache.set(key, value, RESPONSE_CACHE_TIMEOUT)
+
+
+def cache_response(view, get_dependencies):
+    """
+    Returns a wrapper for ``view``, that caches its responses.
+
+    ``get_dependencies`` is called with the rendered response and returns the
+    dependencies of it.
+
+    """
+    def wrapper(request, *args, **kwargs):
+        if not is_cacheable(request):
+            return view(request, *args, **kwargs)
+        key = get_response_key(request)
+        response = get_response(key)
+        if response is not None:
+            return response
+        response = view(request, *args, **kwargs)
+
+        def store(response):
+            set_response(key, request, response, get_dependencies(response))
+
+        if getattr(response, 'is_rendered', True):
+            store(response)
+        else:
+            response.add_post_render_callback(store)
+        return response
+    return wrapper
+
+
+class CachedResponseMixin(object):
+    """
+    Mixin for a view, that caches its responses, if the
+    ``NEWS_RESPONSE_CACHE_TIMEOUT`` setting is set.
+
+    Override ``get_cache_dependencies`` to return the dependencies of a
+    rendered response.
+
+    """
+    def get_cache_dependencies(self, response):
+        return [ENTRIES]
+
+    def dispatch(self, request, *args, **kwargs):
+        view = cache_response(
+            super(CachedResponseMixin, self).dispatch,
+            self.get_cache_dependencies)
+        return view(request, *args, **kwargs)
@@ -0,0 +1,227 @@
+"""Full text search for the ``multilingual_news`` app."""
+from html import unescape
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection
+from django.db.models import Q
+from django.utils.html import strip_tags
+
+from cms.models import CMSPlugin
+
+from .app_settings import SEARCH_CONFIGS
+from .models import SearchDocument
+
+
+FTS_TABLE = 'multilingual_news_searchdocument_fts'
+
+# whether the FTS5 table exists, by database name
+_has_fts_table = {}
+
+
+def get_plugin_text(plugins, language):
+    """Returns the plain text of the given text plugins in one language."""
+    texts = []
+    for plugin in plugins:
+        if plugin.language != language:
+            continue
+        try:
+            body = plugin.djangocms_text_ckeditor_text.body
+        except ObjectDoesNotExist:
+            continue
+        texts.append(unescape(strip_tags(body or '')))
+    return ' '.join(texts)
+
+
+def get_text_plugins(entries):
+    """
+    Returns the text plugins of the given entries in one query.
+
+    The result maps each entry to the plugins of its excerpt and content
+    placeholders in all languages.
+
+    """
+    placeholder_ids = set()
+    for entry in entries:
+        placeholder_ids.update([entry.excerpt_id, entry.content_id])
+    placeholder_ids.discard(None)
+    plugins = {}
+    for plugin in CMSPlugin.objects.filter(
+            placeholder_id__in=placeholder_ids,
+            plugin_type='TextPlugin').select_related(
+                'djangocms_text_ckeditor_text').order_by('path'):
+        plugins.setdefault(plugin.placeholder_id, []).append(plugin)
+    return dict(
+        (entry, plugins.get(entry.excerpt_id, [])
+         + plugins.get(entry.content_id, []))
+        for entry in entries)
+
+
+def get_document(translation, plugins):
+    """Returns an unsaved ``SearchDocument`` for the given translation."""
+    language = translation.language_code
+    title = [translation.title, translation.meta_title]
+    text = [translation.meta_description, get_plugin_text(plugins, language)]
+    return SearchDocument(
+        entry_id=translation.master_id,
+        language_code=language,
+        title=' '.join(t for t in title if t),
+        text=' '.join(t for t in text if t))
+
+
+def update_document(translation, plugins=None):
+    """Updates the search document of one entry translation."""
+    if plugins is None:
+        plugins = translation.master.get_text_plugins(
+            translation.language_code)
+    document = get_document(translation, plugins)
+    document, created = SearchDocument.objects.update_or_create(
+        entry_id=document.entry_id, language_code=document.language_code,
+        defaults={'title': document.title, 'text': document.text})
+    get_backend().update([document])
+    return document
+
+
+class SearchResults(object):
+    """
+    The ranked entries, that match a search query.
+
+    Only the primary keys are known upfront. Entries are fetched from
+    ``queryset``, when the results are sliced, so a ``Paginator`` only loads
+    the entries of the current page.
+
+    """
+    def __init__(self, queryset, pks):
+        self.queryset = queryset
+        self.pks = pks
+
+    def __len__(self):
+        return len(self.pks)
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        pks = self.pks[key]
+        entries = self.queryset.in_bulk(pks)
+        return [entries[pk] for pk in pks if pk in entries]
+
+    def count(self):
+        return len(self.pks)
+
+    def for_listing(self, language=None):
+        """See ``NewsEntryQuerySet.for_listing``."""
+        return SearchResults(self.queryset.for_listing(language), self.pks)
+
+
+class SearchBackend(object):
+    """
+    Searches the documents with ``icontains``.
+
+    This is only used for databases, that have no full text index, and scans
+    the whole table.
+
+    """
+    def __init__(self, connection):
+        self.connection = connection
+
+    def update(self, documents):
+        """Called after the given documents were saved."""
+        pass
+
+    def search(self, query, language, limit):
+        """
+        Returns the primary keys of the matching entries, the best match
+        first.
+
+        """
+        words = query.split()
+        if not words:
+            return []
+        qs = SearchDocument.objects.filter(language_code=language)
+        for word in words:
+            qs = qs.filter(Q(title__icontains=word) | Q(text__icontains=word))
+        return list(qs.order_by('-entry__pub_date').values_list(
+            'entry_id', flat=True)[:limit])
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    Searches an FTS5 table, that is kept in sync by triggers.
+
+    Every word of the query has to match as a prefix, since FTS5 doesn't
+    stem. The results are ranked with ``bm25``, where matches in the title
+    weigh ten times more.
+
+    """
+    def search(self, query, language, limit):
+        words = query.split()
+        if not words:
+            return []
+        # quoting every word keeps the FTS5 query syntax out of the query
+        match = ' '.join(
+            '"{0}"*'.format(word.replace('"', '""')) for word in words)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT d.entry_id FROM {fts} f'
+                ' JOIN {table} d ON d.id = f.rowid'
+                ' WHERE {fts} MATCH %s AND d.language_code = %s'
+                ' ORDER BY bm25({fts}, 10.0, 1.0) LIMIT %s'.format(
+                    fts=FTS_TABLE, table=SearchDocument._meta.db_table),
+                [match, language, limit])
+            return [row[0] for row in cursor.fetchall()]
+
+
+class PostgreSQLSearchBackend(SearchBackend):
+    """
+    Searches a ``tsvector`` column with a GIN index.
+
+    The text is stemmed with the configuration of the document language (see
+    the ``NEWS_SEARCH_CONFIGS`` setting). Matches in the title weigh more.
+
+    """
+    def get_config(self, language):
+        return SEARCH_CONFIGS.get(language, 'simple')
+
+    def update(self, documents):
+        pks = {}
+        for document in documents:
+            pks.setdefault(document.language_code, []).append(document.pk)
+        with self.connection.cursor() as cursor:
+            for language, language_pks in pks.items():
+                cursor.execute(
+                    'UPDATE {table} SET search_vector ='
+                    " setweight(to_tsvector(%s::regconfig, title), 'A')"
+                    " || setweight(to_tsvector(%s::regconfig, text), 'B')"
+                    ' WHERE id = ANY(%s)'.format(
+                        table=SearchDocument._meta.db_table),
+                    [self.get_config(language)] * 2 + [language_pks])
+
+    def search(self, query, language, limit):
+        if not query.split():
+            return []
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT entry_id FROM {table},'
+                ' plainto_tsquery(%s::regconfig, %s) query'
+                ' WHERE language_code = %s AND search_vector @@ query'
+                ' ORDER BY ts_rank(search_vector, query) DESC LIMIT %s'.format(
+                    table=SearchDocument._meta.db_table),
+                [self.get_config(language), query, language, limit])
+            return [row[0] for row in cursor.fetchall()]
+
+
+def get_backend():
+    """Returns the search backend for the database."""
+    if connection.vendor == 'postgresql':
+        return PostgreSQLSearchBackend(connection)
+    if connection.vendor == 'sqlite':
+        # the migration skips the FTS5 table, if SQLite was built without it
+        name = connection.settings_dict['NAME']
+        if name not in _has_fts_table:
+            _has_fts_table[name] = (
+                FTS_TABLE in connection.introspection.table_names())
+        if _has_fts_table[name]:
+            return SQLiteSearchBackend(connection)
+    return SearchBackend(connection)
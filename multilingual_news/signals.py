@@ -0,0 +1,423 @@
+"""Signals and receivers for the ``multilingual_news`` app."""
+from django.db.models.functions import Substr
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+from django.dispatch import Signal, receiver
+from django.utils.timezone import now
+
+try:
+    from djangocms_text_ckeditor.models import Text
+except ImportError:  # pragma: nocover
+    Text = None
+from multilingual_tags.models import TaggedItem
+
+from cms.signals import post_placeholder_operation
+
+from . import response_cache, search
+from .models import (
+    ArchiveEntryCount,
+    Category,
+    CategoryEntryCount,
+    NewsEntry,
+    NewsEntryTranslation,
+    RelatedEntry,
+    SearchDocument,
+    get_month,
+)
+
+
+# Sent by ``NewsEntryManager.set_published`` with the arguments ``pks``,
+# ``language`` and ``is_published``, after several entries were published or
+# unpublished at once. ``dated`` lists the entries, that were published without
+# a publication date and got dated by it. No ``post_save`` is sent for these
+# entries.
+publication_changed = Signal()
+
+
+def get_entry_categories(entry_pk):
+    """Returns the categories of an entry without loading the entry."""
+    return Category.objects.filter(newsentries__pk=entry_pk)
+
+
+def get_parent_path(tree_path):
+    """Returns the ``tree_path`` of the parent of the category at the path."""
+    return tree_path[:tree_path.rstrip('/').rfind('/') + 1]
+
+
+@receiver(post_delete, sender=Category)
+def detach_category_subtree(sender, instance, **kwargs):
+    """
+    Turns the children of a deleted category into root categories.
+
+    Their ``parent`` has already been set to ``NULL``, so only the deleted
+    category has to be cut off the front of the ``tree_path`` of the subtree.
+    The counts of the subtree don't change, only the ancestors lose its
+    entries.
+
+    """
+    if not instance.tree_path:
+        return
+    Category.objects.filter(
+        Category.get_tree_filter(instance.tree_path)).update(
+            tree_path=Substr('tree_path', len(instance.tree_path) + 1))
+    CategoryEntryCount.objects.update_paths([get_parent_path(instance.tree_path)])
+
+
+@receiver(post_save, sender=Category)
+def update_counts_on_category_move(sender, instance, created, **kwargs):
+    """
+    Recounts the old and the new ancestors of a moved category.
+
+    The counts of the moved subtree itself don't change.
+
+    """
+    old_path = instance.__dict__.pop('_news_old_tree_path', None)
+    if old_path:
+        CategoryEntryCount.objects.update_paths([
+            get_parent_path(old_path), get_parent_path(instance.tree_path)])
+
+
+@receiver(post_save, sender=NewsEntry)
+@receiver(post_save, sender=NewsEntryTranslation)
+@receiver(post_delete, sender=NewsEntryTranslation)
+def update_counts_on_entry_change(sender, instance, **kwargs):
+    """Recounts the categories of a saved entry or translation."""
+    entry_pk = instance.pk if sender is NewsEntry else instance.master_id
+    CategoryEntryCount.objects.update_counts(get_entry_categories(entry_pk))
+
+
+@receiver(publication_changed, sender=NewsEntry)
+def update_counts_on_publication_change(sender, pks, **kwargs):
+    CategoryEntryCount.objects.update_counts(
+        Category.objects.filter(newsentries__pk__in=pks).distinct())
+
+
+@receiver(pre_delete, sender=NewsEntry)
+def remember_categories_on_entry_delete(sender, instance, **kwargs):
+    instance._news_categories = list(instance.categories.all())
+
+
+@receiver(post_delete, sender=NewsEntry)
+def update_counts_on_entry_delete(sender, instance, **kwargs):
+    CategoryEntryCount.objects.update_counts(
+        getattr(instance, '_news_categories', []))
+
+
+@receiver(m2m_changed, sender=NewsEntry.categories.through)
+def update_counts_on_recategorization(sender, instance, action, reverse,
+                                      pk_set, **kwargs):
+    """Recounts the categories, that were added to or removed from entries."""
+    if not reverse:
+        instance.__dict__.pop('_primary_category', None)
+    if action == 'pre_clear':
+        if not reverse:
+            instance._news_categories = list(instance.categories.all())
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # the category instance may hold an outdated tree path
+        categories = Category.objects.filter(pk=instance.pk)
+    elif action == 'post_clear':
+        categories = getattr(instance, '_news_categories', [])
+    else:
+        categories = Category.objects.filter(pk__in=pk_set)
+    CategoryEntryCount.objects.update_counts(categories)
+
+
+@receiver(pre_save, sender=NewsEntryTranslation)
+def remember_is_published(sender, instance, **kwargs):
+    """Remembers the stored state to detect, when it changes."""
+    instance._news_was_published = bool(
+        instance.pk and NewsEntryTranslation.objects.filter(
+            pk=instance.pk, is_published=True).exists())
+
+
+@receiver(post_save, sender=NewsEntry)
+def update_related_on_entry_save(sender, instance, created, **kwargs):
+    """
+    Updates the related entries around an entry, that was moved in time.
+
+    New entries have no tags and categories yet. Changes of the publication
+    state are handled by the receivers of the translations.
+
+    """
+    if not created and instance.pub_date != getattr(
+            instance, '_news_old_pub_date', instance.pub_date):
+        RelatedEntry.objects.rebuild_related([instance.pk])
+
+
+@receiver(post_save, sender=NewsEntryTranslation)
+def update_related_on_translation_save(sender, instance, **kwargs):
+    """Updates the related entries around a (un)published translation."""
+    if instance.is_published != getattr(
+            instance, '_news_was_published', False):
+        RelatedEntry.objects.update_related([instance.master_id])
+
+
+@receiver(post_delete, sender=NewsEntryTranslation)
+def update_related_on_translation_delete(sender, instance, **kwargs):
+    if instance.is_published:
+        RelatedEntry.objects.update_related([instance.master_id])
+
+
+@receiver(publication_changed, sender=NewsEntry)
+def update_related_on_publication_change(sender, pks, dated=(), **kwargs):
+    RelatedEntry.objects.rebuild_related(dated)
+    RelatedEntry.objects.update_related(set(pks).difference(dated))
+
+
+@receiver(pre_delete, sender=NewsEntry)
+def remember_related_on_entry_delete(sender, instance, **kwargs):
+    instance._news_related_to = list(RelatedEntry.objects.filter(
+        related=instance).values_list('entry_id', flat=True))
+
+
+@receiver(post_delete, sender=NewsEntry)
+def update_related_on_entry_delete(sender, instance, **kwargs):
+    """Fills the gaps, that the deleted entry left in other indexes."""
+    RelatedEntry.objects.update_related(
+        getattr(instance, '_news_related_to', []), neighbours=False)
+
+
+@receiver(m2m_changed, sender=NewsEntry.categories.through)
+def update_related_on_recategorization(sender, instance, action, reverse,
+                                       pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        instance._news_entry_pks = list(
+            instance.newsentries.values_list('pk', flat=True))
+    if action == 'post_clear':
+        if reverse:
+            pks = instance._news_entry_pks
+        elif getattr(instance, '_news_categories', None):
+            # remembered by ``update_counts_on_recategorization``
+            pks = [instance.pk]
+        else:
+            return
+    elif action in ('post_add', 'post_remove') and pk_set:
+        pks = pk_set if reverse else [instance.pk]
+    else:
+        return
+    RelatedEntry.objects.update_related(pks)
+
+
+@receiver(post_save, sender=TaggedItem)
+@receiver(post_delete, sender=TaggedItem)
+def update_related_on_tagging(sender, instance, created=True, **kwargs):
+    """Updates the related entries around a tagged or untagged entry."""
+    content_type = ContentType.objects.get_for_model(NewsEntry)
+    if created and instance.content_type_id == content_type.pk:
+        RelatedEntry.objects.update_related([instance.object_id])
+
+
+@receiver(pre_save, sender=NewsEntry)
+def remember_pub_date(sender, instance, **kwargs):
+    """
+    Remembers the stored publication date and author, to recount the month
+    and to invalidate the responses of the previous author.
+
+    """
+    instance._news_old_pub_date = instance._news_old_author_id = None
+    if instance.pk:
+        instance._news_old_pub_date, instance._news_old_author_id = (
+            NewsEntry.objects.filter(pk=instance.pk).values_list(
+                'pub_date', 'author_id').first() or (None, None))
+
+
+@receiver(post_save, sender=NewsEntry)
+@receiver(post_delete, sender=NewsEntry)
+def update_archive_on_entry_change(sender, instance, **kwargs):
+    months = set()
+    for pub_date in (instance.pub_date,
+                     getattr(instance, '_news_old_pub_date', None)):
+        if pub_date:
+            months.add(get_month(pub_date))
+    ArchiveEntryCount.objects.update_counts(months)
+
+
+@receiver(post_save, sender=NewsEntryTranslation)
+@receiver(post_delete, sender=NewsEntryTranslation)
+def update_archive_on_translation_change(sender, instance, **kwargs):
+    ArchiveEntryCount.objects.update_entries(
+        NewsEntry.objects.filter(pk=instance.master_id))
+
+
+@receiver(publication_changed, sender=NewsEntry)
+def update_archive_on_publication_change(sender, pks, **kwargs):
+    ArchiveEntryCount.objects.update_entries(
+        NewsEntry.objects.filter(pk__in=pks))
+
+
+def update_text_on_plugin_change(sender, instance, **kwargs):
+    """
+    Updates the stored descriptions and search documents, when a text plugin
+    changes.
+
+    """
+    if not instance.placeholder_id:
+        return
+    entries = NewsEntry.objects.filter(
+        Q(excerpt_id=instance.placeholder_id)
+        | Q(content_id=instance.placeholder_id))
+    for entry in entries:
+        entry.update_description(instance.language)
+    response_cache.invalidate_entries([entry.pk for entry in entries])
+    response_cache.bump_generation([instance.language])
+    for translation in NewsEntryTranslation.objects.filter(
+            master__in=entries, language_code=instance.language
+    ).select_related('master'):
+        search.update_document(translation)
+
+
+@receiver(post_save, sender=NewsEntryTranslation)
+def update_search_document(sender, instance, **kwargs):
+    search.update_document(instance)
+
+
+@receiver(post_delete, sender=NewsEntryTranslation)
+def delete_search_document(sender, instance, **kwargs):
+    SearchDocument.objects.filter(
+        entry_id=instance.master_id,
+        language_code=instance.language_code).delete()
+
+
+def touch_entries(pks, languages=None):
+    """
+    Sets ``modified`` of the given entries, without saving them, and
+    invalidates their cached responses and the news generation of the given
+    languages (by default of all languages).
+
+    """
+    pks = NewsEntry.objects.filter(pk__in=pks).values_list('pk', flat=True)
+    NewsEntry.objects.filter(pk__in=pks).update(modified=now())
+    response_cache.invalidate_entries(pks)
+    response_cache.bump_generation(languages)
+
+
+@receiver(post_save, sender=NewsEntryTranslation)
+@receiver(post_delete, sender=NewsEntryTranslation)
+def touch_entry_on_translation_change(sender, instance, **kwargs):
+    touch_entries([instance.master_id], [instance.language_code])
+
+
+@receiver(post_save, sender=TaggedItem)
+@receiver(post_delete, sender=TaggedItem)
+def touch_entry_on_tagging(sender, instance, **kwargs):
+    content_type = ContentType.objects.get_for_model(NewsEntry)
+    if instance.content_type_id == content_type.pk:
+        touch_entries([instance.object_id])
+        # the entry might not have the tag anymore
+        response_cache.invalidate(
+            [response_cache.tag_dependency(instance.tag_id)])
+
+
+@receiver(post_save, sender=Category)
+def touch_entries_on_category_save(sender, instance, created, **kwargs):
+    """The entries show the category, so they change with it."""
+    response_cache.invalidate([response_cache.CATEGORIES])
+    if not created:
+        touch_entries(instance.newsentries.values('pk'))
+    else:
+        # ``get_recent_news`` looks categories up by their slug
+        response_cache.bump_generation()
+
+
+@receiver(pre_delete, sender=Category)
+def remember_entries_on_category_delete(sender, instance, **kwargs):
+    instance._news_entry_pks = list(
+        instance.newsentries.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Category)
+def touch_entries_on_category_delete(sender, instance, **kwargs):
+    response_cache.invalidate([
+        response_cache.CATEGORIES,
+        response_cache.category_dependency(instance.pk)])
+    touch_entries(getattr(instance, '_news_entry_pks', []))
+
+
+@receiver(m2m_changed, sender=NewsEntry.categories.through)
+def touch_entries_on_recategorization(sender, instance, action, reverse,
+                                      pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        instance._news_touched_pks = list(
+            instance.newsentries.values_list('pk', flat=True))
+    if action == 'post_clear':
+        pks = instance._news_touched_pks if reverse else [instance.pk]
+    elif action in ('post_add', 'post_remove'):
+        pks = pk_set if reverse else [instance.pk]
+    else:
+        return
+    touch_entries(pks)
+    # the entries might not be in these categories anymore
+    if reverse:
+        # the category instance may hold an outdated tree path
+        categories = Category.objects.filter(pk=instance.pk)
+    elif action == 'post_clear':
+        categories = getattr(instance, '_news_categories', [])
+    else:
+        categories = Category.objects.filter(pk__in=pk_set)
+    dependencies = set()
+    for category in categories:
+        dependencies.update(
+            response_cache.get_category_dependencies(category.tree_path))
+    response_cache.invalidate(dependencies)
+
+
+@receiver(post_save, sender=NewsEntry)
+def invalidate_responses_on_entry_save(sender, instance, **kwargs):
+    dependencies = response_cache.get_entry_dependencies([instance.pk])
+    old_author_id = getattr(instance, '_news_old_author_id', None)
+    if old_author_id:
+        dependencies.add(response_cache.author_dependency(old_author_id))
+    response_cache.invalidate(dependencies)
+    response_cache.bump_generation()
+    response_cache.schedule(instance.pub_date)
+
+
+@receiver(pre_delete, sender=NewsEntry)
+def remember_responses_on_entry_delete(sender, instance, **kwargs):
+    instance._news_dependencies = response_cache.get_entry_dependencies(
+        [instance.pk])
+
+
+@receiver(post_delete, sender=NewsEntry)
+def invalidate_responses_on_entry_delete(sender, instance, **kwargs):
+    response_cache.invalidate(getattr(instance, '_news_dependencies', []))
+    response_cache.bump_generation()
+
+
+@receiver(publication_changed, sender=NewsEntry)
+def invalidate_responses_on_publication_change(sender, pks, language,
+                                               **kwargs):
+    response_cache.invalidate_entries(pks)
+    response_cache.bump_generation([language])
+
+
+@receiver(post_placeholder_operation)
+def touch_entries_on_placeholder_operation(sender, **kwargs):
+    """
+    Touches the entries, whose placeholders were changed with the frontend
+    editor. This covers all plugin types, not only text plugins.
+
+    """
+    placeholder_ids = [
+        kwargs[name].pk
+        for name in ('placeholder', 'source_placeholder', 'target_placeholder')
+        if kwargs.get(name) is not None]
+    if placeholder_ids:
+        touch_entries(NewsEntry.objects.filter(
+            Q(excerpt_id__in=placeholder_ids)
+            | Q(content_id__in=placeholder_ids)).values('pk'))
+
+
+if Text is not None:
+    post_save.connect(update_text_on_plugin_change, sender=Text)
+    post_delete.connect(update_text_on_plugin_change, sender=Text)
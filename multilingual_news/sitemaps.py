@@ -1,9 +1,12 @@
 """Sitemaps for the `multilingual_news` app."""
 from django.contrib.sitemaps import Sitemap
+from django.contrib.sitemaps.views import sitemap as sitemap_view
+
+from .conditional import conditional_response, get_entries_state, is_conditional
 from .models import NewsEntry
 
 
-class NewsSitemap(Sitemap):  # pragma: nocover
+class NewsSitemap(Sitemap):
     changefreq = "monthly"
     priority = 0.5
 
@@ -11,4 +14,18 @@ class NewsSitemap(Sitemap):  # pragma: nocover
         return NewsEntry.objects.published()
 
     def lastmod(self, obj):
-        return obj.pub_date
+        return obj.modified
+
+
+def sitemap(request, sitemaps, **kwargs):
+    """
+    Wraps Django's sitemap view and answers with ``304 Not Modified``, if no
+    published entry changed.
+
+    Only use it for sitemaps, that list nothing but news entries.
+
+    """
+    if not is_conditional(request):
+        return sitemap_view(request, sitemaps, **kwargs)
+    state = get_entries_state(NewsEntry.objects.published())
+    return conditional_response(request, state, sitemap_view, sitemaps, **kwargs)
@@ -1,28 +1,74 @@
 """Template tags for the ``multilingual_news`` app."""
+import hashlib
 import warnings
 
 from django import template
+from django.core.cache import cache
 from django.template.defaultfilters import safe, truncatewords_html
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
 
-from ..models import NewsEntry, Category
+from cms.toolbar.utils import get_toolbar_from_request
+from sekizai.helpers import get_varname
+
+from ..app_settings import RECENT_NEWS_CACHE_TIMEOUT, TEASER_CACHE_TIMEOUT
+from ..models import ArchiveEntryCount, NewsEntry, Category
+from ..response_cache import get_generation
 
 
 register = template.Library()
 
+RECENT_NEWS_KEY = 'multilingual_news:recent:{0}:{1}'
+TEASER_KEY = 'multilingual_news:teaser:{0}:{1}:{2}:{3}'
+
 
 @register.simple_tag
 def get_published_entries(object_list, language_code=None):
     return NewsEntry.objects.published(language=language_code)
 
 
+@register.simple_tag
+def get_category_entry_count(category, language_code=None):
+    """Returns the amount of published entries in the given category."""
+    return category.get_entry_count(language=language_code)
+
+
+@register.simple_tag
+def get_related_news(newsentry, limit=None, language_code=None):
+    """Returns the related entries of the given entry."""
+    qs = newsentry.get_related(language=language_code).for_listing()
+    if limit:
+        qs = qs[:limit]
+    return qs
+
+
+@register.simple_tag
+def get_news_archive(language_code=None):
+    """
+    Returns the years with published entries, the latest first.
+
+    Each year is a dictionary with the ``year``, the ``count`` of entries and
+    its ``months``, which are ``ArchiveEntryCount`` instances.
+
+    """
+    years = []
+    for count in ArchiveEntryCount.objects.filter(
+            language_code=language_code or get_language()):
+        if not years or years[-1]['year'] != count.year:
+            years.append({'year': count.year, 'count': 0, 'months': []})
+        years[-1]['count'] += count.count
+        years[-1]['months'].append(count)
+    return years
+
+
 @register.simple_tag
 def get_newsentry_meta_description(newsentry):
     """Returns the meta description for the given entry."""
     if newsentry.meta_description:
         return newsentry.meta_description
 
-    # If there is no seo addon found, take the info from the placeholders
-    text = newsentry.get_description()
+    # If there is no seo addon found, take the stored placeholder text
+    text = newsentry.description
 
     if len(text) > 160:
         return u'{}...'.format(text[:160])
@@ -37,20 +83,116 @@ def get_newsentry_meta_title(newsentry):
 @register.simple_tag(takes_context=True)
 def get_recent_news(context, check_language=True, limit=3, exclude=None,
                     category=None):
-    filter_kwargs = {
-        'check_language': check_language,
-        'limit': limit,
-        'exclude': exclude,
-    }
-    if category:
-        try:
-            filter_kwargs['category'] = Category.objects.get(slug=category)
-        except Category.DoesNotExist:
-            pass
-    qs = NewsEntry.objects.recent(**filter_kwargs)
+    """
+    Returns the recently published entries.
+
+    The entries are cached together with everything, that ``for_listing``
+    fetches. The cache key contains the news generation of the language (see
+    ``response_cache.get_generation``), which changes with every published,
+    saved or deleted entry, so the cache is never stale.
+
+    """
+    def get_category_pk():
+        if not category:
+            return None
+        return Category.objects.filter(slug=category).values_list(
+            'pk', flat=True).first()
+
+    def get_queryset(category_pk):
+        return NewsEntry.objects.recent(
+            check_language=check_language, limit=limit, exclude=exclude,
+            kwargs={'categories__in': [category_pk]} if category_pk else None,
+        ).for_listing()
+
+    if not RECENT_NEWS_CACHE_TIMEOUT:
+        return get_queryset(get_category_pk())
+
+    language = get_language()
+    value = u'{0}|{1}|{2}|{3}|{4}'.format(
+        language, category, limit, check_language,
+        exclude.pk if exclude else '')
+    key = RECENT_NEWS_KEY.format(
+        get_generation(language if check_language else None),
+        hashlib.md5(value.encode('utf-8')).hexdigest())
+    cached = cache.get(key)
+    if cached is not None:
+        category_pk, entries = cached
+        qs = get_queryset(category_pk)
+        # the queryset stays lazy, but evaluating it returns the cached
+        # entries
+        qs._result_cache = entries
+        qs._prefetch_done = True
+        return qs
+    category_pk = get_category_pk()
+    qs = get_queryset(category_pk)
+    cache.set(key, (category_pk, list(qs)), RECENT_NEWS_CACHE_TIMEOUT)
     return qs
 
 
+def get_sekizai_data(context):
+    """Returns a copy of the blocks, that sekizai collected in the context."""
+    data = context.get(get_varname())
+    if data is None:
+        return {}
+    return dict((name, list(items)) for name, items in data.items())
+
+
+@register.simple_tag(takes_context=True)
+def render_news_teaser(context, newsentry, words=30):
+    """
+    Renders the excerpt of the given entry or, if it is empty, the first
+    ``words`` words of its content.
+
+    The content placeholder is only rendered, if the excerpt is empty. The
+    result is cached per entry, language and amount of words along with the
+    sekizai blocks (e.g. ``js`` and ``css``), that its plugins added. The
+    cache key contains ``NewsEntry.modified``, which changes with the plugins
+    of the placeholders, so changed teasers are rendered again.
+
+    In the edit mode of the toolbar the excerpt is rendered editable and
+    nothing is cached.
+
+    """
+    toolbar = get_toolbar_from_request(context['request'])
+    language = get_language()
+    key = TEASER_KEY.format(
+        newsentry.pk, language, words, newsentry.modified.isoformat())
+    edit_mode = toolbar.edit_mode_active
+    if not edit_mode:
+        value = cache.get(key)
+        if value is not None:
+            teaser, sekizai_data = value
+            holder = context.get(get_varname())
+            if holder is not None:
+                for name, items in sekizai_data.items():
+                    for item in items:
+                        holder[name].append(item)
+            return mark_safe(teaser)
+
+    renderer = toolbar.get_content_renderer()
+    sekizai_before = get_sekizai_data(context)
+
+    def render(placeholder, editable):
+        return renderer.render_placeholder(
+            placeholder=placeholder, context=context, language=language,
+            editable=editable)
+
+    teaser = ''
+    if newsentry.excerpt_id:
+        teaser = render(newsentry.excerpt, editable=edit_mode)
+    if not teaser.strip() and newsentry.content_id:
+        # the markup of the edit mode can't be truncated
+        teaser = truncatewords_html(
+            render(newsentry.content, editable=False), words)
+    if not edit_mode:
+        sekizai_data = dict(
+            (name, [item for item in items
+                    if item not in sekizai_before.get(name, [])])
+            for name, items in get_sekizai_data(context).items())
+        cache.set(key, (teaser, sekizai_data), TEASER_CACHE_TIMEOUT)
+    return mark_safe(teaser)
+
+
 @register.simple_tag(takes_context=True)
 def render_news_placeholder(context, obj, name=False, truncate=False):  # pragma: nocover  # NOQA
     """
@@ -0,0 +1,92 @@
+"""Tests for the admin classes of the ``multilingual_news`` app."""
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from mixer.backend.django import mixer
+
+from .mixins import NewsTestMixin
+
+
+class NewsEntryAdminTestCase(NewsTestMixin, TestCase):
+    """Tests for the ``NewsEntryAdmin`` admin class."""
+
+    def setUp(self):
+        super(NewsEntryAdminTestCase, self).setUp()
+        self.admin = mixer.blend(
+            'auth.User', is_superuser=True, is_staff=True)
+        self.client.force_login(self.admin)
+
+    def create_entries(self, amount):
+        for x in range(0, amount):
+            entry = mixer.blend('multilingual_news.NewsEntry')
+            for language in ('en', 'de'):
+                entry.set_current_language(language)
+                entry.title = 'Entry {0} {1}'.format(x, language)
+                entry.slug = 'entry-{0}-{1}-{2}'.format(
+                    entry.pk, x, language)
+                entry.is_published = True
+                entry.save()
+            for y in range(0, 2):
+                category = mixer.blend('multilingual_news.Category')
+                category.set_current_language('en')
+                category.title = 'Category {0}'.format(y)
+                category.save()
+                entry.categories.add(category)
+
+    def get_changelist(self, data=None):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get(
+                reverse('admin:multilingual_news_newsentry_changelist'),
+                data or {})
+        self.assertEqual(resp.status_code, 200)
+        return resp, len(ctx.captured_queries)
+
+    def test_changelist(self):
+        self.create_entries(2)
+        # the first request creates the user settings of django CMS
+        self.get_changelist()
+        resp, queries = self.get_changelist()
+        self.assertContains(resp, 'Entry 1 en')
+        self.assertContains(resp, 'Category 1')
+        self.create_entries(3)
+        resp, more_queries = self.get_changelist()
+        self.assertEqual(queries, more_queries, msg=(
+            'The amount of queries should not depend on the amount of'
+            ' entries.'))
+
+    def test_ordering(self):
+        self.create_entries(2)
+        for index in range(1, 3):
+            resp, queries = self.get_changelist({'o': index})
+            self.assertEqual(resp.status_code, 200, msg=(
+                'Should be able to sort by the annotated columns.'))
+        entries = resp.context['cl'].result_list
+        self.assertEqual(
+            [e._is_published for e in entries], [True, True])
+        resp, queries = self.get_changelist({'o': '-1'})
+        self.assertEqual(
+            [e.title for e in resp.context['cl'].result_list],
+            ['Entry 1 en', 'Entry 0 en'])
+
+
+class CategoryAdminTestCase(NewsTestMixin, TestCase):
+    """Tests for the ``CategoryAdmin`` admin class."""
+
+    def setUp(self):
+        super(CategoryAdminTestCase, self).setUp()
+        self.admin = mixer.blend(
+            'auth.User', is_superuser=True, is_staff=True)
+        self.client.force_login(self.admin)
+
+    def test_changelist(self):
+        url = reverse('admin:multilingual_news_category_changelist')
+        mixer.cycle(2).blend('multilingual_news.Category')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+        mixer.cycle(3).blend('multilingual_news.Category')
+        with self.assertNumQueries(len(ctx.captured_queries)):
+            resp = self.client.get(url, {'o': '1'})
+        self.assertEqual(resp.status_code, 200)
@@ -0,0 +1,90 @@
+"""
+Benchmarks for the ``multilingual_news`` app.
+
+They are not collected by the test runner, run them explicitly with::
+
+    ./manage.py test multilingual_news.tests.benchmarks \
+        --settings=multilingual_news.tests.test_settings
+
+The amount of entries can be set with the ``NEWS_BENCHMARK_ENTRIES``
+environment variable.
+
+"""
+import os
+import random
+import time
+
+from django.core.management import call_command
+from django.db.models import Q
+from django.test import TestCase
+from django.utils.timezone import now, timedelta
+
+from .. import models
+
+
+ENTRIES = int(os.environ.get('NEWS_BENCHMARK_ENTRIES', 5000))
+WORDS = [
+    'apple', 'pear', 'harvest', 'market', 'weather', 'election', 'football',
+    'concert', 'museum', 'railway', 'bridge', 'festival', 'school', 'river',
+]
+
+
+def timeit(func, repeat=20):
+    """Returns the average duration of ``func`` in milliseconds."""
+    start = time.perf_counter()
+    for x in range(0, repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+class BenchmarkTestCase(TestCase):
+    """Base class, that creates ``ENTRIES`` entries without any signals."""
+
+    @classmethod
+    def setUpTestData(cls):
+        random.seed(0)
+        entries = models.NewsEntry.objects.bulk_create([
+            models.NewsEntry(pub_date=now() - timedelta(hours=x))
+            for x in range(0, ENTRIES)])
+        if entries[0].pk is None:
+            entries = models.NewsEntry.objects.order_by('pk')
+        models.NewsEntryTranslation.objects.bulk_create([
+            models.NewsEntryTranslation(
+                master_id=entry.pk, language_code=language,
+                title=' '.join(random.sample(WORDS, 3)),
+                slug='entry-{0}'.format(entry.pk),
+                meta_description=' '.join(random.sample(WORDS, 8)),
+                is_published=True)
+            for entry in entries for language in ('en', 'de')])
+
+    def report(self, name, milliseconds):
+        print('\n{0}: {1:.2f} ms'.format(name, milliseconds))
+
+
+class SearchBenchmark(BenchmarkTestCase):
+    """
+    Compares the search index with ``icontains`` on the translated fields.
+
+    Both fetch the amount of results and the first page, like a paginated
+    view does.
+
+    """
+
+    def test_search(self):
+        call_command('rebuild_news_search_index', verbosity=0)
+
+        def icontains():
+            qs = models.NewsEntry.objects.published(language='en').filter(
+                Q(translations__title__icontains='harvest')
+                | Q(translations__meta_description__icontains='harvest'))
+            qs.count()
+            list(qs[:10])
+
+        def search():
+            results = models.NewsEntry.objects.search(
+                'harvest', language='en')
+            results.count()
+            results[:10]
+
+        self.report('icontains', timeit(icontains))
+        self.report('search', timeit(search))
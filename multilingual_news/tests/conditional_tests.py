@@ -0,0 +1,150 @@
+"""Tests for the conditional GET support of the ``multilingual_news`` app."""
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+from django.utils.timezone import now, timedelta
+
+from mixer.backend.django import mixer
+from mock import patch
+
+from .. import conditional
+from .. import models
+from .. import response_cache
+from .. import sitemaps
+from .. import views
+from .mixins import NewsTestMixin
+
+
+class ConditionalTestMixin(NewsTestMixin):
+    def setUp(self):
+        super(ConditionalTestMixin, self).setUp()
+        self.entry = self.create_entry(
+            'foo', author=mixer.blend('people.Person'),
+            pub_date=now() - timedelta(days=1))
+
+    def get(self, view, user=None, **headers):
+        return view(self.get_request(user=user, **headers))
+
+
+class GetEntriesStateTestCase(ConditionalTestMixin, TestCase):
+    """Tests for the ``get_entries_state`` function."""
+
+    def test_function(self):
+        with self.assertNumQueries(1):
+            state = conditional.get_entries_state(
+                models.NewsEntry.objects.published(language='en'))
+        self.assertEqual(state['count'], 1)
+        self.assertEqual(state['pub_date'], self.entry.pub_date)
+        self.assertEqual(
+            conditional.get_last_modified(state), state['modified'], msg=(
+                'Should return the latest date.'))
+
+
+class ConditionalGetMixinTestCase(ConditionalTestMixin, TestCase):
+    """Tests for the ``ConditionalGetMixin`` with the list and detail views."""
+
+    def test_list(self):
+        view = views.NewsListView.as_view()
+        resp = self.get(view)
+        self.assertEqual(resp.status_code, 200)
+        etag = resp['ETag']
+
+        with self.assertNumQueries(1):
+            resp = self.get(view, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304, msg=(
+            'Should compare the state of the entries with one query.'))
+
+        user = mixer.blend('auth.User', is_superuser=True)
+        resp = self.get(view, user=user, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200, msg=(
+            'Should always render the page for authenticated users.'))
+
+        self.create_entry('bar')
+        resp = self.get(view, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200, msg=(
+            'Should render the page again, when an entry was published.'))
+
+        etag = resp['ETag']
+        models.NewsEntry.objects.set_published(
+            [self.entry.pk], is_published=False, language='en')
+        resp = self.get(view, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200, msg=(
+            'Should render the page again, when an entry was unpublished.'))
+
+    def test_list_local_cache(self):
+        view = views.NewsListView.as_view()
+        etag = self.get(view)['ETag']
+        # another process publishes an entry, which doesn't reach the
+        # process-local cache of this one
+        with patch.object(response_cache, 'bump_generation'):
+            self.create_entry('bar')
+        resp = self.get(view, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200, msg=(
+            'Should not rely on the news generation of a local cache.'))
+
+    def test_list_shared_cache(self):
+        view = views.NewsListView.as_view()
+        with patch.object(response_cache, 'is_shared_cache', return_value=True):
+            etag = self.get(view)['ETag']
+            with self.assertNumQueries(0):
+                resp = self.get(view, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(resp.status_code, 304, msg=(
+                'Should use the news generation of a shared cache instead of'
+                ' querying the entries.'))
+
+            self.create_entry('bar')
+            resp = self.get(view, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(resp.status_code, 200, msg=(
+                'Should render the page again, when an entry was published.'))
+
+    def test_detail(self):
+        def view(request):
+            return views.NewsDetailView.as_view()(request, slug='foo')
+
+        etag = self.get(view)['ETag']
+        self.assertEqual(
+            self.get(view, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.create_entry('bar')
+        self.assertEqual(
+            self.get(view, HTTP_IF_NONE_MATCH=etag).status_code, 304, msg=(
+                'Should ignore changes of other entries.'))
+
+        self.entry.title = 'Changed'
+        self.entry.save()
+        self.assertEqual(
+            self.get(view, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class FeedTestCase(ConditionalTestMixin, TestCase):
+    """Tests for the conditional GET of the feeds."""
+
+    def test_feed(self):
+        url = reverse('news_rss')
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=resp['ETag'])
+        self.assertEqual(resp.status_code, 304)
+
+        since = http_date((now() + timedelta(days=1)).timestamp())
+        resp = self.client.get(reverse(
+            'news_rss_author', kwargs={'author': self.entry.author.pk}),
+            HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(resp.status_code, 304)
+
+        resp = self.client.get(reverse(
+            'news_rss_author', kwargs={'author': 999}))
+        self.assertEqual(resp.status_code, 404)
+
+
+class SitemapTestCase(ConditionalTestMixin, TestCase):
+    """Tests for the ``sitemap`` view."""
+
+    def test_view(self):
+        def view(request):
+            return sitemaps.sitemap(request, {'news': sitemaps.NewsSitemap})
+
+        resp = self.get(view)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            self.get(view, HTTP_IF_NONE_MATCH=resp['ETag']).status_code, 304)
@@ -0,0 +1,108 @@
+"""Tests for the feed store of the ``multilingual_news`` app."""
+import hashlib
+
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now, timedelta
+
+from mixer.backend.django import mixer
+from mock import patch
+
+from .. import feed_store
+from .. import feeds
+from .. import models
+from .. import response_cache
+from .mixins import NewsTestMixin
+
+
+class NewsEntriesFeedTestCase(NewsTestMixin, TestCase):
+    """Tests for the stored documents of the news feeds."""
+
+    def setUp(self):
+        super(NewsEntriesFeedTestCase, self).setUp()
+        for module in (feed_store, response_cache):
+            patcher = patch.object(module, 'FEED_STORE_TIMEOUT', 600)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.author = mixer.blend('people.Person')
+        self.tag = mixer.blend('multilingual_tags.Tag')
+        self.tag.set_current_language('en')
+        self.tag.name = 'Tag'
+        self.tag.save()
+        self.entry = self.create_entry('foo')
+
+    def create_entry(self, slug):
+        entry = super(NewsEntriesFeedTestCase, self).create_entry(
+            slug, author=self.author, pub_date=now() - timedelta(days=1))
+        mixer.blend(
+            'multilingual_tags.TaggedItem', tag=self.tag,
+            content_type=ContentType.objects.get_for_model(entry),
+            object_id=entry.pk)
+        return entry
+
+    def get(self, feed, view_name='news_rss', **kwargs):
+        headers = dict((key, kwargs.pop(key)) for key in list(kwargs)
+                       if key.startswith('HTTP_'))
+        data = kwargs.pop('data', None)
+        request = self.get_request(
+            reverse(view_name, kwargs=kwargs), data=data, **headers)
+        return feed(request, **kwargs)
+
+    def test_feed(self):
+        feed = feeds.NewsEntriesFeed()
+        resp = self.get(feed)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            resp['ETag'], '"{0}"'.format(
+                hashlib.md5(resp.content).hexdigest()), msg=(
+                    'Should use the hash of the content as ETag.'))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get(feed).content, resp.content, msg=(
+                'Should serve the stored document.'))
+            self.assertEqual(self.get(
+                feed, HTTP_IF_NONE_MATCH=resp['ETag']).status_code, 304)
+
+        self.create_entry('bar')
+        new_resp = self.get(feed, HTTP_IF_NONE_MATCH=resp['ETag'])
+        self.assertEqual(new_resp.status_code, 200, msg=(
+            'Should render the document again, when an entry was published.'))
+        self.assertIn(b'bar', new_resp.content)
+
+        resp = self.get(feed)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.get(feed, data={'utm_source': 'foo'}).content,
+                resp.content, msg=(
+                    'Should ignore unknown query parameters.'))
+
+        with patch.object(feed_store, 'FEED_STORE_TIMEOUT', 0):
+            with self.assertNumQueries(3):
+                # the conditional GET, the items and their translations
+                self.get(feed)
+
+    def test_variants(self):
+        def get_author_etag(author):
+            return self.get(
+                feeds.AuthorFeed(), 'news_rss_author', author=author.pk)['ETag']
+
+        def get_tagged_etag():
+            return self.get(
+                feeds.TaggedFeed(), 'news_rss_tagged', tag=self.tag.slug)['ETag']
+
+        other_author = mixer.blend('people.Person')
+        author_etag = get_author_etag(self.author)
+        other_etag = get_author_etag(other_author)
+        tagged_etag = get_tagged_etag()
+        self.assertNotEqual(author_etag, other_etag, msg=(
+            'Should store a document per author.'))
+
+        models.NewsEntry.objects.set_published(
+            [self.entry.pk], is_published=False, language='en')
+        self.assertNotEqual(get_author_etag(self.author), author_etag)
+        self.assertNotEqual(get_tagged_etag(), tagged_etag)
+        with self.assertNumQueries(1):
+            # the author is still fetched to validate the URL
+            self.assertEqual(get_author_etag(other_author), other_etag, msg=(
+                'Should keep the documents of unaffected feeds.'))
@@ -1,14 +1,24 @@
 """Tests for the news feeds of the `multilingual_news` app."""
-from django.test import TestCase
-from django.test.utils import override_settings
+import json
+import re
+
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.contrib.contenttypes.models import ContentType
-from django.urls import NoReverseMatch
+from django.urls import NoReverseMatch, reverse
+from django.utils.timezone import now, timedelta
 
 # Note: The feeds can't be tested with the ViewRequestFactoryTestMixin
 from django_libs.tests.mixins import ViewTestMixin
 from mixer.backend.django import mixer
+from mock import patch
 
+from .. import feeds
+from ..feeds import JSONFeed, TaggedFeed
 from ..models import NewsEntry
+from ..pagination import make_cursor
+from .mixins import NewsTestMixin
 
 
 # the key part is only, that the LocaleMiddleware must be taken out.
@@ -84,6 +94,28 @@ class AuthorFeedTestCase(ViewTestMixin, TestCase):
         self.is_callable()
 
 
+class SharedFeedTestCase(TestCase):
+    """Tests for feed instances, that are shared by all requests."""
+    longMessage = True
+
+    def test_no_request_state(self):
+        authors = mixer.cycle(2).blend('people.Person')
+        feed = feeds.AuthorFeed()
+        attributes = set(feed.__dict__)
+        for author in authors:
+            request = RequestFactory().get(
+                reverse('news_rss_author', kwargs={'author': author.pk}))
+            request.LANGUAGE_CODE = 'en'
+            with patch.object(
+                    feed, 'get_object', wraps=feed.get_object) as get_object:
+                resp = feed(request, author=author.pk)
+            self.assertEqual(get_object.call_count, 1, msg=(
+                'Should look the author up once per request.'))
+            self.assertIn(str(author).encode('utf-8'), resp.content)
+            self.assertEqual(set(feed.__dict__), attributes, msg=(
+                'Should not store anything of the request on the feed.'))
+
+
 class AuthorFeedAnyLanguageTestCase(ViewTestMixin, TestCase):
     """Tests for the ``AuthorFeed`` view class."""
 
@@ -137,6 +169,28 @@ class TaggedFeedTestCase(ViewTestMixin, TestCase):
     def test_view(self):
         self.is_callable()
 
+    def test_get_queryset(self):
+        content_type = ContentType.objects.get_for_model(NewsEntry)
+        entries = []
+        for days in range(1, 4):
+            entry = mixer.blend('multilingual_news.NewsEntry')
+            entry.set_current_language('en')
+            entry.is_published = days < 3
+            entry.pub_date = now() - timedelta(days=days)
+            entry.save()
+            mixer.blend('multilingual_tags.TaggedItem', tag=self.tag,
+                        content_type=content_type, object_id=entry.pk)
+            entries.append(entry)
+        feed = TaggedFeed()
+        request = RequestFactory().get('/')
+        request.LANGUAGE_CODE = 'en'
+        obj = feed.get_object(request, tag=self.tag.slug)
+        with self.assertNumQueries(2):
+            # the entries with their authors and their translations
+            items = list(feed.get_queryset(obj))
+        self.assertEqual(items, entries[:2], msg=(
+            'Should return the published entries, latest first.'))
+
 
 class TaggedFeedAnyLanguageTestCase(ViewTestMixin, TestCase):
     """Tests for the ``TaggedFeed`` view class."""
@@ -167,3 +221,90 @@ class TaggedFeedAnyLanguageTestCase(ViewTestMixin, TestCase):
     def test_tag_does_not_exist(self):
         self.tag.delete()
         self.is_not_callable()
+
+
+class FeedFormatsTestCase(NewsTestMixin, TestCase):
+    """Tests for the feed formats and the ``CategoryFeed``."""
+
+    def setUp(self):
+        super(FeedFormatsTestCase, self).setUp()
+        self.category = mixer.blend('multilingual_news.Category')
+        self.child = mixer.blend(
+            'multilingual_news.Category', parent=self.category)
+
+    def get(self, view_name, **kwargs):
+        return self.get_url(reverse(view_name, kwargs=kwargs))
+
+    def get_url(self, url):
+        return self.client.get(url)
+
+    def count_queries(self, view_name, **kwargs):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.get(view_name, **kwargs).status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_formats(self):
+        entry = self.create_entry(categories=[self.category])
+        resp = self.get('news_json')
+        self.assertEqual(resp['Content-Type'], JSONFeed.content_type)
+        data = json.loads(resp.content.decode('utf-8'))
+        self.assertEqual(data['items'][0]['title'], entry.title)
+        self.assertTrue(data['items'][0]['url'].endswith(
+            entry.get_absolute_url()))
+        self.assertIn(b'<feed', self.get('news_atom').content)
+
+        self.create_entry(categories=[self.category])
+        for view_name in ('news_rss', 'news_atom', 'news_json'):
+            queries = self.count_queries(view_name)
+            self.create_entry(categories=[self.category])
+            self.assertEqual(self.count_queries(view_name), queries, msg=(
+                'Should need the same amount of queries for any amount of'
+                ' entries.'))
+
+    def test_category_feed(self):
+        entry = self.create_entry(categories=[self.child])
+        other = self.create_entry(
+            categories=[mixer.blend('multilingual_news.Category')])
+        resp = self.get('news_rss_category', category=self.category.slug)
+        self.assertIn(entry.slug.encode('utf-8'), resp.content, msg=(
+            'Should include the entries of descendant categories.'))
+        self.assertNotIn(other.slug.encode('utf-8'), resp.content)
+        self.assertEqual(
+            self.get('news_atom_category', category='foo').status_code, 404)
+
+    def test_archive(self):
+        entries = [
+            self.create_entry(categories=[self.category]) for x in range(0, 5)]
+        with patch.object(feeds, 'FEED_AMOUNT', 2):
+            resp = self.get('news_atom')
+            self.assertNotIn(b'<fh:archive', resp.content)
+            pages = []
+            while resp is not None:
+                match = re.search(
+                    r'href="([^"]+)" rel="prev-archive"',
+                    resp.content.decode('utf-8'))
+                resp = match and self.get_url(match.group(1))
+                if resp is not None:
+                    pages.append(resp)
+            self.assertEqual(len(pages), 2, msg=(
+                'Should link to the archive pages with the older entries.'))
+            self.assertIn(b'<fh:archive', pages[0].content)
+            self.assertIn(b'rel="current"', pages[0].content)
+            self.assertIn('max-age', pages[0]['Cache-Control'], msg=(
+                'Should let clients keep complete archive pages.'))
+            self.assertFalse(pages[1].has_header('Cache-Control'))
+            self.assertIn(entries[0].slug.encode('utf-8'), pages[1].content)
+
+            data = json.loads(self.get('news_json').content.decode('utf-8'))
+            self.assertEqual(len(data['items']), 2)
+            self.assertIn('before=', data['next_url'])
+
+            with CaptureQueriesContext(connection) as ctx:
+                self.get_url(data['next_url'])
+            self.assertEqual(
+                len(ctx.captured_queries), self.count_queries('news_json'))
+            self.assertEqual(self.get_url(
+                reverse('news_json') + '?before=foo').status_code, 404)
+            self.assertEqual(self.get_url('{0}?before={1}'.format(
+                reverse('news_json'), make_cursor(None, 5))).status_code, 404,
+                msg='Should reject cursors without a publication date.')
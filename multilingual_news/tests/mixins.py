@@ -0,0 +1,50 @@
+"""Shared fixtures for the tests of the ``multilingual_news`` app."""
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import RequestFactory
+from django.utils.translation import activate
+
+from mixer.backend.django import mixer
+
+
+class NewsTestMixin(object):
+    """
+    Mixin for test cases, that create news entries.
+
+    The cache is cleared and English is activated before each test.
+
+    """
+    longMessage = True
+
+    def setUp(self):
+        # parler caches translations by primary key, which are re-used after
+        # the rollback of the previous test
+        cache.clear()
+        activate('en')
+
+    def create_entry(self, slug=None, language='en', categories=(), **kwargs):
+        """
+        Returns a new entry, that is published in the given language.
+
+        The slug and the title default to ``entry-<pk>``. Other fields of the
+        entry or its translation can be given as keyword arguments.
+
+        """
+        entry = mixer.blend('multilingual_news.NewsEntry')
+        entry.set_current_language(language)
+        entry.slug = slug or 'entry-{0}'.format(entry.pk)
+        entry.title = entry.slug
+        entry.is_published = True
+        for field, value in kwargs.items():
+            setattr(entry, field, value)
+        entry.save()
+        if categories:
+            entry.categories.add(*categories)
+        return entry
+
+    def get_request(self, path='/', user=None, **kwargs):
+        """Returns a GET request of the given user or an anonymous one."""
+        request = RequestFactory().get(path, **kwargs)
+        request.user = user or AnonymousUser()
+        request.current_page = None
+        return request
@@ -1,10 +1,25 @@
 """Tests for the models of the ``multilingual_news`` app."""
+from datetime import datetime
+from unittest import skipUnless
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now, timedelta, utc
 from django.urls import reverse
 from django.test import TestCase
 
+from cms.api import add_plugin
 from mixer.backend.django import mixer
+from mock import patch
+from multilingual_tags.models import TaggedItem
 
 from .. import models
+from .. import pagination
+from .. import signals
+from .mixins import NewsTestMixin
 
 
 class CategoryTestCase(TestCase):
@@ -16,6 +31,181 @@ class CategoryTestCase(TestCase):
         category = mixer.blend('multilingual_news.Category')
         self.assertTrue(category.pk)
 
+    def test_tree_path(self):
+        root = mixer.blend('multilingual_news.Category')
+        child = mixer.blend('multilingual_news.Category', parent=root)
+        grandchild = mixer.blend('multilingual_news.Category', parent=child)
+        self.assertEqual(grandchild.tree_path, '{0}/{1}/{2}/'.format(
+            root.pk, child.pk, grandchild.pk))
+        self.assertEqual(
+            set(root.get_descendants()), set([child, grandchild]))
+
+        other = mixer.blend('multilingual_news.Category')
+        child.parent = other
+        child.save()
+        grandchild.refresh_from_db()
+        self.assertEqual(grandchild.tree_path, '{0}/{1}/{2}/'.format(
+            other.pk, child.pk, grandchild.pk), msg=(
+                'Should move the subtree along with the category.'))
+        self.assertEqual(root.get_descendants().count(), 0)
+
+        child.parent = grandchild
+        self.assertRaises(ValidationError, child.clean)
+
+        other.delete()
+        grandchild.refresh_from_db()
+        self.assertEqual(grandchild.tree_path, '{0}/{1}/'.format(
+            child.pk, grandchild.pk), msg=(
+                'Should turn the children of a deleted category into roots.'))
+
+    def test_get_tree_filter(self):
+        category = mixer.blend('multilingual_news.Category', pk=5)
+        child = mixer.blend('multilingual_news.Category', parent=category)
+        mixer.blend('multilingual_news.Category', pk=50)
+        self.assertEqual(set(models.Category.objects.filter(
+            models.Category.get_tree_filter(category.tree_path))),
+            set([category, child]), msg=(
+                'Should match the subtree, but not paths with a longer pk.'))
+
+    def test_get_entries(self):
+        root = mixer.blend('multilingual_news.Category')
+        child = mixer.blend('multilingual_news.Category', parent=root)
+        grandchild = mixer.blend('multilingual_news.Category', parent=child)
+        entry = mixer.blend('multilingual_news.NewsEntry')
+        entry.set_current_language('en')
+        entry.is_published = True
+        entry.save()
+        entry.categories.add(grandchild, child)
+        self.assertEqual(list(root.get_entries()), [entry], msg=(
+            'Should return entries of all descendants only once.'))
+        self.assertEqual(list(grandchild.get_entries()), [entry])
+        other = mixer.blend('multilingual_news.Category')
+        self.assertEqual(other.get_entries().count(), 0)
+
+
+class CategoryEntryCountTestCase(TestCase):
+    """Tests for the ``CategoryEntryCount`` model."""
+    longMessage = True
+
+    def setUp(self):
+        self.root = mixer.blend('multilingual_news.Category')
+        self.child = mixer.blend('multilingual_news.Category', parent=self.root)
+        self.entry = mixer.blend('multilingual_news.NewsEntry')
+        self.entry.set_current_language('en')
+        self.entry.is_published = True
+        self.entry.save()
+
+    def test_counts(self):
+        self.entry.categories.add(self.child)
+        self.assertEqual(self.child.get_entry_count('en'), 1)
+        self.assertEqual(self.root.get_entry_count('en'), 1, msg=(
+            'Should count the entries of descendant categories.'))
+        self.assertEqual(self.root.get_entry_count('de'), 0)
+
+        self.entry.is_published = False
+        self.entry.save()
+        self.assertEqual(self.root.get_entry_count('en'), 0, msg=(
+            'Should update the count, when an entry is unpublished.'))
+
+        self.entry.is_published = True
+        self.entry.save()
+        self.entry.categories.remove(self.child)
+        self.assertEqual(self.child.get_entry_count('en'), 0, msg=(
+            'Should update the count, when an entry is recategorized.'))
+
+        self.child.newsentries.add(self.entry)
+        self.entry.delete()
+        self.assertEqual(self.root.get_entry_count('en'), 0, msg=(
+            'Should update the count, when an entry is deleted.'))
+
+    def test_moved_category(self):
+        self.entry.categories.add(self.child)
+        other = mixer.blend('multilingual_news.Category')
+        with CaptureQueriesContext(connection) as ctx:
+            self.child.save()
+        self.assertFalse([
+            query for query in ctx.captured_queries
+            if 'categoryentrycount' in query['sql']], msg=(
+                'Should not recount, when the category was not moved.'))
+
+        self.child.parent = other
+        self.child.save()
+        self.assertEqual(self.root.get_entry_count('en'), 0, msg=(
+            'Should recount the old ancestors.'))
+        self.assertEqual(other.get_entry_count('en'), 1, msg=(
+            'Should recount the new ancestors.'))
+        self.assertEqual(self.child.get_entry_count('en'), 1)
+
+        other.delete()
+        self.child.refresh_from_db()
+        self.assertEqual(self.child.get_entry_count('en'), 1)
+        self.assertEqual(models.CategoryEntryCount.objects.filter(
+            category=self.child).count(), 1)
+
+    def test_stale_category(self):
+        stale = models.Category.objects.get(pk=self.child.pk)
+        other = mixer.blend('multilingual_news.Category')
+        self.child.parent = other
+        self.child.save()
+        stale.newsentries.add(self.entry)
+        self.assertEqual(other.get_entry_count('en'), 1, msg=(
+            'Should recount the stored ancestors of the category.'))
+        self.assertEqual(self.root.get_entry_count('en'), 0)
+
+        stale.newsentries.clear()
+        self.assertEqual(other.get_entry_count('en'), 0)
+
+    def test_scheduled_entries(self):
+        self.entry.pub_date = now() + timedelta(minutes=5)
+        self.entry.save()
+        self.entry.categories.add(self.child)
+        self.assertEqual(self.child.get_entry_count('en'), 0)
+        models.NewsEntry.objects.filter(pk=self.entry.pk).update(
+            pub_date=now() - timedelta(minutes=1))
+        call_command('refresh_news_aggregates')
+        self.assertEqual(self.child.get_entry_count('en'), 1, msg=(
+            'Should pick up entries, whose publication date has passed.'))
+
+
+class ArchiveEntryCountTestCase(NewsTestMixin, TestCase):
+    """Tests for the ``ArchiveEntryCount`` model."""
+
+    def setUp(self):
+        super(ArchiveEntryCountTestCase, self).setUp()
+        self.entry = self.create_entry(
+            'foo', pub_date=datetime(2020, 3, 15, tzinfo=utc))
+
+    def get_counts(self):
+        return list(models.ArchiveEntryCount.objects.values_list(
+            'language_code', 'year', 'month', 'count'))
+
+    def test_counts(self):
+        self.assertEqual(self.get_counts(), [('en', 2020, 3, 1)])
+
+        self.entry.pub_date = datetime(2019, 12, 15, tzinfo=utc)
+        self.entry.save()
+        self.assertEqual(self.get_counts(), [('en', 2019, 12, 1)], msg=(
+            'Should move the entry, when the publication date changes.'))
+
+        models.NewsEntry.objects.set_published(
+            [self.entry.pk], is_published=False, language='en')
+        self.assertEqual(self.get_counts(), [], msg=(
+            'Should update the counts, when an entry is unpublished.'))
+
+        self.entry.set_current_language('de')
+        self.entry.slug = 'foo'
+        self.entry.is_published = True
+        self.entry.save()
+        self.assertEqual(self.get_counts(), [('de', 2019, 12, 1)])
+        self.entry.delete()
+        self.assertEqual(self.get_counts(), [], msg=(
+            'Should update the counts, when an entry is deleted.'))
+
+    def test_refresh_news_aggregates(self):
+        models.ArchiveEntryCount.objects.all().delete()
+        call_command('refresh_news_aggregates', all=True)
+        self.assertEqual(self.get_counts(), [('en', 2020, 3, 1)])
+
 
 class NewsEntryTestCase(TestCase):
     """Tests for the ``NewsEntry`` model."""
@@ -45,13 +235,221 @@ class NewsEntryTestCase(TestCase):
     def test_category(self):
         self.assertIsNone(self.instance.category, msg=(
             'Should return None if entry has no category.'))
+        category = mixer.blend('multilingual_news.Category')
+        self.instance.categories.add(category)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.instance.category, category, msg=(
+                'Should return the category after the categories changed.'))
+            self.assertEqual(self.instance.category, category, msg=(
+                'Should cache the category on the instance.'))
+
+    def test_description(self):
+        plugin = add_plugin(
+            self.instance.content, 'TextPlugin', 'en', body='<p>Content</p>')
+        entry = models.NewsEntry.objects.language('en').get(pk=self.instance.pk)
+        self.assertEqual(entry.description, 'Content', msg=(
+            'Should store the text, when a text plugin is added.'))
+
+        add_plugin(self.instance.excerpt, 'TextPlugin', 'en', body='<b>Excerpt</b>')
+        entry = models.NewsEntry.objects.language('en').get(pk=self.instance.pk)
+        self.assertEqual(entry.description, 'Excerpt', msg=(
+            'Should prefer the text of the excerpt.'))
+
+        plugin.body = 'Changed'
+        plugin.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.instance.get_description('en'), 'Excerpt', msg=(
+                'Should fetch all text plugins in one query.'))
+
+    def test_modified(self):
+        def get_modified():
+            return models.NewsEntry.objects.get(pk=self.instance.pk).modified
+
+        modified = get_modified()
+        add_plugin(self.instance.content, 'TextPlugin', 'en', body='Content')
+        self.assertGreater(get_modified(), modified, msg=(
+            'Should be updated, when a text plugin changes.'))
+
+        modified = get_modified()
+        tag = mixer.blend('multilingual_tags.Tag')
+        TaggedItem.objects.create(
+            tag=tag, object_id=self.instance.pk,
+            content_type=ContentType.objects.get_for_model(models.NewsEntry))
+        self.assertGreater(get_modified(), modified, msg=(
+            'Should be updated, when the entry is tagged.'))
+
+        modified = get_modified()
+        self.instance.categories.add(mixer.blend('multilingual_news.Category'))
+        self.assertGreater(get_modified(), modified, msg=(
+            'Should be updated, when the categories change.'))
+
+        modified = get_modified()
+        models.NewsEntry.objects.set_published([self.instance.pk], language='en')
+        self.assertGreater(get_modified(), modified, msg=(
+            'Should be updated, when the entry is published in bulk.'))
+
+    def test_update_news_descriptions(self):
+        add_plugin(self.instance.content, 'TextPlugin', 'en', body='<p>Content</p>')
+        models.NewsEntryTranslation.objects.update(description='')
+        call_command('update_news_descriptions', batch_size=1, verbosity=0)
+        self.assertEqual(
+            models.NewsEntryTranslation.objects.get(master=self.instance).description,
+            'Content', msg='Should backfill the stored descriptions.')
+
 
+class RelatedEntryTestCase(NewsTestMixin, TestCase):
+    """Tests for the ``RelatedEntry`` model and ``NewsEntry.get_related``."""
 
-class NewsEntryManagerTestCase(TestCase):
+    def tag(self, entry, tag):
+        mixer.blend(
+            'multilingual_tags.TaggedItem', tag=tag,
+            content_type=ContentType.objects.get_for_model(entry),
+            object_id=entry.pk)
+
+    def setUp(self):
+        super(RelatedEntryTestCase, self).setUp()
+        self.category = mixer.blend('multilingual_news.Category')
+        self.tag_a, self.tag_b = mixer.cycle(2).blend('multilingual_tags.Tag')
+        self.entry = self.create_entry()
+        self.entry.categories.add(self.category)
+        self.tag(self.entry, self.tag_a)
+        self.tag(self.entry, self.tag_b)
+        self.best = self.create_entry()
+        self.tag(self.best, self.tag_a)
+        self.tag(self.best, self.tag_b)
+        self.other = self.create_entry()
+        self.other.categories.add(self.category)
+        self.unrelated = self.create_entry()
+
+    def test_get_related(self):
+        self.assertEqual(
+            list(self.entry.get_related('en')), [self.best, self.other],
+            msg='Should order the entries by the amount of shared tags and'
+                ' categories.')
+        self.assertEqual(list(self.other.get_related('en')), [self.entry])
+        self.assertEqual(list(self.unrelated.get_related('en')), [])
+        self.assertEqual(list(self.entry.get_related('de')), [], msg=(
+            'Should only return entries in the given language.'))
+        with self.assertNumQueries(1):
+            list(self.entry.get_related('en'))
+
+    def test_incremental_updates(self):
+        self.other.categories.clear()
+        self.assertEqual(
+            list(self.entry.get_related('en')), [self.best], msg=(
+                'Should update the index, when categories are removed.'))
+        self.category.newsentries.add(self.unrelated)
+        self.assertEqual(
+            list(self.entry.get_related('en')), [self.best, self.unrelated],
+            msg='Should update the index, when entries are added to a'
+                ' category.')
+        TaggedItem.objects.filter(object_id=self.best.pk).delete()
+        self.assertEqual(
+            list(self.entry.get_related('en')), [self.unrelated], msg=(
+                'Should update the index, when tags are removed.'))
+
+        models.NewsEntry.objects.set_published(
+            [self.unrelated.pk], is_published=False, language='en')
+        self.assertEqual(list(self.entry.get_related('en')), [], msg=(
+            'Should only list published entries.'))
+
+    def get_index(self):
+        return sorted(models.RelatedEntry.objects.values_list(
+            'entry_id', 'related_id', 'language_code', 'score', 'position'))
+
+    def test_matches_rebuild(self):
+        def rebuild():
+            models.RelatedEntry.objects.update_related(
+                models.NewsEntry.objects.values_list('pk', flat=True),
+                neighbours=False)
+
+        changes = [
+            lambda: TaggedItem.objects.filter(
+                object_id=self.best.pk).first().delete(),
+            lambda: self.unrelated.categories.add(self.category),
+            lambda: self.tag(self.unrelated, self.tag_b),
+            lambda: models.NewsEntry.objects.set_published(
+                [self.other.pk], is_published=False, language='en'),
+        ]
+        with patch.object(models, 'RELATED_AMOUNT', 1):
+            rebuild()
+            for change in changes:
+                change()
+                index = self.get_index()
+                rebuild()
+                self.assertEqual(index, self.get_index(), msg=(
+                    'Should update the index incrementally to the same'
+                    ' result.'))
+
+    def test_pub_date_change_matches_rebuild(self):
+        def rebuild():
+            models.RelatedEntry.objects.update_related(
+                models.NewsEntry.objects.values_list('pk', flat=True),
+                neighbours=False)
+
+        def move(entry, days):
+            entry.pub_date = now() - timedelta(days=days)
+            entry.save()
+
+        def publish_undated():
+            models.NewsEntry.objects.filter(pk=self.unrelated.pk).update(
+                pub_date=None)
+            models.NewsEntry.objects.set_published(
+                [self.unrelated.pk], is_published=False, language='en')
+            rebuild()
+            models.NewsEntry.objects.set_published(
+                [self.unrelated.pk], is_published=True, language='en')
+
+        self.unrelated.categories.add(self.category)
+        self.unrelated.set_current_language('de')
+        self.unrelated.slug = 'unrelated-de'
+        self.unrelated.is_published = True
+        self.unrelated.save()
+        changes = [
+            lambda: move(self.entry, 10),
+            lambda: move(self.unrelated, 20),
+            lambda: move(self.entry, 30),
+            publish_undated,
+        ]
+        with patch.object(models, 'RELATED_AMOUNT', 1):
+            rebuild()
+            for change in changes:
+                change()
+                index = self.get_index()
+                rebuild()
+                self.assertEqual(index, self.get_index(), msg=(
+                    'Should update the index to the same result, when the'
+                    ' publication date changed.'))
+
+    def test_unchanged_entry(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.entry.save()
+        self.assertFalse([
+            query for query in ctx.captured_queries
+            if 'relatedentry' in query['sql']], msg=(
+                'Should not update the index, when nothing relevant changed.'))
+
+    def test_delete(self):
+        with patch.object(models, 'RELATED_AMOUNT', 1):
+            models.RelatedEntry.objects.update_related([self.entry.pk])
+            self.assertEqual(list(self.entry.get_related('en')), [self.best])
+            self.best.delete()
+            self.assertEqual(
+                list(self.entry.get_related('en')), [self.other], msg=(
+                    'Should fill the gap, that a deleted entry leaves.'))
+
+    def test_refresh_news_aggregates(self):
+        models.RelatedEntry.objects.all().delete()
+        call_command('refresh_news_aggregates', all=True)
+        self.assertEqual(
+            list(self.entry.get_related('en')), [self.best, self.other])
+
+
+class NewsEntryManagerTestCase(NewsTestMixin, TestCase):
     """Tests for the ``NewsEntryManager`` model manager."""
-    longMessage = True
 
     def setUp(self):
+        super(NewsEntryManagerTestCase, self).setUp()
         entry = mixer.blend('multilingual_news.NewsEntry')
         entry.set_current_language('en')
         entry.title = 'Foo en'
@@ -107,3 +505,181 @@ class NewsEntryManagerTestCase(TestCase):
                 language='en')[0])
         self.assertEqual(result.count(), 1, msg=(
             'Should exclude the given object'))
+
+    def test_published_without_duplicates(self):
+        categories = mixer.cycle(2).blend('multilingual_news.Category')
+        entry = models.NewsEntry.objects.published(language='en')[0]
+        entry.categories.add(*categories)
+        result = models.NewsEntry.objects.published(
+            language='en', kwargs={'categories__in': categories})
+        self.assertEqual(list(result), [entry], msg=(
+            'Should return an entry only once, even if it is in several of'
+            ' the given categories.'))
+        result = models.NewsEntry.objects.published(
+            language='en', exclude_kwargs={'categories__in': categories})
+        self.assertEqual(result.count(), 1, msg=(
+            'Should exclude entries, that are in one of the categories.'))
+        self.assertNotIn(entry, result)
+
+    def test_published_exclude_kwargs_combined(self):
+        category = mixer.blend('multilingual_news.Category')
+        entry, other = models.NewsEntry.objects.published(language='en')[:2]
+        for instance in (entry, other):
+            instance.author = mixer.blend('people.Person')
+            instance.save()
+            instance.categories.add(category)
+        result = models.NewsEntry.objects.published(
+            language='en', exclude_kwargs={
+                'author': entry.author, 'categories__in': [category]})
+        self.assertEqual(list(result), [other], msg=(
+            'Should only exclude entries, that match all lookups together.'))
+
+    def test_set_published(self):
+        received = []
+
+        def receiver(sender, **kwargs):
+            received.append(kwargs)
+
+        signals.publication_changed.connect(receiver)
+        self.addCleanup(signals.publication_changed.disconnect, receiver)
+        models.NewsEntry.objects.update(pub_date=None)
+        entries = models.NewsEntry.objects.all()
+        pks = models.NewsEntry.objects.set_published(
+            entries, is_published=False, language='de')
+        self.assertEqual(sorted(pks), sorted(e.pk for e in entries))
+        self.assertEqual(
+            models.NewsEntry.objects.published(language='de').count(), 0, msg=(
+                'Should unpublish the German translations.'))
+        self.assertEqual(
+            models.NewsEntry.objects.published(language='en').count(), 2, msg=(
+                'Should not touch the other translations.'))
+        self.assertEqual(len(received), 1, msg=(
+            'Should send one signal for all entries.'))
+        self.assertEqual(received[0]['language'], 'de')
+
+        with CaptureQueriesContext(connection) as ctx:
+            pks = models.NewsEntry.objects.set_published(
+                [e.pk for e in entries], language='de')
+        self.assertEqual(len(pks), 2)
+        updates = [
+            q['sql'] for q in ctx.captured_queries
+            if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2, msg=(
+            'Should update the translations and publication dates of all'
+            ' entries with one query each.'))
+        entry = models.NewsEntry.objects.language('de').get(pk=pks[0])
+        self.assertTrue(entry.is_published)
+        self.assertIsNotNone(entry.pub_date, msg=(
+            'Should set the publication date of published entries.'))
+        self.assertEqual(models.NewsEntry.objects.set_published(
+            [entry.pk], language='de'), [], msg=(
+                'Should skip entries, that are already published.'))
+
+
+class NewsEntryQuerySetTestCase(NewsTestMixin, TestCase):
+    """Tests for the ``NewsEntryQuerySet`` queryset."""
+
+    def create_entry(self):
+        entry = super(NewsEntryQuerySetTestCase, self).create_entry(
+            title='Foo', author=mixer.blend('people.Person'))
+        for x in range(0, 2):
+            category = mixer.blend('multilingual_news.Category')
+            category.set_current_language('en')
+            category.title = 'Category'
+            category.save()
+            entry.categories.add(category)
+            tag = mixer.blend('multilingual_tags.Tag')
+            tag.set_current_language('en')
+            tag.name = 'Tag'
+            tag.save()
+            mixer.blend(
+                'multilingual_tags.TaggedItem', tag=tag,
+                content_type=ContentType.objects.get_for_model(entry),
+                object_id=entry.pk)
+        return entry
+
+    def render(self):
+        """Touches everything, that ``partials/entry.html`` touches."""
+        with CaptureQueriesContext(connection) as ctx:
+            qs = models.NewsEntry.objects.published(language='en')
+            for entry in qs.for_listing():
+                str(entry.title)
+                entry.get_absolute_url()
+                str(entry.author)
+                entry.image, entry.thumbnail, entry.excerpt, entry.content
+                str(entry.category.title)
+                for category in entry.categories.all():
+                    str(category.title)
+                    category.get_absolute_url()
+                for tagged_item in entry.tags.all():
+                    str(tagged_item.tag.name)
+                    tagged_item.tag.slug
+        return len(ctx.captured_queries)
+
+    def test_for_listing(self):
+        self.create_entry()
+        self.create_entry()
+        queries = self.render()
+        self.create_entry()
+        self.create_entry()
+        self.assertEqual(self.render(), queries, msg=(
+            'Should need the same amount of queries for any amount of'
+            ' entries.'))
+
+    def test_tagged(self):
+        first, second = self.create_entry(), self.create_entry()
+        tag, other_tag = [item.tag for item in first.tags.all()]
+        mixer.blend(
+            'multilingual_tags.TaggedItem', tag=tag,
+            content_type=ContentType.objects.get_for_model(second),
+            object_id=second.pk)
+        qs = models.NewsEntry.objects.published(language='en')
+        self.assertEqual(list(qs.tagged([tag, other_tag])), [first], msg=(
+            'Should return the entries with all of the tags.'))
+        self.assertEqual(
+            set(qs.tagged([tag.pk, other_tag.pk], match_all=False)),
+            set([first, second]), msg=(
+                'Should return the entries with any of the tags without'
+                ' duplicates.'))
+        self.assertEqual(qs.tagged([]).count(), 0)
+
+        with self.assertNumQueries(2):
+            counts = dict(
+                (item.slug, item.entry_count) for item in qs.tag_counts())
+        self.assertEqual(counts[tag.slug], 2)
+        self.assertEqual(counts[other_tag.slug], 1)
+        self.assertEqual(len(counts), 4)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Query plans are backend specific.')
+class NewsEntryIndexesTestCase(TestCase):
+    """Tests for the indexes, that back the published entry queries."""
+    longMessage = True
+
+    def test_published_uses_index(self):
+        plan = models.NewsEntry.objects.published(language='en').explain()
+        self.assertIn('news_entry_pub_date_idx', plan, msg=(
+            'Should read the entries in publication date order.'))
+        self.assertNotIn('TEMP B-TREE', plan, msg=(
+            'Should neither sort nor de-duplicate the result.'))
+
+    def test_cursor_pages_use_index(self):
+        qs = models.NewsEntry.objects.published(language='en')
+        pages = {
+            'first': pagination.order(qs),
+            'next': pagination.seek(qs, now(), 1),
+            'previous': pagination.seek(qs, now(), 1, reverse=True),
+        }
+        for name, page in pages.items():
+            plan = page[:11].explain()
+            self.assertIn('news_entry_pub_date_idx', plan, msg=(
+                'Should read the {0} page in index order.'.format(name)))
+            self.assertNotIn('TEMP B-TREE', plan, msg=(
+                'Should not sort the {0} page.'.format(name)))
+
+    def test_slug_lookup_uses_index(self):
+        plan = models.NewsEntry.objects.language('en').filter(
+            translations__language_code='en',
+            translations__slug='foo').explain()
+        self.assertIn('news_trans_lang_slug_idx', plan, msg=(
+            'Should resolve slugs via the composite index.'))
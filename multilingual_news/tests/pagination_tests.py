@@ -0,0 +1,75 @@
+"""Tests for the cursor pagination of the ``multilingual_news`` app."""
+from django.test import TestCase
+from django.utils.timezone import now, timedelta
+
+from mixer.backend.django import mixer
+
+from .. import models
+from .. import pagination
+
+
+class CursorTestCase(TestCase):
+    """Tests for the ``encode_cursor`` and ``decode_cursor`` functions."""
+    longMessage = True
+
+    def test_round_trip(self):
+        entry = mixer.blend('multilingual_news.NewsEntry', pub_date=now())
+        direction, pub_date, pk = pagination.decode_cursor(
+            pagination.encode_cursor(entry, pagination.PREVIOUS))
+        self.assertEqual(direction, pagination.PREVIOUS)
+        self.assertEqual(pub_date, entry.pub_date)
+        self.assertEqual(pk, entry.pk)
+
+        entry.pub_date = None
+        self.assertIsNone(pagination.decode_cursor(
+            pagination.encode_cursor(entry))[1], msg=(
+                'Should support entries without publication date.'))
+
+    def test_invalid(self):
+        for token in ['foo', '!!!', 'eHx8MQ', 'bnx4fDE', 'bnx8Zm9v']:
+            self.assertRaises(
+                pagination.InvalidCursor, pagination.decode_cursor, token)
+
+
+class CursorPageTestCase(TestCase):
+    """Tests for the ``CursorPage`` class."""
+    longMessage = True
+
+    def setUp(self):
+        self.entries = []
+        for x in range(0, 5):
+            entry = mixer.blend('multilingual_news.NewsEntry')
+            entry.set_current_language('en')
+            entry.is_published = True
+            entry.pub_date = now() - timedelta(days=x % 3)
+            entry.save()
+            self.entries.append(entry)
+        self.expected = [
+            e.pk for e in sorted(
+                self.entries, key=lambda e: (e.pub_date, e.pk), reverse=True)]
+
+    def test_pages(self):
+        qs = models.NewsEntry.objects.published(language='en')
+        page = pagination.CursorPage(qs, 2)
+        self.assertEqual([e.pk for e in page], self.expected[:2])
+        self.assertFalse(page.has_previous())
+        self.assertIsNone(page.previous_cursor)
+
+        page = pagination.CursorPage(qs, 2, page.next_cursor)
+        self.assertEqual([e.pk for e in page], self.expected[2:4], msg=(
+            'Should seek to the entries after the cursor.'))
+        self.assertTrue(page.has_previous())
+        self.assertTrue(page.has_next())
+
+        last_page = pagination.CursorPage(qs, 2, page.next_cursor)
+        self.assertEqual([e.pk for e in last_page], self.expected[4:])
+        self.assertFalse(last_page.has_next())
+
+        page = pagination.CursorPage(qs, 2, last_page.previous_cursor)
+        self.assertEqual([e.pk for e in page], self.expected[2:4], msg=(
+            'Should seek back to the entries before the cursor.'))
+
+    def test_no_count(self):
+        qs = models.NewsEntry.objects.published(language='en')
+        with self.assertNumQueries(1):
+            pagination.CursorPage(qs, 2)
@@ -0,0 +1,114 @@
+"""Tests for the response cache of the ``multilingual_news`` app."""
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import TestCase
+from django.utils.timezone import now, timedelta
+
+from mixer.backend.django import mixer
+from mock import patch
+
+from .. import models
+from .. import response_cache
+from .. import views
+from .mixins import NewsTestMixin
+
+
+class ResponseCacheTestMixin(NewsTestMixin):
+    def setUp(self):
+        super(ResponseCacheTestMixin, self).setUp()
+        patcher = patch.object(response_cache, 'RESPONSE_CACHE_TIMEOUT', 600)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.category = mixer.blend('multilingual_news.Category')
+        self.entry = self.create_entry(
+            'foo', categories=[self.category],
+            pub_date=now() - timedelta(days=1))
+
+    def get(self, view, user=None, **kwargs):
+        response = view(self.get_request(user=user), **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+
+
+class CachedResponseMixinTestCase(ResponseCacheTestMixin, TestCase):
+    """Tests for the ``CachedResponseMixin`` with the news views."""
+
+    def test_list(self):
+        view = views.GetEntriesAjaxView.as_view()
+        content = self.get(view).content
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get(view).content, content, msg=(
+                'Should return the cached response.'))
+
+        self.entry.title = 'changed'
+        self.entry.save()
+        self.assertIn(b'changed', self.get(view).content, msg=(
+            'Should render the list again, when a listed entry was saved.'))
+
+        admin = mixer.blend('auth.User', is_superuser=True)
+        self.assertNotEqual(
+            response_cache.get_response_key(self.get_request(user=admin)),
+            response_cache.get_response_key(self.get_request()), msg=(
+                'Should cache the responses for staff separately.'))
+
+    def test_category(self):
+        view = views.CategoryListView.as_view()
+        kwargs = {'category': self.category.slug}
+        self.get(view, **kwargs)
+        with self.assertNumQueries(1):
+            self.get(view, **kwargs)
+
+        other = self.create_entry('bar', pub_date=now() - timedelta(days=1))
+        with self.assertNumQueries(1):
+            self.get(view, **kwargs)
+
+        other.categories.add(self.category)
+        self.assertIn(b'bar', self.get(view, **kwargs).content, msg=(
+            'Should render the archive again, when an entry was added.'))
+        self.category.newsentries.clear()
+        self.assertNotIn(b'bar', self.get(view, **kwargs).content, msg=(
+            'Should render the archive again, when entries were removed.'))
+
+    def test_detail(self):
+        def view(request):
+            return views.NewsDetailView.as_view()(request, slug='foo')
+
+        self.get(view)
+        # the conditional GET is checked before the cache
+        with self.assertNumQueries(1):
+            self.get(view)
+
+        models.NewsEntry.objects.set_published(
+            [self.entry.pk], is_published=False, language='en')
+        self.assertIsNone(response_cache.get_response(
+            response_cache.get_response_key(self.get_request())), msg=(
+                'Should invalidate the detail page, when the entry was'
+                ' unpublished.'))
+
+    def test_csrf(self):
+        request = self.get_request()
+        request.META['CSRF_COOKIE_USED'] = True
+        key = response_cache.get_response_key(request)
+        response_cache.set_response(key, request, HttpResponse('foo'), [])
+        self.assertIsNone(cache.get(key), msg=(
+            'Should not store responses with a CSRF token.'))
+
+
+class InvalidateScheduledTestCase(ResponseCacheTestMixin, TestCase):
+    """Tests for the ``invalidate_scheduled`` function."""
+
+    def test_function(self):
+        pub_date = now() + timedelta(hours=1)
+        self.create_entry('bar', pub_date=pub_date)
+        self.get(views.NewsListView.as_view())
+        key = response_cache.get_response_key(self.get_request())
+        self.assertIsNotNone(response_cache.get_response(key))
+
+        with self.assertNumQueries(0):
+            response_cache.invalidate_scheduled()
+        with patch.object(response_cache, 'now',
+                          return_value=pub_date + timedelta(minutes=1)):
+            self.assertIsNone(response_cache.get_response(key), msg=(
+                'Should invalidate the list, when an entry reaches its'
+                ' publication date.'))
@@ -0,0 +1,86 @@
+"""Tests for the full text search of the ``multilingual_news`` app."""
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils.timezone import now, timedelta
+
+from cms.api import add_plugin
+from mixer.backend.django import mixer
+
+from .. import models
+from .. import search
+from .mixins import NewsTestMixin
+
+
+class SearchTestCase(NewsTestMixin, TestCase):
+    """Tests for the search documents and ``NewsEntryManager.search``."""
+
+    def setUp(self):
+        super(SearchTestCase, self).setUp()
+        self.apple = self.create_entry(title='Apple harvest')
+        self.pear = self.create_entry(
+            title='Pears', meta_description='No apples')
+        self.german = self.create_entry(title='Apfel', language='de')
+
+    def search(self, query, language='en'):
+        return list(models.NewsEntry.objects.search(query, language=language))
+
+    def test_search(self):
+        self.assertEqual(self.search('apple'), [self.apple, self.pear], msg=(
+            'Should rank matches in the title higher.'))
+        self.assertEqual(self.search('apple harvest'), [self.apple], msg=(
+            'Should only return entries, that match all words.'))
+        self.assertEqual(self.search('apfel'), [], msg=(
+            'Should only search the given language.'))
+        self.assertEqual(self.search('apfel', language='de'), [self.german])
+        self.assertEqual(self.search('"apple OR NEAR('), [])
+        self.assertEqual(self.search('  '), [])
+
+    def test_placeholder_text(self):
+        plugin = add_plugin(
+            self.pear.content, 'TextPlugin', 'en', body='<p>Juicy pears</p>')
+        self.assertEqual(self.search('juicy'), [self.pear], msg=(
+            'Should index the text of the placeholders.'))
+        plugin.body = 'Sweet'
+        plugin.save()
+        self.assertEqual(self.search('juicy'), [], msg=(
+            'Should update the index, when a text plugin changes.'))
+        self.assertEqual(self.search('sweet'), [self.pear])
+
+    def test_published_only(self):
+        models.NewsEntry.objects.set_published(
+            [self.apple.pk], is_published=False, language='en')
+        self.assertEqual(self.search('apple'), [self.pear], msg=(
+            'Should only return published entries.'))
+        self.pear.pub_date = now() + timedelta(days=1)
+        self.pear.save()
+        self.assertEqual(self.search('apple'), [])
+
+        self.apple.set_current_language('en')
+        self.apple.delete_translation('en')
+        self.assertFalse(models.SearchDocument.objects.filter(
+            entry=self.apple, language_code='en').exists(), msg=(
+                'Should delete the document with the translation.'))
+
+    def test_rebuild_news_search_index(self):
+        add_plugin(self.pear.content, 'TextPlugin', 'en', body='Juicy')
+        models.SearchDocument.objects.all().delete()
+        self.assertEqual(self.search('apple'), [])
+        call_command('rebuild_news_search_index', batch_size=2, verbosity=0)
+        self.assertEqual(self.search('apple'), [self.apple, self.pear])
+        self.assertEqual(self.search('juicy'), [self.pear])
+        self.assertEqual(models.SearchDocument.objects.count(), 3)
+
+
+class SearchBackendTestCase(TestCase):
+    """Tests for the ``SearchBackend`` fallback."""
+    longMessage = True
+
+    def test_search(self):
+        entry = mixer.blend('multilingual_news.NewsEntry')
+        mixer.blend(
+            'multilingual_news.SearchDocument', entry=entry,
+            language_code='en', title='Apple', text='Harvest')
+        backend = search.SearchBackend(None)
+        self.assertEqual(backend.search('apple harvest', 'en', 10), [entry.pk])
+        self.assertEqual(backend.search('apple', 'de', 10), [])
+        self.assertEqual(backend.search('', 'en', 10), [])
@@ -17,4 +17,4 @@ class NewsSitemapTestCase(TestCase):
         news.save()
         sitemap = NewsSitemap()
         self.assertEqual(sitemap.items().count(), 1, msg='Should return one item.')
-        self.assertTrue(sitemap.lastmod(obj=news), msg='Should return the publication date of the news.')
+        self.assertTrue(sitemap.lastmod(obj=news), msg='Should return the modification date of the news.')
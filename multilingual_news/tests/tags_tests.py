@@ -1,17 +1,34 @@
 """Tests for tags of the ``multilingual_news``` application."""
+from collections import defaultdict
+from datetime import datetime
+
+from django.contrib.contenttypes.models import ContentType
+from django.template import Context, Template
 from django.test import TestCase
 from django.test.client import RequestFactory
+from django.utils.timezone import now, timedelta, utc
 from django.utils.translation import activate
 
 from cms.api import add_plugin
+from cms.plugin_rendering import ContentRenderer
+from cms.toolbar.toolbar import EmptyToolbar
 from mixer.backend.django import mixer
+from mock import patch
+from sekizai.data import UniqueSequence
+from sekizai.helpers import get_varname
 
+from .. import response_cache
+from ..models import NewsEntry
 from ..templatetags.multilingual_news_tags import (
+    get_category_entry_count,
+    get_news_archive,
     get_newsentry_meta_description,
     get_newsentry_meta_title,
     get_published_entries,
     get_recent_news,
+    get_related_news,
 )
+from .mixins import NewsTestMixin
 
 
 class GetPublishedEntriesTestCase(TestCase):
@@ -43,6 +60,55 @@ class GetPublishedEntriesTestCase(TestCase):
             get_published_entries(self.object_list).count(), 1, msg='The tag should have returned one entry.')
 
 
+class GetCategoryEntryCountTestCase(NewsTestMixin, TestCase):
+    """Tests for the `get_category_entry_count` template tag."""
+
+    def test_tag(self):
+        category = mixer.blend('multilingual_news.Category')
+        self.create_entry(language='de', categories=[category])
+        self.assertEqual(get_category_entry_count(category, 'de'), 1)
+        self.assertEqual(get_category_entry_count(category), 0, msg=(
+            'Should count the entries of the active language.'))
+
+
+class GetNewsArchiveTestCase(NewsTestMixin, TestCase):
+    """Tests for the `get_news_archive` template tag."""
+
+    def test_tag(self):
+        for pub_date in [datetime(2019, 12, 15, tzinfo=utc),
+                         datetime(2020, 3, 15, tzinfo=utc),
+                         datetime(2020, 3, 16, tzinfo=utc),
+                         datetime(2020, 5, 15, tzinfo=utc)]:
+            self.create_entry(pub_date=pub_date)
+        with self.assertNumQueries(1):
+            archive = get_news_archive()
+        self.assertEqual(
+            [(year['year'], year['count']) for year in archive],
+            [(2020, 3), (2019, 1)])
+        self.assertEqual(
+            [(month.month, month.count) for month in archive[0]['months']],
+            [(5, 1), (3, 2)])
+        self.assertEqual(get_news_archive('de'), [])
+
+
+class GetRelatedNewsTestCase(NewsTestMixin, TestCase):
+    """Tests for the `get_related_news` template tag."""
+
+    def test_tag(self):
+        tag = mixer.blend('multilingual_tags.Tag')
+        entries = []
+        for x in range(0, 3):
+            entry = self.create_entry()
+            mixer.blend(
+                'multilingual_tags.TaggedItem', tag=tag,
+                content_type=ContentType.objects.get_for_model(entry),
+                object_id=entry.pk)
+            entries.append(entry)
+        self.assertEqual(len(get_related_news(entries[0])), 2)
+        self.assertEqual(len(get_related_news(entries[0], limit=1)), 1)
+        self.assertEqual(len(get_related_news(entries[0], language_code='de')), 0)
+
+
 class GetNewsEntryMetaDescriptionTestCase(TestCase):
     """Tests for the `get_newsentry_meta_description` template tag."""
     longMessage = True
@@ -94,6 +160,24 @@ class GetNewsEntryMetaDescriptionTestCase(TestCase):
             msg='Should have appended "...".',
         )
 
+    def test_escaping(self):
+        entry = mixer.blend('multilingual_news.NewsEntry')
+        entry.set_current_language('en')
+        entry.meta_description = ''
+        entry.save()
+        add_plugin(entry.content, 'TextPlugin', 'en',
+                   body='<p>Tom&#39;s &amp; <b>Jerry\'s</b></p>')
+        entry = NewsEntry.objects.language('en').get(pk=entry.pk)
+        self.assertEqual(entry.description, "Tom's & Jerry's", msg=(
+            'Should store the text unescaped.'))
+        template = Template(
+            '{% load multilingual_news_tags %}'
+            '{% get_newsentry_meta_description entry %}')
+        self.assertEqual(
+            template.render(Context({'entry': entry})),
+            'Tom&#39;s &amp; Jerry&#39;s', msg=(
+                'Should escape the text only once on output.'))
+
 
 class GetNewsEntryMetaTitleTestCase(TestCase):
     """Tests for the `get_newsentry_meta_title` template tag."""
@@ -121,11 +205,11 @@ class GetNewsEntryMetaTitleTestCase(TestCase):
         self.assertEqual(get_newsentry_meta_title(self.entry_with_meta), 'Meta')
 
 
-class GetRecentNewsTestCase(TestCase):
+class GetRecentNewsTestCase(NewsTestMixin, TestCase):
     """Tests for the ``get_recent_news`` assignment tag."""
-    longMessage = True
 
     def setUp(self):
+        super(GetRecentNewsTestCase, self).setUp()
         self.news_entry = mixer.blend('multilingual_news.NewsEntry')
         self.news_entry.set_current_language('en')
         self.news_entry.is_published = True
@@ -161,3 +245,114 @@ class GetRecentNewsTestCase(TestCase):
         result = get_recent_news(context, category=self.category.slug)
         self.assertEqual(result.count(), 2, msg=(
             'Should only return recent news from chosen category'))
+
+    def test_cache(self):
+        for target in (
+                'multilingual_news.templatetags.multilingual_news_tags',
+                'multilingual_news.response_cache'):
+            patcher = patch(target + '.RECENT_NEWS_CACHE_TIMEOUT', 600)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        context = {'request': RequestFactory().get('/')}
+        pks = [entry.pk for entry in get_recent_news(context)]
+
+        def render():
+            for entry in get_recent_news(context):
+                str(entry.title)
+                entry.slug, entry.pub_date
+                entry.author, entry.excerpt, entry.content
+                for category in entry.categories.all():
+                    category.safe_translation_getter('title')
+            return [entry.pk for entry in get_recent_news(context)]
+
+        with self.assertNumQueries(0):
+            self.assertEqual(render(), pks, msg=(
+                'Should return the cached entries without a query.'))
+
+        NewsEntry.objects.set_published(
+            [pks[0]], is_published=False, language='en')
+        self.assertNotIn(pks[0], render(), msg=(
+            'Should not return unpublished entries.'))
+
+        german_generation = response_cache.get_generation('de')
+        generation = response_cache.get_generation('en')
+        self.news_entry.set_current_language('de')
+        self.news_entry.title = 'German'
+        self.news_entry.save_translation(
+            self.news_entry.get_translation('de'))
+        self.assertNotEqual(
+            response_cache.get_generation('de'), german_generation)
+        self.assertEqual(response_cache.get_generation('en'), generation, msg=(
+            'Should only change the generation of the changed language.'))
+
+        pub_date = now() + timedelta(hours=1)
+        entry = mixer.blend('multilingual_news.NewsEntry')
+        entry.set_current_language('en')
+        entry.is_published = True
+        entry.pub_date = pub_date
+        entry.save()
+        self.assertNotIn(entry.pk, render())
+        later = pub_date + timedelta(minutes=1)
+        with patch.object(response_cache, 'now', return_value=later), \
+                patch('multilingual_news.models.now', return_value=later):
+            self.assertIn(entry.pk, render(), msg=(
+                'Should return entries, that reached their publication'
+                ' date.'))
+
+
+class RenderNewsTeaserTestCase(NewsTestMixin, TestCase):
+    """Tests for the `render_news_teaser` template tag."""
+
+    def setUp(self):
+        super(RenderNewsTeaserTestCase, self).setUp()
+        self.entry = mixer.blend('multilingual_news.NewsEntry')
+        self.entry.set_current_language('en')
+        self.entry.save()
+
+    def render(self, **context):
+        request = RequestFactory().get('/')
+        request.current_page = None
+        context.update(
+            request=request, entry=NewsEntry.objects.get(pk=self.entry.pk))
+        return Template(
+            '{% load multilingual_news_tags %}'
+            '{% render_news_teaser entry 2 %}'
+        ).render(Context(context))
+
+    def test_tag(self):
+        add_plugin(self.entry.content, 'TextPlugin', 'en', body='One two three')
+        self.assertEqual(self.render(), 'One two …', msg=(
+            'Should truncate the content, if there is no excerpt.'))
+        with self.assertNumQueries(1):
+            self.render()  # only the entry is fetched
+
+        add_plugin(self.entry.excerpt, 'TextPlugin', 'en', body='Excerpt')
+        self.assertEqual(self.render(), 'Excerpt', msg=(
+            'Should render the excerpt again, after the plugins changed.'))
+
+    def test_sekizai(self):
+        def render_placeholder(self, placeholder, context, **kwargs):
+            context[get_varname()]['js'].append('<script></script>')
+            return 'Teaser'
+
+        with patch.object(
+                ContentRenderer, 'render_placeholder', render_placeholder):
+            for i in range(2):
+                sekizai_data = defaultdict(UniqueSequence)
+                self.assertEqual(self.render(**{
+                    get_varname(): sekizai_data}), 'Teaser')
+                self.assertEqual(
+                    list(sekizai_data['js']), ['<script></script>'], msg=(
+                        'Should restore the sekizai blocks from the cache.'))
+
+    def test_edit_mode(self):
+        add_plugin(self.entry.excerpt, 'TextPlugin', 'en', body='Excerpt')
+        with patch.object(EmptyToolbar, 'edit_mode_active', True), \
+                patch.object(ContentRenderer, 'render_placeholder',
+                             return_value='Excerpt') as render_placeholder:
+            self.render()
+            self.render()
+        self.assertEqual(render_placeholder.call_count, 2, msg=(
+            'Should not cache teasers in edit mode.'))
+        self.assertTrue(render_placeholder.call_args[1]['editable'], msg=(
+            'Should render the excerpt editable in edit mode.'))
@@ -1,15 +1,24 @@
 """Tests for the views of the ``multilingual_news`` app."""
+import json
+from datetime import date, datetime
+
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404
 from django.urls import reverse
 from django.test import TestCase
 from django.utils.translation import activate
-from django.utils.timezone import timedelta, now
+from django.utils.timezone import timedelta, now, utc
 
+from cms.api import add_plugin
 from django_libs.tests.mixins import ViewRequestFactoryTestMixin
+from mock import patch
 from mixer.backend.django import mixer
 
 from .. import models
 from .. import views
+from .mixins import NewsTestMixin
 
 
 class CategoryListViewTestCase(ViewRequestFactoryTestMixin, TestCase):
@@ -86,6 +95,83 @@ class GetEntriesAjaxViewTestCase(ViewRequestFactoryTestMixin, TestCase):
         category = mixer.blend('multilingual_news.Category')
         self.is_callable(data={'category': category.slug})
 
+    def test_json(self):
+        activate('en')
+        entry = mixer.blend('multilingual_news.NewsEntry')
+        entry.set_current_language('en')
+        entry.title = 'Title'
+        entry.slug = 'title'
+        entry.is_published = True
+        entry.save()
+        add_plugin(entry.content, 'TextPlugin', 'en', body='<p>One two</p>')
+        with self.assertNumQueries(1):
+            resp = self.get(data={'format': 'json', 'count': 5})
+        self.assertEqual(json.loads(resp.content.decode('utf-8')), {
+            'entries': [{
+                'title': 'Title',
+                'url': entry.get_absolute_url(),
+                'pub_date': DjangoJSONEncoder().default(entry.pub_date),
+                'thumbnail': None,
+                'teaser': 'One two',
+            }], 'next_cursor': None},
+            msg='Should return the entries without rendering them.')
+
+        resp = self.get(data={'format': 'json', 'fields': 'title,url'})
+        self.assertTrue(resp.streaming, msg=(
+            'Should stream the entries, if there is no count.'))
+        self.assertEqual(
+            json.loads(b''.join(resp.streaming_content).decode('utf-8')),
+            {'entries': [{'title': 'Title', 'url': entry.get_absolute_url()}],
+             'next_cursor': None},
+            msg='Should only return the selected fields.')
+
+        resp = self.get(data={'format': 'json', 'fields': 'title,password'})
+        self.assertEqual(resp.status_code, 400, msg=(
+            'Should reject unknown fields.'))
+
+    def test_cursor(self):
+        activate('en')
+        entries = []
+        for x in range(0, 3):
+            entry = mixer.blend('multilingual_news.NewsEntry')
+            entry.set_current_language('en')
+            entry.title = 'Entry {0}'.format(x)
+            entry.is_published = True
+            entry.pub_date = now() - timedelta(days=x)
+            entry.save()
+            entries.append(entry)
+
+        def get_titles(data):
+            data.update({'format': 'json', 'fields': 'title'})
+            content = json.loads(self.get(data=data).content.decode('utf-8'))
+            return [e['title'] for e in content['entries']], content[
+                'next_cursor']
+
+        titles, cursor = get_titles({'count': 2})
+        self.assertEqual(titles, ['Entry 0', 'Entry 1'])
+        titles, next_cursor = get_titles({'count': 2, 'after': cursor})
+        self.assertEqual(titles, ['Entry 2'], msg=(
+            'Should return the entries after the cursor.'))
+        self.assertIsNone(next_cursor)
+
+        resp = self.get(data={'after': cursor})
+        self.assertEqual(
+            [e.pk for e in resp.context_data['entries']], [entries[2].pk])
+
+        titles, cursor = get_titles(
+            {'count': 5, 'since': entries[1].pub_date.isoformat()})
+        self.assertEqual(titles, ['Entry 0'], msg=(
+            'Should only return the entries published after the date.'))
+        titles, cursor = get_titles(
+            {'count': 5, 'since': str(entries[2].pub_date.timestamp())})
+        self.assertEqual(titles, ['Entry 0', 'Entry 1'], msg=(
+            'Should accept UNIX timestamps.'))
+
+        for data in [{'after': 'foo'}, {'since': 'foo'}, {'count': 'foo'},
+                     {'count': '-1'}]:
+            self.assertEqual(self.get(data=data).status_code, 400, msg=(
+                'Should reject invalid parameters.'))
+
 
 class NewsListViewTestCase(ViewRequestFactoryTestMixin, TestCase):
     """Tests for the ``NewsListView`` view."""
@@ -102,6 +188,13 @@ class NewsListViewTestCase(ViewRequestFactoryTestMixin, TestCase):
         self.is_callable()
         self.is_callable(user=self.admin)
 
+    def test_cursor_pagination(self):
+        with patch.object(views.NewsListView, 'pagination_mode', 'cursor'):
+            resp = self.is_callable()
+            self.assertIsNone(resp.context_data['paginator'], msg=(
+                'Should not create a paginator, that counts all entries.'))
+            self.is_not_callable(data={'cursor': 'foo'})
+
 
 class PublishNewsEntryViewTestCase(ViewRequestFactoryTestMixin, TestCase):
     """Tests for the ``PublishNewsEntryView`` view class."""
@@ -143,13 +236,131 @@ class PublishNewsEntryViewTestCase(ViewRequestFactoryTestMixin, TestCase):
             models.NewsEntry.objects.get(pk=self.entry.pk).is_published)
 
 
+class BulkPublishNewsEntriesViewTestCase(ViewRequestFactoryTestMixin,
+                                         TestCase):
+    """Tests for the ``BulkPublishNewsEntriesView`` view class."""
+    view_class = views.BulkPublishNewsEntriesView
+
+    def setUp(self):
+        self.user = mixer.blend('auth.User')
+        self.admin = mixer.blend('auth.User', is_superuser=True)
+        self.entries = []
+        for x in range(0, 2):
+            entry = mixer.blend('multilingual_news.NewsEntry')
+            entry.set_current_language('en')
+            entry.slug = 'foo-{0}'.format(x)
+            entry.save()
+            self.entries.append(entry)
+        self.data = {
+            'action': 'publish',
+            'language': 'en',
+            'pk': [e.pk for e in self.entries],
+        }
+
+    def test_view(self):
+        self.should_redirect_to_login_when_anonymous()
+        self.is_not_callable(post=True, user=self.user, data=self.data)
+        resp = self.get(user=self.admin)
+        self.assertEqual(resp.status_code, 405)
+
+        resp = self.post(user=self.admin, data={'action': 'foo'})
+        self.assertEqual(resp.status_code, 400)
+        resp = self.post(
+            user=self.admin, data={'action': 'publish', 'pk': ['foo']})
+        self.assertEqual(resp.status_code, 400)
+
+        self.is_postable(user=self.admin, data=self.data,
+                         to=reverse('news_list'))
+        self.assertEqual(
+            models.NewsEntry.objects.published(language='en').count(), 2)
+        self.data['action'] = 'unpublish'
+        self.is_postable(user=self.admin, data=self.data,
+                         to=reverse('news_list'))
+        self.assertEqual(
+            models.NewsEntry.objects.published(language='en').count(), 0)
+
+
+class NewsArchiveYearViewTestCase(ViewRequestFactoryTestMixin, TestCase):
+    """Tests for the ``NewsArchiveYearView`` view class."""
+    view_class = views.NewsArchiveYearView
+
+    def get_view_kwargs(self):
+        return {'year': '2020'}
+
+    def setUp(self):
+        entry = mixer.blend(
+            'multilingual_news.NewsEntry',
+            pub_date=datetime(2020, 3, 15, tzinfo=utc))
+        entry.set_current_language('en')
+        entry.slug = 'foo'
+        entry.is_published = True
+        entry.save()
+
+    def test_view(self):
+        activate('en')
+        resp = self.is_callable()
+        self.assertEqual(
+            resp.context_data['date_list'], [date(2020, 3, 1)], msg=(
+                'Should list the months with published entries.'))
+        self.assertEqual(len(resp.context_data['object_list']), 1)
+        self.is_not_callable(kwargs={'year': '2019'})
+
+
+class NewsArchiveMonthViewTestCase(ViewRequestFactoryTestMixin, TestCase):
+    """Tests for the ``NewsArchiveMonthView`` view class."""
+    view_class = views.NewsArchiveMonthView
+
+    def get_view_kwargs(self):
+        return {'year': '2020', 'month': '03'}
+
+    def setUp(self):
+        entry = mixer.blend(
+            'multilingual_news.NewsEntry',
+            pub_date=datetime(2020, 3, 15, tzinfo=utc))
+        entry.set_current_language('en')
+        entry.slug = 'foo'
+        entry.is_published = True
+        entry.save()
+
+    def test_view(self):
+        activate('en')
+        resp = self.is_callable()
+        self.assertEqual(len(resp.context_data['object_list']), 1)
+        self.is_not_callable(kwargs={'year': '2020', 'month': '04'})
+
+
+class SearchViewTestCase(ViewRequestFactoryTestMixin, TestCase):
+    """Tests for the ``SearchView`` view class."""
+    view_class = views.SearchView
+
+    def setUp(self):
+        for x in range(0, 3):
+            entry = mixer.blend('multilingual_news.NewsEntry')
+            entry.set_current_language('en')
+            entry.title = 'Apple {0}'.format(x)
+            entry.slug = 'apple-{0}'.format(x)
+            entry.is_published = True
+            entry.save()
+
+    def test_view(self):
+        activate('en')
+        resp = self.is_callable()
+        self.assertEqual(len(resp.context_data['object_list']), 0, msg=(
+            'Should not return anything without a query.'))
+        with patch.object(self.view_class, 'paginate_by', 2):
+            resp = self.is_callable(data={'q': 'apple'})
+            self.assertEqual(resp.context_data['paginator'].count, 3)
+            self.assertEqual(len(resp.context_data['object_list']), 2)
+            self.assertEqual(resp.context_data['query'], 'apple')
+
+
 class TaggedNewsListViewTestCase(ViewRequestFactoryTestMixin, TestCase):
     """Tests for the ``TaggedNewsListView`` view."""
     view_class = views.TaggedNewsListView
 
     def setUp(self):
-        entry = mixer.blend(
-            'multilingual_news.NewsEntryTranslation',
+        self.entry = entry = mixer.blend(
+            'multilingual_news.NewsEntryTranslation', language_code='en',
             master__author=mixer.blend('people.Person'))
         self.tag = mixer.blend('multilingual_tags.Tag')
         self.tag.set_current_language('en')
@@ -159,7 +370,7 @@ class TaggedNewsListViewTestCase(ViewRequestFactoryTestMixin, TestCase):
             'multilingual_tags.TaggedItem',
             tag=self.tag,
             content_type=ContentType.objects.get_for_model(models.NewsEntry),
-            object_id=entry.pk)
+            object_id=entry.master.pk)
 
     def get_view_name(self):
         return 'news_archive_tagged'
@@ -171,6 +382,40 @@ class TaggedNewsListViewTestCase(ViewRequestFactoryTestMixin, TestCase):
         self.is_callable()
         self.is_callable(kwargs={'tag': 'foobar'})
 
+    def test_multiple_tags(self):
+        self.entry.is_published = True
+        self.entry.save()
+        self.entry.master.pub_date = now() - timedelta(days=1)
+        self.entry.master.save()
+        other = mixer.blend('multilingual_tags.Tag')
+        mixer.blend(
+            'multilingual_tags.TaggedItem', tag=other,
+            content_type=ContentType.objects.get_for_model(models.NewsEntry),
+            object_id=self.entry.master.pk)
+        resp = self.is_callable(kwargs={
+            'tag': '{0}+{1}'.format(self.tag.slug, other.slug)})
+        self.assertEqual(len(resp.context_data['object_list']), 1)
+        self.assertTrue(resp.context_data['match_all'])
+        self.assertEqual(
+            [tag.entry_count for tag in resp.context_data['tag_counts']],
+            [1, 1])
+
+        resp = self.is_callable(kwargs={
+            'tag': '{0}+foobar'.format(self.tag.slug)})
+        self.assertEqual(len(resp.context_data['object_list']), 0, msg=(
+            'Should return no entries, if a required tag does not exist.'))
+        resp = self.is_callable(kwargs={
+            'tag': '{0},foobar'.format(self.tag.slug)})
+        self.assertEqual(len(resp.context_data['object_list']), 1)
+        self.is_not_callable(kwargs={
+            'tag': '{0},{1}+foobar'.format(self.tag.slug, other.slug)})
+
+        self.entry.is_published = False
+        self.entry.save()
+        resp = self.is_callable(kwargs={'tag': self.tag.slug})
+        self.assertEqual(len(resp.context_data['object_list']), 0, msg=(
+            'Should not list unpublished entries.'))
+
 
 class NewsDateDetailViewTestCase(ViewRequestFactoryTestMixin, TestCase):
     """Tests for the ``NewsDateDetailView`` view."""
@@ -228,6 +473,70 @@ class NewsDateDetailViewTestCase(ViewRequestFactoryTestMixin, TestCase):
         self.is_callable(kwargs=kwargs)
 
 
+class NewsDetailViewTestCase(ViewRequestFactoryTestMixin, NewsTestMixin,
+                             TestCase):
+    """Tests for the ``NewsDetailView`` view."""
+    view_class = views.NewsDetailView
+
+    def setUp(self):
+        super(NewsDetailViewTestCase, self).setUp()
+        self.entry = mixer.blend(
+            'multilingual_news.NewsEntry', author=mixer.blend('people.Person'))
+        self.entry.set_current_language('en')
+        self.entry.slug = 'english'
+        self.entry.is_published = True
+        self.entry.save()
+        self.entry.set_current_language('de')
+        self.entry.slug = 'german'
+        self.entry.is_published = True
+        self.entry.save()
+        for category in mixer.cycle(2).blend('multilingual_news.Category'):
+            category.set_current_language('en')
+            category.title = 'Category'
+            category.save()
+            self.entry.categories.add(category)
+        content_type = ContentType.objects.get_for_model(self.entry)
+        for tag in mixer.cycle(2).blend('multilingual_tags.Tag'):
+            tag.set_current_language('en')
+            tag.name = 'Tag'
+            tag.save()
+            mixer.blend('multilingual_tags.TaggedItem', tag=tag,
+                        content_type=content_type, object_id=self.entry.pk)
+
+    def get_view_kwargs(self):
+        return {'slug': 'english'}
+
+    def get_object(self, slug):
+        view = self.view_class()
+        view.setup(self.get_get_request(), slug=slug)
+        return view.get_object()
+
+    def test_get_object(self):
+        cache.clear()
+        with self.assertNumQueries(6):
+            entry = self.get_object('english')
+            # everything, that ``partials/entry.html`` shows
+            self.assertEqual(entry.pk, self.entry.pk)
+            str(entry.author)
+            entry.title
+            entry.is_published
+            entry.image
+            entry.excerpt
+            entry.content
+            [category.title for category in entry.categories.all()]
+            [item.tag.name for item in entry.tags.all()]
+        self.assertEqual(entry.get_current_language(), 'en')
+
+        self.assertRaises(Http404, self.get_object, 'foo')
+        activate('de')
+        with self.assertRaises(views.FallbackLanguageResolved, msg=(
+                'Should redirect to the slug of the current language.')):
+            self.get_object('english')
+
+    def test_view(self):
+        self.is_callable()
+
+
 class NewsDetailPreviewViewTestCase(ViewRequestFactoryTestMixin, TestCase):
     """Test for the `NewsDetailPreviewView` view class."""
     view_class = views.NewsDetailPreviewView
@@ -2,32 +2,60 @@
 
 from django.urls import re_path
 
-from .feeds import AuthorFeed, NewsEntriesFeed, TaggedFeed
+from .feeds import AuthorFeed, CategoryFeed, NewsEntriesFeed, TaggedFeed
 from .models import NewsEntry
 from . import views
 
 
+def feed_patterns(feed_format):
+    """Returns the URL patterns of all feeds in the given format."""
+    feeds = (
+        (r"tagged/(?P<tag>[^/]*)/", TaggedFeed),
+        (r"category/(?P<category>[\w-]+)/", CategoryFeed),
+        (r"author/(?P<author>\d+)/", AuthorFeed),
+        (r"", NewsEntriesFeed),
+    )
+    patterns = []
+    for path, feed_class in feeds:
+        feed = feed_class(feed_format)
+        patterns += [
+            re_path(
+                r"^{0}/any/{1}$".format(feed_format, path),
+                feed,
+                {"any_language": True},
+                name="news_{0}_any{1}".format(feed_format, feed_class.url_suffix),
+            ),
+            re_path(
+                r"^{0}/{1}$".format(feed_format, path),
+                feed,
+                name="news_{0}{1}".format(feed_format, feed_class.url_suffix),
+            ),
+        ]
+    return patterns
+
+
 urlpatterns = [
     # feed urls
+    *feed_patterns("rss"),
+    *feed_patterns("atom"),
+    *feed_patterns("json"),
+    # regular urls
     re_path(
-        r"^rss/any/tagged/(?P<tag>[^/]*)/$",
-        TaggedFeed(),
-        {"any_language": True},
-        name="news_rss_any_tagged",
+        r"^publish-entries/$",
+        views.BulkPublishNewsEntriesView.as_view(),
+        name="news_bulk_publish",
     ),
-    re_path(r"^rss/tagged/(?P<tag>[^/]*)/$", TaggedFeed(), name="news_rss_tagged"),
+    re_path(r"^search/$", views.SearchView.as_view(), name="news_search"),
     re_path(
-        r"^rss/any/author/(?P<author>\d+)/$",
-        AuthorFeed(),
-        {"any_language": True},
-        name="news_rss_any_author",
+        r"^archive/(?P<year>\d{4})/$",
+        views.NewsArchiveYearView.as_view(),
+        name="news_archive_year",
     ),
-    re_path(r"^rss/author/(?P<author>\d+)/$", AuthorFeed(), name="news_rss_author"),
     re_path(
-        r"^rss/any/$", NewsEntriesFeed(), {"any_language": True}, name="news_rss_any"
+        r"^archive/(?P<year>\d{4})/(?P<month>\d{1,2})/$",
+        views.NewsArchiveMonthView.as_view(),
+        name="news_archive_month",
     ),
-    re_path(r"^rss/$", NewsEntriesFeed(), name="news_rss"),
-    # regular urls
     re_path(
         r"^category/(?P<category>[^/]*)/",
         views.CategoryListView.as_view(),
@@ -49,7 +77,7 @@ urlpatterns = [
         name="news_preview",
     ),
     re_path(
-        r"^tag/(?P<tag>[\w-]+)$",
+        r"^tag/(?P<tag>[\w,+-]+)$",
         views.TaggedNewsListView.as_view(),
         name="news_archive_tagged",
     ),
@@ -1,26 +1,58 @@
 """Views for the ``multilingual_news`` app."""
+import re
+from datetime import datetime
+
 from django.contrib.auth.decorators import login_required
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Case, F, IntegerField, When
 from django.urls import reverse
-from django.db.models import Q
-from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import redirect
 from django.utils.decorators import method_decorator
+from django.utils.dateparse import parse_datetime
+from django.utils.text import Truncator
+from django.utils.timezone import is_naive, make_aware, utc
 from django.utils.translation import get_language
 from django.views.generic import (
     DateDetailView,
     DeleteView,
     DetailView,
     ListView,
+    MonthArchiveView,
     View,
+    YearArchiveView,
 )
 
-from parler.views import TranslatableSlugMixin
+from multilingual_tags.models import Tag
+from parler.views import FallbackLanguageResolved, TranslatableSlugMixin
 
+from . import response_cache
 from .app_settings import PAGINATION_AMOUNT
-from .models import Category, NewsEntry
+from .conditional import ConditionalGetMixin, get_generation_state
+from .models import (
+    ArchiveEntryCount,
+    Category,
+    NewsEntry,
+    translations_prefetch,
+)
+from .pagination import (
+    CursorPaginationMixin,
+    decode_cursor,
+    make_cursor,
+    order,
+    seek,
+)
+from .response_cache import CachedResponseMixin
 
 
-class CategoryListView(ListView):
+class CategoryListView(CachedResponseMixin, ListView):
     template_name = 'multilingual_news/newsentry_archive_category.html'
     context_object_name = 'newsentries'
 
@@ -32,13 +64,17 @@ class CategoryListView(ListView):
         return super(CategoryListView, self).dispatch(
             request, *args, **kwargs)
 
+    def get_cache_dependencies(self, response):
+        return [response_cache.CATEGORIES,
+                response_cache.category_dependency(self.category.pk)]
+
     def get_context_data(self, **kwargs):
         ctx = super(CategoryListView, self).get_context_data(**kwargs)
         ctx.update({'category': self.category, })
         return ctx
 
     def get_queryset(self):
-        return self.category.get_entries()
+        return self.category.get_entries().for_listing()
 
 
 class DeleteNewsEntryView(DeleteView):
@@ -76,42 +112,215 @@ class DeleteNewsEntryView(DeleteView):
             return super(DeleteNewsEntryView, self).get_template_names()
 
 
-class GetEntriesAjaxView(ListView):
+class GetEntriesAjaxView(CachedResponseMixin, ListView):
+    """
+    View to load entries with AJAX.
+
+    ``count`` limits the amount of entries. ``after`` takes the
+    ``next_cursor`` of the previous response and returns the entries after
+    it. ``since`` takes an ISO 8601 date or a UNIX timestamp and only returns
+    entries, that were published later. Both seek on ``(pub_date, pk)``, so
+    every fetch costs the same, no matter how far the user scrolled.
+
+    With ``format=json`` the entries are returned as JSON instead of HTML. The
+    ``fields`` parameter selects a comma separated subset of ``json_fields``.
+    The data is read with ``values()``, so no entries are instantiated and no
+    placeholders are rendered. Responses without a ``count`` or with more than
+    ``stream_threshold`` entries are streamed.
+
+    """
     template_name = 'multilingual_news/partials/entry_list.html'
     context_object_name = 'entries'
+    json_fields = ('title', 'url', 'pub_date', 'thumbnail', 'teaser')
+    stream_threshold = 100
+    teaser_words = 30
 
     def dispatch(self, request, *args, **kwargs):
         if request.GET.get('category'):
             self.category = request.GET.get('category')
         else:
             self.category = None
-        if request.GET.get('count'):
-            self.count = int(request.GET.get('count'))
-        else:
-            self.count = None
+        try:
+            self.count = self.get_count()
+            self.after = self.get_after()
+            self.since = self.get_since()
+        except ValueError:
+            return HttpResponseBadRequest(
+                'Invalid count, after or since parameter.')
+        self.format = request.GET.get('format')
+        self.fields = self.json_fields
+        if request.GET.get('fields'):
+            self.fields = request.GET.get('fields').split(',')
+            if not set(self.fields).issubset(self.json_fields):
+                return HttpResponseBadRequest('Invalid fields.')
         return super(GetEntriesAjaxView, self).dispatch(
             request, *args, **kwargs)
 
-    def get_queryset(self):
+    def get_count(self):
+        if not self.request.GET.get('count'):
+            return None
+        count = int(self.request.GET.get('count'))
+        if count < 1:
+            raise ValueError(count)
+        return count
+
+    def get_after(self):
+        """
+        Returns the ``(pub_date, pk)`` of the ``after`` cursor.
+
+        Raises ``InvalidCursor``, which is a ``ValueError``, for invalid
+        cursors.
+
+        """
+        if not self.request.GET.get('after'):
+            return None
+        direction, pub_date, pk = decode_cursor(self.request.GET.get('after'))
+        return pub_date, pk
+
+    def get_since(self):
+        value = self.request.GET.get('since')
+        if not value:
+            return None
+        try:
+            return datetime.fromtimestamp(float(value), utc)
+        except (OverflowError, OSError, ValueError):
+            pass
+        since = parse_datetime(value)
+        if since is None:
+            raise ValueError(value)
+        if is_naive(since):
+            since = make_aware(since)
+        return since
+
+    def get(self, request, *args, **kwargs):
+        if self.format != 'json':
+            return super(GetEntriesAjaxView, self).get(
+                request, *args, **kwargs)
+        rows = self.get_values().iterator()
+        if self.count is None or self.count > self.stream_threshold:
+            return StreamingHttpResponse(
+                self.stream_json(rows), content_type='application/json')
+        rows = list(rows)
+        return JsonResponse({
+            'entries': [self.get_json_row(row) for row in rows],
+            'next_cursor': self.get_next_cursor(rows),
+        })
+
+    def get_context_data(self, **kwargs):
+        ctx = super(GetEntriesAjaxView, self).get_context_data(**kwargs)
+        ctx.update({'next_cursor': self.get_next_cursor([
+            {'pub_date': entry.pub_date, 'pk': entry.pk}
+            for entry in ctx['object_list']])})
+        return ctx
+
+    def get_next_cursor(self, rows):
+        """
+        Returns the cursor after the last of the given rows, if there might
+        be more entries.
+
+        """
+        if not self.count or len(rows) < self.count:
+            return None
+        return make_cursor(rows[-1]['pub_date'], rows[-1]['pk'])
+
+    def get_entries(self):
         qs = NewsEntry.objects.published()
         if self.category:
-            qs = qs.filter(Q(categories__slug=self.category) | Q(categories__parent__slug=self.category))
+            qs = qs.in_categories(
+                Category.objects.filter(slug=self.category))
+        if self.since:
+            qs = qs.filter(pub_date__gt=self.since)
+        if self.after:
+            return seek(qs, *self.after)
+        return order(qs)
+
+    def get_queryset(self):
+        qs = self.get_entries().for_listing()
         if self.count:
             return qs[:self.count]
         return qs
 
+    def get_values(self):
+        """
+        Returns the rows of the selected fields and the fields they are
+        computed from.
+
+        """
+        values = {}
+        if 'title' in self.fields:
+            values['title'] = F('translations__title')
+        if 'url' in self.fields:
+            values['slug'] = F('translations__slug')
+        if 'thumbnail' in self.fields:
+            values['thumbnail_file'] = F('thumbnail__file')
+            values['image_file'] = F('image__file')
+        if 'teaser' in self.fields:
+            values['description'] = F('translations__description')
+        qs = self.get_entries().filter(
+            translations__language_code=get_language()).values(
+                'pk', 'pub_date', **values)
+        if self.count:
+            return qs[:self.count]
+        return qs
 
-class NewsListView(ListView):
+    def get_json_row(self, row):
+        data = {}
+        if 'title' in self.fields:
+            data['title'] = row['title']
+        if 'url' in self.fields:
+            data['url'] = NewsEntry.get_url(row['slug'], row['pub_date'])
+        if 'pub_date' in self.fields:
+            data['pub_date'] = row['pub_date']
+        if 'thumbnail' in self.fields:
+            name = row['thumbnail_file'] or row['image_file']
+            data['thumbnail'] = name and self.get_file_url(name)
+        if 'teaser' in self.fields:
+            data['teaser'] = Truncator(row['description']).words(
+                self.teaser_words)
+        return data
+
+    def get_file_url(self, name):
+        image_model = NewsEntry._meta.get_field('thumbnail').related_model
+        return image_model._meta.get_field('file').storage.url(name)
+
+    def stream_json(self, rows):
+        encoder = DjangoJSONEncoder()
+        yield '{"entries": ['
+        row, amount = None, 0
+        for row in rows:
+            yield (',' if amount else '') + encoder.encode(
+                self.get_json_row(row))
+            amount += 1
+        next_cursor = None
+        if row is not None and self.count and amount == self.count:
+            next_cursor = make_cursor(row['pub_date'], row['pk'])
+        yield '], "next_cursor": {0}}}'.format(encoder.encode(next_cursor))
+
+
+class NewsListView(ConditionalGetMixin, CachedResponseMixin,
+                   CursorPaginationMixin, ListView):
     """View to display all published and visible news entries."""
     paginate_by = PAGINATION_AMOUNT
     template_name = 'multilingual_news/newsentry_list.html'
 
+    def get_cache_dependencies(self, response):
+        # categories can be hidden on the list
+        return [response_cache.ENTRIES, response_cache.CATEGORIES]
+
+    def get_conditional_state(self):
+        # the list changes with every entry of the language, so the news
+        # generation saves the aggregate over all published entries. A
+        # generation in a process-local cache would differ between processes
+        if response_cache.is_shared_cache():
+            return get_generation_state(get_language())
+        return super(NewsListView, self).get_conditional_state()
+
     def get_queryset(self):
         hidden_categories = Category.objects.filter(hide_on_list=True)
         kwargs = {'categories__in': hidden_categories}
         if self.request.user.is_superuser:
-            return NewsEntry.objects.exclude(**kwargs)
-        return NewsEntry.objects.published(exclude_kwargs=kwargs)
+            return NewsEntry.objects.exclude(**kwargs).for_listing()
+        return NewsEntry.objects.published(exclude_kwargs=kwargs).for_listing()
 
 
 class PublishNewsEntryView(View):
@@ -141,33 +350,219 @@ class PublishNewsEntryView(View):
             'slug': self.object.slug}))
 
 
-class TaggedNewsListView(ListView):
+class BulkPublishNewsEntriesView(View):
+    """
+    View to publish or unpublish several entries at once.
+
+    Expects the primary keys as a list of ``pk`` values, the ``action`` and
+    optionally the ``language`` of the translations to change.
+
+    """
+    http_method_names = ['post']
+
+    @method_decorator(login_required)
+    def dispatch(self, request, *args, **kwargs):
+        if not self.request.user.is_superuser:
+            raise Http404
+        return super(BulkPublishNewsEntriesView, self).dispatch(
+            request, *args, **kwargs)
+
+    def post(self, request, *args, **kwargs):
+        action = self.request.POST.get('action', None)
+        if action not in ('publish', 'unpublish'):
+            return HttpResponseBadRequest()
+        try:
+            pks = [int(pk) for pk in self.request.POST.getlist('pk')]
+        except ValueError:
+            return HttpResponseBadRequest()
+        NewsEntry.objects.set_published(
+            pks, is_published=action == 'publish',
+            language=self.request.POST.get('language'))
+        return redirect(reverse('news_list'))
+
+
+class NewsArchiveMixin(object):
+    """Common attributes of the archive views."""
+    date_field = 'pub_date'
+    month_format = '%m'
+    paginate_by = PAGINATION_AMOUNT
+
+    def get_queryset(self):
+        return NewsEntry.objects.published(
+            language=get_language()).for_listing()
+
+
+class NewsArchiveYearView(NewsArchiveMixin, YearArchiveView):
+    """View to display the published entries of one year."""
+    make_object_list = True
+    template_name = 'multilingual_news/newsentry_archive_year.html'
+
+    def get_date_list(self, queryset, date_type=None, ordering='ASC'):
+        """
+        Returns the months with published entries.
+
+        They are read from the ``ArchiveEntryCount`` table instead of
+        grouping the entries.
+
+        """
+        date_list = [
+            count.date for count in ArchiveEntryCount.objects.filter(
+                language_code=get_language(),
+                year=self.get_year()).order_by('month')]
+        if not date_list and not self.get_allow_empty():
+            raise Http404
+        return date_list
+
+
+class NewsArchiveMonthView(NewsArchiveMixin, MonthArchiveView):
+    """View to display the published entries of one month."""
+    template_name = 'multilingual_news/newsentry_archive_month.html'
+
+
+class SearchView(ListView):
+    """
+    View to search the published entries of the current language.
+
+    The query is read from the ``q`` GET parameter. The results are ordered
+    by relevance.
+
+    """
+    paginate_by = PAGINATION_AMOUNT
+    template_name = 'multilingual_news/newsentry_search.html'
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        if not self.query:
+            return NewsEntry.objects.none()
+        return NewsEntry.objects.search(
+            self.query, language=get_language()).for_listing()
+
+    def get_context_data(self, **kwargs):
+        ctx = super(SearchView, self).get_context_data(**kwargs)
+        ctx.update({'query': self.query})
+        return ctx
+
+
+class TaggedNewsListView(CachedResponseMixin, CursorPaginationMixin, ListView):
     """
-    View to display all published and visible news entries for a specific tag.
+    View to display all published and visible news entries for one or more
+    tags.
+
+    The ``tag`` URL argument is a tag slug or several slugs, that are joined
+    by ``+`` for the entries with all of the tags or by ``,`` for the entries
+    with any of them.
 
     """
     paginate_by = PAGINATION_AMOUNT
     template_name = 'multilingual_news/newsentry_list.html'
 
+    def dispatch(self, request, *args, **kwargs):
+        value = kwargs.get('tag')
+        if '+' in value and ',' in value:
+            raise Http404
+        self.match_all = ',' not in value
+        self.slugs = [slug for slug in re.split(r'[+,]', value) if slug]
+        if not self.slugs:
+            raise Http404
+        return super(TaggedNewsListView, self).dispatch(
+            request, *args, **kwargs)
+
+    def get_cache_dependencies(self, response):
+        # tagging an entry invalidates ``ENTRIES``, even if the tag is new
+        return [response_cache.ENTRIES] + [
+            response_cache.tag_dependency(tag.pk) for tag in self.tags]
+
+    def get_context_data(self, **kwargs):
+        ctx = super(TaggedNewsListView, self).get_context_data(**kwargs)
+        ctx.update({
+            'tags': self.tags,
+            'match_all': self.match_all,
+            'tag_counts': self.object_list.tag_counts(),
+        })
+        return ctx
+
     def get_queryset(self):
-        return NewsEntry.objects.language(get_language()).filter(
-            tags__tag__slug=self.kwargs.get('tag'))
+        self.tags = list(Tag.objects.filter(slug__in=self.slugs).prefetch_related(
+            translations_prefetch(Tag)))
+        if self.match_all and len(self.tags) < len(set(self.slugs)):
+            # one of the required tags doesn't exist
+            return NewsEntry.objects.none()
+        if self.request.user.is_superuser:
+            qs = NewsEntry.objects.language(get_language())
+        else:
+            qs = NewsEntry.objects.published()
+        return qs.tagged(self.tags, self.match_all).for_listing()
 
 
-class DetailViewMixin(TranslatableSlugMixin):
+class DetailViewMixin(ConditionalGetMixin, CachedResponseMixin,
+                      TranslatableSlugMixin):
     """Mixin to handle different DetailView variations."""
     model = NewsEntry
     slug_field = 'slug'
 
+    def get_cache_dependencies(self, response):
+        return [response_cache.entry_dependency(self.object.pk)]
+
+    def get_conditional_queryset(self):
+        return self.get_queryset().filter(
+            translations__slug=self.kwargs.get(self.slug_url_kwarg))
+
     def get_queryset(self, **kwargs):
         return NewsEntry.objects.language(get_language())
 
+    def filter_object_queryset(self, queryset):
+        """Hook to narrow down the entries, that the slug is looked up in."""
+        return queryset
+
+    def get_object(self, queryset=None):
+        """
+        Returns the entry with the slug in the current language or, if there
+        is none, in the first fallback language, that has it.
+
+        Unlike ``TranslatableSlugMixin``, all languages are looked up with
+        one query, that uses the slug index of the translations, and
+        everything the entry template shows is prefetched.
+
+        """
+        if queryset is None:
+            queryset = self.get_queryset()
+        slug = self.kwargs.get(self.slug_url_kwarg)
+        choices = self.get_language_choices()
+        qs = self.filter_object_queryset(queryset).filter(
+            translations__slug=slug, translations__language_code__in=choices,
+        ).annotate(
+            _slug_language=F('translations__language_code'),
+            _slug_priority=Case(
+                *[When(translations__language_code=language, then=index)
+                  for index, language in enumerate(choices)],
+                output_field=IntegerField()),
+        ).order_by('_slug_priority')
+        entries = list(qs.for_listing(choices[0])[:1])
+        if not entries:
+            raise Http404
+        entry = entries[0]
+        if entry._slug_language != choices[0]:
+            # the entry was found by the slug of a fallback language
+            if entry.has_translation(choices[0]):
+                raise FallbackLanguageResolved(entry, choices[0])
+            entry.set_current_language(entry._slug_language)
+        return entry
+
 
 class NewsDateDetailView(DetailViewMixin, DateDetailView):
     """View to display one news entry with publication date."""
     date_field = 'pub_date'
     month_format = '%m'
 
+    def filter_object_queryset(self, queryset):
+        try:
+            date = datetime.strptime('{0}-{1}-{2}'.format(
+                self.get_year(), self.get_month(), self.get_day()),
+                '%Y-%m-%d').date()
+        except ValueError:
+            raise Http404
+        return queryset.filter(**self._make_single_date_lookup(date))
+
 
 class NewsDetailView(DetailViewMixin, DetailView):
     """View to display one news entry without publication date."""